@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:36
+
+import jobs.models
+import jobs.storage
+import jobs.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_upload_content_validation'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobseekerprofile',
+            name='resume',
+            field=models.FileField(blank=True, null=True, storage=jobs.storage.blob_storage, upload_to='resumes/', validators=[jobs.models.validate_file_size, jobs.uploads.FileContentValidator(('pdf', 'doc', 'docx'))]),
+        ),
+    ]
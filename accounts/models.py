@@ -1,6 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
+from jobs.models import validate_file_size
+from jobs.uploads import RESUME_TYPES, FileContentValidator
+from jobs.storage import blob_storage
 
 class EmployerProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
@@ -13,7 +16,13 @@ class EmployerProfile(models.Model):
 
 class JobseekerProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
-    resume = models.FileField(upload_to="resumes/", blank=True, null=True)
+    resume = models.FileField(
+        upload_to="resumes/",
+        storage=blob_storage,
+        blank=True,
+        null=True,
+        validators=[validate_file_size, FileContentValidator(RESUME_TYPES)]
+    )
 
     def __str__(self):
         return self.user.username
@@ -74,12 +74,53 @@ TEMPLATES = [
 WSGI_APPLICATION = "jobcentre.wsgi.application"
 
 # Database (SQLite for minimal setup)
+# SQLite in WAL mode with per-connection PRAGMAs (jobs/database.py,
+# JOBS_SQLITE_PRAGMAS overrides them). Connections are kept for
+# CONN_MAX_AGE seconds, checked before reuse, and transactions take the
+# write lock up front; `manage.py db_health` reports the state.
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 5,
+        },
     }
 }
+JOBS_SQLITE_PRAGMAS = {}
+# db_health warns when the WAL file is larger than this
+JOBS_WAL_WARN_BYTES = 64 * 1024 * 1024
+
+# Cache
+# "pages" holds rendered public pages for anonymous visitors (jobs/cache.py).
+# "fragments" holds rendered vacancy cards for every visitor; their keys
+# carry the row's updated_at, so entries are never stale, only unused.
+# LocMemCache evicts least-recently-used entries past MAX_ENTRIES; it is
+# per-process, so with several workers switch it to FileBasedCache (or a
+# shared cache server) so signal-driven invalidation reaches every worker.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "jobcentre",
+    },
+    "pages": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "jobcentre-pages",
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 1000},
+    },
+    "fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "jobcentre-fragments",
+        "TIMEOUT": 86400,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+JOBS_PAGE_CACHE = "pages"
+JOBS_FRAGMENT_CACHE = "fragments"
 
 # Password validation (default)
 AUTH_PASSWORD_VALIDATORS = []
@@ -99,6 +140,22 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / "staticfiles"  # this is where collectstatic will copy everything
 
+# Storage: uploaded attachments, resumes and article images are stored
+# once per distinct content, see jobs/storage.py
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "blobs": {"BACKEND": "jobs.storage.ContentAddressedStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+# Uploads: attachments and resumes are size-checked, sniffed and hashed
+# while streaming (jobs/uploads.py); everything else uses the defaults.
+FILE_UPLOAD_HANDLERS = [
+    "jobs.uploads.ValidatingUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
 
 # Tailwind settings
 TAILWIND_APP_NAME = "theme"
@@ -106,4 +163,70 @@ INTERNAL_IPS = ["127.0.0.1"]
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
-NPM_BIN_PATH = r"C:\Program Files\nodejs\npm.cmd"
\ No newline at end of file
+NPM_BIN_PATH = r"C:\Program Files\nodejs\npm.cmd"
+
+# Jobs timeline pagination (cursor based, see jobs/pagination.py)
+JOBS_PAGE_SIZE = 10
+JOBS_MAX_PAGE_SIZE = 50
+
+# Attachment thumbnails/previews are rendered by this many worker
+# processes (jobs/attachments.py); 0 renders inline after commit.
+JOBS_ATTACHMENT_WORKERS = 2
+
+# Rows per bulk_create/transaction in `manage.py import_vacancies` and
+# the admin import page (jobs/imports.py)
+JOBS_IMPORT_BATCH_SIZE = 1000
+
+# Live feed over server-sent events (jobs/live.py). LocalBroker only
+# reaches streams in the same process; with several workers use
+# "jobs.live.RedisBroker" and set JOBS_LIVE_REDIS_URL.
+JOBS_LIVE_BROKER = "jobs.live.LocalBroker"
+JOBS_LIVE_KEEPALIVE = 15  # seconds between keepalive comments
+
+# Memory-mapped vectors behind "Recommended for you", shared by all
+# worker processes (jobs/match_store.py); compact them periodically with
+# `manage.py compact_match_index`
+JOBS_MATCH_INDEX_DIR = BASE_DIR / "var" / "matching"
+
+# Vacancy expiry (jobs/expiry.py, `manage.py expire_vacancies`): closed
+# vacancies are archived after being closed for JOBS_ARCHIVE_AFTER_DAYS.
+# Set JOBS_EXPIRY_INTERVAL (seconds) to also sweep from each web process
+# instead of, or as well as, a cron job.
+JOBS_EXPIRY_INTERVAL = 0
+JOBS_EXPIRY_BATCH_SIZE = 500
+JOBS_ARCHIVE_AFTER_DAYS = 90
+
+# Applications (jobs/applications.py) are written by one thread per
+# process, up to JOBS_APPLICATION_BATCH_SIZE per transaction; a request
+# gives up after JOBS_APPLICATION_TIMEOUT seconds. Each user can send
+# JOBS_APPLY_BURST applications at once, then one per
+# JOBS_APPLY_REFILL_SECONDS, counted in the JOBS_RATE_LIMIT_CACHE cache
+# (it must be shared, e.g. Redis, for the limit to hold across processes).
+JOBS_APPLICATION_QUEUE = True
+JOBS_APPLICATION_BATCH_SIZE = 50
+JOBS_APPLICATION_TIMEOUT = 10
+JOBS_APPLY_BURST = 5
+JOBS_APPLY_REFILL_SECONDS = 60
+JOBS_RATE_LIMIT_CACHE = "default"
+
+# Vacancy impressions and views (jobs/traffic.py) are buffered in each
+# web process and written every JOBS_TRAFFIC_FLUSH_INTERVAL seconds;
+# hourly rows are kept for JOBS_TRAFFIC_RETENTION_DAYS. The trending
+# ranking is recomputed at most every JOBS_TRENDING_CACHE_SECONDS.
+JOBS_TRAFFIC_FLUSH_INTERVAL = 30
+JOBS_TRAFFIC_RETENTION_DAYS = 30
+JOBS_TRENDING_CACHE_SECONDS = 300
+
+# Featured vacancies (jobs/featuring.py, `manage.py feature_vacancies`):
+# JOBS_FEATURED_COUNT slots, at most JOBS_FEATURED_PER_COMPANY per company,
+# each held for at most JOBS_FEATURED_ROTATION_HOURS. Set
+# JOBS_FEATURING_INTERVAL (seconds) to recompute from each web process
+# instead of, or as well as, a cron job.
+JOBS_FEATURED_COUNT = 6
+JOBS_FEATURED_PER_COMPANY = 2
+JOBS_FEATURED_ROTATION_HOURS = 24
+JOBS_FEATURING_INTERVAL = 0
+
+# Rows fetched per database round trip by the streaming exports
+# (jobs/exports.py, `manage.py export_data`)
+JOBS_EXPORT_CHUNK_SIZE = 2000
@@ -0,0 +1,37 @@
+"""
+Production settings: DJANGO_SETTINGS_MODULE=jobcentre.settings_production
+
+Everything not overridden here comes from settings.py. DJANGO_SECRET_KEY
+and DJANGO_ALLOWED_HOSTS (comma-separated) must be set in the environment.
+"""
+
+import copy
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get("DJANGO_ALLOWED_HOSTS", "").split(",") if host.strip()]
+
+X_FRAME_OPTIONS = "SAMEORIGIN"
+
+# Templates are read and compiled once per process and kept in memory
+# (restart to pick up template changes). An explicit `loaders` list
+# replaces APP_DIRS, so app templates come from app_directories.Loader.
+TEMPLATES = copy.deepcopy(TEMPLATES)
+TEMPLATES[0]["APP_DIRS"] = False
+TEMPLATES[0]["OPTIONS"]["debug"] = False
+TEMPLATES[0]["OPTIONS"]["loaders"] = [
+    ("django.template.loaders.cached.Loader", [
+        "django.template.loaders.filesystem.Loader",
+        "django.template.loaders.app_directories.Loader",
+    ]),
+]
+
+# Compile every template when the WSGI/ASGI application starts rather than
+# on the first request that uses it (jobs/templating.py). Run the server
+# with --preload (gunicorn) so workers share the compiled templates.
+JOBS_PREWARM_TEMPLATES = True
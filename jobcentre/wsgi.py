@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'jobcentre.settings')
 
 application = get_wsgi_application()
+
+from jobs.periodic import start_background_jobs  # noqa: E402
+
+start_background_jobs()
@@ -1,10 +1,22 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.urls import path
 from django.utils.html import format_html
 from .models import (
-    Vacancy, JobSeeker, Application,
+    Vacancy, JobSeeker, Application, ArchivedVacancy, ArchivedApplication,
     AdvisoryCategory, AdvisoryArticle,
-    ReferralPartner, ReferralRequest
+    ReferralPartner, ReferralRequest, ExchangeRate
 )
+from .exports import FORMATS, available_formats, dataset_for_model, export_stream
+from .forms import VacancyImportForm
+from .imports import detect_format, import_vacancies
+from .search import filter_vacancies
+from . import live, match_store, matching, related
+from .cache import invalidate
+from .signals import invalidate_advisory_categories
 
 # Custom Admin Site Header
 admin.site.site_header = "JobCentre Administration"
@@ -12,25 +24,66 @@ admin.site.site_title = "JobCentre Admin Portal"
 admin.site.index_title = "Welcome to JobCentre Admin Portal"
 
 
+# === EXPORTS ===
+class ExportMixin:
+    """Adds streaming CSV/JSONL/Parquet export of the filtered changelist
+    (see jobs/exports.py)."""
+
+    change_list_template = 'admin/jobs/export_change_list.html'
+
+    def get_urls(self):
+        opts = self.model._meta
+        urls = [
+            path(
+                'export/<str:fmt>/',
+                self.admin_site.admin_view(self.export_view),
+                name=f'{opts.app_label}_{opts.model_name}_export',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = {'export_formats': available_formats(), **(extra_context or {})}
+        return super().changelist_view(request, extra_context)
+
+    def export_view(self, request, fmt):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        dataset = dataset_for_model(self.model)
+        params = request.GET.dict()
+        search = params.pop('q', '')
+        try:
+            stream = export_stream(dataset, fmt, params, search)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+
+        content_type, extension = FORMATS[fmt]
+        filename = f"{dataset}-{timezone.now():%Y%m%d-%H%M}.{extension}"
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
 # === VACANCY ADMIN ===
 
 
 @admin.register(Vacancy)
-class VacancyAdmin(admin.ModelAdmin):
-    list_display = ('title', 'company', 'is_upload_only', 'posted_date', 'closing_date', 'is_active')
+class VacancyAdmin(ExportMixin, admin.ModelAdmin):
+    change_list_template = 'admin/jobs/vacancy/change_list.html'
+    list_display = ('title', 'company', 'attachment_preview', 'is_upload_only', 'posted_date', 'closing_date', 'application_count', 'views', 'impressions', 'is_active')
     list_filter = ('is_upload_only', 'is_active', 'job_type', 'currency')
-    search_fields = ('title', 'company', 'location', 'description')
-    readonly_fields = ('posted_date',)
+    search_fields = ('title', 'company', 'location', 'description', 'requirements')
+    readonly_fields = ('posted_date', 'attachment_preview')
 
     fieldsets = (
         ('Job Info', {
-            'fields': ('title', 'company', 'description', 'location', 'salary', 'salary_min', 'salary_max', 'currency', 'job_type')
+            'fields': ('title', 'company', 'description', 'location', 'salary', 'salary_min', 'salary_max', 'currency', 'salary_period', 'job_type')
         }),
         ('Job Meta', {
             'fields': ('requirements', 'benefits', 'application_email', 'application_url', 'is_featured', 'is_active', 'posted_date', 'closing_date')
         }),
         ('Upload Job Card', {
-            'fields': ('is_upload_only', 'attachment')
+            'fields': ('is_upload_only', 'attachment', 'attachment_preview')
         }),
     )
 
@@ -44,39 +97,138 @@ class VacancyAdmin(admin.ModelAdmin):
             obj.salary = ''
         super().save_model(request, obj, form, change)
 
-
-
+    # All-time traffic (jobs/traffic.py), up to the last flush
+    def views(self, obj):
+        return obj.view_count
+    views.short_description = 'Views'
+    views.admin_order_field = 'view_count'
+
+    def impressions(self, obj):
+        return obj.impression_count
+    impressions.short_description = 'Impressions'
+    impressions.admin_order_field = 'impression_count'
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the full-text index instead of LIKE '%term%' over every column
+        return filter_vacancies(queryset, search_term), False
+
+    # Partner feed upload (same engine as `manage.py import_vacancies`)
+    def get_urls(self):
+        urls = [
+            path('import/', self.admin_site.admin_view(self.import_feed_view), name='jobs_vacancy_import'),
+        ]
+        return urls + super().get_urls()
+
+    def import_feed_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        form = VacancyImportForm(request.POST or None, request.FILES or None)
+        reports = None
+        if request.method == 'POST' and form.is_valid():
+            feed = form.cleaned_data['feed']
+            try:
+                reports = import_vacancies(
+                    feed, detect_format(feed.name), form.cleaned_data['source'],
+                    dry_run=form.cleaned_data['dry_run'],
+                )
+            except (UnicodeDecodeError, ValueError) as e:
+                messages.error(request, f"Import stopped: {e}")
+            else:
+                created = sum(batch.created for batch in reports)
+                updated = sum(batch.updated for batch in reports)
+                failed = sum(batch.failed for batch in reports)
+                prefix = "Dry run, nothing written: " if form.cleaned_data['dry_run'] else ""
+                level = messages.WARNING if failed else messages.SUCCESS
+                messages.add_message(
+                    request, level, f"{prefix}{created} created, {updated} updated, {failed} rows rejected."
+                )
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import vacancies',
+            'form': form,
+            'reports': reports,
+        }
+        return TemplateResponse(request, 'admin/jobs/vacancy/import_feed.html', context)
 
     def attachment_preview(self, obj):
         if not obj.attachment:
             return "-"
         url = obj.attachment.url
+        if obj.has_thumbnail:
+            return format_html(
+                '<a href="{}" target="_blank"><img src="{}" style="max-width:120px;height:auto;" loading="lazy" /></a>',
+                url, obj.thumbnail_jpeg.url
+            )
         if obj.is_pdf:
             return format_html('<a href="{}" target="_blank">📄 View PDF</a>', url)
         elif obj.is_image:
-            return format_html('<img src="{}" style="max-width:200px;height:auto;" />', url)
+            return format_html('<a href="{}" target="_blank">🖼 View image</a>', url)
         return format_html('<a href="{}" target="_blank">Download</a>', url)
 
     attachment_preview.short_description = "Attachment Preview"
 
     # Custom actions
-    actions = ['make_featured', 'remove_featured', 'make_active', 'make_inactive']
+    actions = ['make_featured', 'remove_featured', 'make_active', 'make_inactive', 'show_matching_seekers']
+
+    MATCHES_PER_VACANCY = 5
+    MAX_VACANCIES_MATCHED = 20
 
     @admin.action(description="Mark selected vacancies as featured")
     def make_featured(self, request, queryset):
-        queryset.update(is_featured=True)
+        newly_featured = list(queryset.filter(is_featured=False, is_active=True))
+        # Starts its turn in the featuring rotation (jobs/featuring.py)
+        queryset.filter(is_featured=False).update(is_featured=True, featured_at=timezone.now())
+        invalidate('vacancies')
+        for vacancy in newly_featured:
+            vacancy.is_featured = True
+            live.publish_vacancy(vacancy, 'featured')
 
     @admin.action(description="Remove featured status")
     def remove_featured(self, request, queryset):
         queryset.update(is_featured=False)
+        invalidate('vacancies')
 
     @admin.action(description="Mark selected vacancies as active")
     def make_active(self, request, queryset):
-        queryset.update(is_active=True)
+        match_store.update_later('vacancies', queryset.values_list('pk', flat=True))
+        queryset.update(is_active=True, closed_at=None, updated_at=timezone.now())
+        invalidate('vacancies')
 
     @admin.action(description="Mark selected vacancies as inactive")
     def make_inactive(self, request, queryset):
-        queryset.update(is_active=False)
+        match_store.update_later('vacancies', queryset.values_list('pk', flat=True))
+        now = timezone.now()
+        # Only rows still active start the archiving clock (jobs/expiry.py)
+        queryset.filter(is_active=True).update(is_active=False, closed_at=now, updated_at=now)
+        invalidate('vacancies')
+
+    @admin.action(description="Show best matching job seekers")
+    def show_matching_seekers(self, request, queryset):
+        if not matching.available():
+            self.message_user(request, "Matching needs the numpy package.", messages.ERROR)
+            return
+        vacancies = list(queryset[:self.MAX_VACANCIES_MATCHED + 1])
+        if len(vacancies) > self.MAX_VACANCIES_MATCHED:
+            self.message_user(
+                request, f"Showing matches for the first {self.MAX_VACANCIES_MATCHED} selected vacancies.",
+                messages.WARNING,
+            )
+        for vacancy in vacancies[:self.MAX_VACANCIES_MATCHED]:
+            matches = matching.candidates(vacancy, self.MATCHES_PER_VACANCY)
+            if matches:
+                summary = '; '.join(f"{seeker} ({score:.0%})" for seeker, score in matches)
+                self.message_user(request, f"{vacancy}: {summary}", messages.INFO)
+            else:
+                self.message_user(request, f"{vacancy}: no matching job seekers.", messages.WARNING)
+
+
+# === EXCHANGE RATE ADMIN ===
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ('currency', 'zar_per_unit', 'updated_at')
+    list_editable = ('zar_per_unit',)
+    readonly_fields = ('updated_at',)
 
 
 # === JOB SEEKER ADMIN ===
@@ -88,6 +240,11 @@ class JobSeekerAdmin(admin.ModelAdmin):
         'user__last_name', 'skills', 'experience'
     )
     list_filter = ('user__date_joined',)
+    list_select_related = ('user',)
+    actions = ['show_matching_vacancies']
+
+    MATCHES_PER_SEEKER = 5
+    MAX_SEEKERS_MATCHED = 20
 
     def email(self, obj):
         return obj.user.email
@@ -98,18 +255,39 @@ class JobSeekerAdmin(admin.ModelAdmin):
     skills_preview.short_description = 'Skills'
 
     def applications_count(self, obj):
-        return obj.application_set.count()
+        return obj.application_count
     applications_count.short_description = 'Applications'
+    applications_count.admin_order_field = 'application_count'
+
+    @admin.action(description="Show best matching vacancies")
+    def show_matching_vacancies(self, request, queryset):
+        if not matching.available():
+            self.message_user(request, "Matching needs the numpy package.", messages.ERROR)
+            return
+        seekers = list(queryset.select_related('user')[:self.MAX_SEEKERS_MATCHED + 1])
+        if len(seekers) > self.MAX_SEEKERS_MATCHED:
+            self.message_user(
+                request, f"Showing matches for the first {self.MAX_SEEKERS_MATCHED} selected job seekers.",
+                messages.WARNING,
+            )
+        for seeker in seekers[:self.MAX_SEEKERS_MATCHED]:
+            matches = matching.recommend(seeker, self.MATCHES_PER_SEEKER)
+            if matches:
+                summary = '; '.join(f"{vacancy} ({score:.0%})" for vacancy, score in matches)
+                self.message_user(request, f"{seeker}: {summary}", messages.INFO)
+            else:
+                self.message_user(request, f"{seeker}: no matching vacancies.", messages.WARNING)
 
 
 # === APPLICATION ADMIN ===
 @admin.register(Application)
-class ApplicationAdmin(admin.ModelAdmin):
+class ApplicationAdmin(ExportMixin, admin.ModelAdmin):
     list_display = ('job_seeker', 'vacancy', 'applied_date', 'status', 'status_badge')
     list_filter = ('status', 'applied_date', 'vacancy__company')
     search_fields = ('job_seeker__user__username', 'vacancy__title', 'vacancy__company')
     date_hierarchy = 'applied_date'
     list_editable = ('status',)
+    list_select_related = ('job_seeker__user', 'vacancy')
 
     def status_badge(self, obj):
         colors = {
@@ -137,8 +315,9 @@ class AdvisoryCategoryAdmin(admin.ModelAdmin):
     description_preview.short_description = 'Description'
 
     def articles_count(self, obj):
-        return obj.advisoryarticle_set.count()
+        return obj.article_count
     articles_count.short_description = 'Articles'
+    articles_count.admin_order_field = 'article_count'
 
 
 # === ADVISORY ARTICLE ADMIN ===
@@ -148,6 +327,7 @@ class AdvisoryArticleAdmin(admin.ModelAdmin):
     list_filter = ('category', 'is_published', 'published_date')
     search_fields = ('title', 'content', 'author', 'excerpt')
     list_editable = ('is_published',)
+    list_select_related = ('category',)
     date_hierarchy = 'published_date'
     readonly_fields = ('published_date',)
 
@@ -158,20 +338,31 @@ class AdvisoryArticleAdmin(admin.ModelAdmin):
     )
 
     def read_time(self, obj):
-        word_count = len(obj.content.split())
-        minutes = max(1, round(word_count / 200))
-        return f"{minutes} min"
+        return f"{obj.read_minutes} min"
     read_time.short_description = 'Read Time'
+    read_time.admin_order_field = 'read_minutes'
 
     actions = ['publish_articles', 'unpublish_articles']
 
     @admin.action(description="Publish selected articles")
     def publish_articles(self, request, queryset):
+        pks = list(queryset.values_list('pk', flat=True))
+        # Read before the update, which can empty a changelist filtered on it
+        category_ids = list(queryset.values_list('category_id', flat=True).distinct())
+        match_store.update_later('articles', pks)
+        related.refresh_later(pks)
         queryset.update(is_published=True)
+        invalidate_advisory_categories(*category_ids)
 
     @admin.action(description="Unpublish selected articles")
     def unpublish_articles(self, request, queryset):
+        pks = list(queryset.values_list('pk', flat=True))
+        # Read before the update, which can empty a changelist filtered on it
+        category_ids = list(queryset.values_list('category_id', flat=True).distinct())
+        match_store.update_later('articles', pks)
+        related.refresh_later(pks)
         queryset.update(is_published=False)
+        invalidate_advisory_categories(*category_ids)
 
 
 # === REFERRAL PARTNER ADMIN ===
@@ -189,18 +380,20 @@ class ReferralPartnerAdmin(admin.ModelAdmin):
     )
 
     def referrals_count(self, obj):
-        return obj.referralrequest_set.count()
+        return obj.referral_count
     referrals_count.short_description = 'Referrals'
+    referrals_count.admin_order_field = 'referral_count'
 
 
 # === REFERRAL REQUEST ADMIN ===
 @admin.register(ReferralRequest)
-class ReferralRequestAdmin(admin.ModelAdmin):
+class ReferralRequestAdmin(ExportMixin, admin.ModelAdmin):
     list_display = ('job_seeker', 'partner', 'requested_date', 'status', 'status_badge')
     list_filter = ('status', 'requested_date', 'partner__category')
     search_fields = ('job_seeker__user__username', 'partner__name', 'reason')
     date_hierarchy = 'requested_date'
     list_editable = ('status',)
+    list_select_related = ('job_seeker__user', 'partner')
     readonly_fields = ('requested_date',)
 
     def status_badge(self, obj):
@@ -217,3 +410,31 @@ class ReferralRequestAdmin(admin.ModelAdmin):
             obj.get_status_display().upper()
         )
     status_badge.short_description = 'Status'
+
+
+# === ARCHIVE ADMIN ===
+# Read-only: rows are moved here by `manage.py expire_vacancies`
+class ArchivedApplicationInline(admin.TabularInline):
+    model = ArchivedApplication
+    fields = ('id', 'job_seeker', 'applied_date', 'status')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedVacancy)
+class ArchivedVacancyAdmin(admin.ModelAdmin):
+    list_display = ('id', 'title', 'company', 'posted_date', 'closing_date', 'application_count', 'archived_at')
+    list_filter = ('archived_at',)
+    search_fields = ('title', 'company', 'location')
+    date_hierarchy = 'archived_at'
+    inlines = [ArchivedApplicationInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,128 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum, Value
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from .models import Application, ApplicationDailyStats
+
+
+# ----------------------------
+# Daily application stats
+# ----------------------------
+# ApplicationDailyStats counts each vacancy's applications per day sent
+# (in TIME_ZONE) and current status. It is kept up to date as
+# applications are written, change status or are deleted (jobs/signals.py,
+# and jobs/applications.py for batched writes), so the employer dashboard
+# sums a handful of rows per vacancy and day instead of aggregating the
+# applications table. Like the denormalized counters, it is repaired by
+# `manage.py recount`.
+
+def key_of(vacancy_id, applied_date, status):
+    return (vacancy_id, timezone.localdate(applied_date), status)
+
+
+def application_key(application):
+    return key_of(application.vacancy_id, application.applied_date, application.status)
+
+
+def adjust(deltas):
+    """Apply {(vacancy id, date, status): change in count}."""
+    for (vacancy_id, date, status), delta in deltas.items():
+        if not delta:
+            continue
+        rows = ApplicationDailyStats.objects.filter(vacancy_id=vacancy_id, date=date, status=status)
+        # Never create a row to decrement: the vacancy may be mid-delete
+        if rows.update(count=Greatest(F('count') + delta, Value(0))) or delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                ApplicationDailyStats.objects.create(vacancy_id=vacancy_id, date=date, status=status, count=delta)
+        except IntegrityError:  # another writer created it first
+            rows.update(count=F('count') + delta)
+
+
+def record_created(applications):
+    adjust(Counter(application_key(application) for application in applications))
+
+
+def previous_key(instance):
+    """The row's key in the database before this save, if it has one."""
+    if instance.pk is None:
+        return None
+    row = Application.objects.filter(pk=instance.pk).values('vacancy_id', 'applied_date', 'status').first()
+    return key_of(**row) if row else None
+
+
+def record_save(instance, previous):
+    current = application_key(instance)
+    if current != previous:
+        deltas = {current: 1}
+        if previous is not None:
+            deltas[previous] = -1
+        adjust(deltas)
+
+
+def record_delete(instance):
+    adjust({application_key(instance): -1})
+
+
+def actual_counts():
+    """{(vacancy id, date, status): count} computed from Application."""
+    rows = (
+        Application.objects.order_by()
+        .annotate(date=TruncDate('applied_date', tzinfo=timezone.get_current_timezone()))
+        .values('vacancy_id', 'date', 'status').annotate(total=Count('pk'))
+    )
+    return {(row['vacancy_id'], row['date'], row['status']): row['total'] for row in rows}
+
+
+def rebuild(batch_size=500):
+    """Recompute the table from Application; returns the rows fixed."""
+    actual = actual_counts()
+    stored = {
+        (row.vacancy_id, row.date, row.status): row
+        for row in ApplicationDailyStats.objects.all()
+    }
+    drifted = [
+        key for key in actual.keys() | stored.keys()
+        if actual.get(key, 0) != (stored[key].count if key in stored else 0)
+    ]
+    ApplicationDailyStats.objects.filter(pk__in=[stored[key].pk for key in drifted if key in stored]).delete()
+    ApplicationDailyStats.objects.bulk_create(
+        [
+            ApplicationDailyStats(vacancy_id=key[0], date=key[1], status=key[2], count=actual[key])
+            for key in drifted if actual.get(key)
+        ],
+        batch_size=batch_size,
+    )
+    return len(drifted)
+
+
+# ----------------------------
+# Dashboard queries
+# ----------------------------
+def status_counts(vacancies):
+    """{vacancy id: {status: applications}} for a Vacancy queryset."""
+    counts = {}
+    rows = (
+        ApplicationDailyStats.objects.filter(vacancy__in=vacancies).order_by()
+        .values('vacancy_id', 'status').annotate(total=Sum('count'))
+    )
+    for row in rows:
+        counts.setdefault(row['vacancy_id'], {})[row['status']] = row['total']
+    return counts
+
+
+def daily_counts(vacancies, days, today=None):
+    """[(date, applications)] for the last ``days`` days up to ``today``,
+    oldest first, including days without any."""
+    today = today or timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    totals = dict(
+        ApplicationDailyStats.objects.filter(vacancy__in=vacancies, date__range=(start, today)).order_by()
+        .values('date').annotate(total=Sum('count')).values_list('date', 'total')
+    )
+    return [(start + timedelta(days=n), totals.get(start + timedelta(days=n), 0)) for n in range(days)]
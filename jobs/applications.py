@@ -0,0 +1,168 @@
+import logging
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+
+from . import application_stats, counters
+from .models import Application
+from .ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------
+# Application submission
+# ----------------------------
+# submit() hands an application to this process's write queue and waits
+# for it to be written. One writer thread drains the queue: whatever
+# piled up while it was writing the previous batch (up to
+# JOBS_APPLICATION_BATCH_SIZE) goes in with one bulk_create in one
+# transaction, so a burst of submissions to a featured vacancy costs one
+# SQLite write lock and fsync per batch rather than per request, and a
+# lone submission is written straight away. (vacancy, job_seeker) is
+# unique: submitting again returns the existing application, also when
+# the duplicate is in the same batch or another process wrote it first.
+# bulk_create skips signals, so the denormalized counters and the daily
+# stats are bumped here. JOBS_APPLICATION_QUEUE = False writes in the
+# calling thread instead (tests).
+
+def batch_size():
+    return getattr(settings, 'JOBS_APPLICATION_BATCH_SIZE', 50)
+
+
+def submit_timeout():
+    return getattr(settings, 'JOBS_APPLICATION_TIMEOUT', 10)
+
+
+def apply_bucket():
+    """Per-user limit on new applications."""
+    return TokenBucket(
+        'apply',
+        getattr(settings, 'JOBS_APPLY_BURST', 5),
+        getattr(settings, 'JOBS_APPLY_REFILL_SECONDS', 60),
+    )
+
+
+class Submission:
+    def __init__(self, vacancy_id, job_seeker_id, cover_letter=''):
+        self.vacancy_id = vacancy_id
+        self.job_seeker_id = job_seeker_id
+        self.cover_letter = cover_letter
+        self.future = Future()  # -> (Application, created)
+
+    @property
+    def key(self):
+        return (self.vacancy_id, self.job_seeker_id)
+
+
+def _existing(keys):
+    applications = Application.objects.filter(
+        vacancy_id__in={vacancy for vacancy, _ in keys},
+        job_seeker_id__in={seeker for _, seeker in keys},
+    )
+    return {(a.vacancy_id, a.job_seeker_id): a for a in applications if (a.vacancy_id, a.job_seeker_id) in keys}
+
+
+def _insert(applications):
+    """bulk_create ``applications``; if another process got some of them
+    in first, fall back to one savepoint each. Returns those inserted."""
+    try:
+        with transaction.atomic():
+            return Application.objects.bulk_create(applications)
+    except IntegrityError:
+        inserted = []
+        for application in applications:
+            try:
+                with transaction.atomic():
+                    inserted += Application.objects.bulk_create([application])
+            except IntegrityError:
+                pass
+        return inserted
+
+
+def write_batch(submissions):
+    """Write a batch and resolve each submission's future."""
+    keys = {submission.key for submission in submissions}
+    try:
+        with transaction.atomic():
+            found = _existing(keys)
+            new = {}
+            for submission in submissions:
+                if submission.key not in found and submission.key not in new:
+                    new[submission.key] = Application(
+                        vacancy_id=submission.vacancy_id,
+                        job_seeker_id=submission.job_seeker_id,
+                        cover_letter=submission.cover_letter,
+                    )
+            inserted = _insert(list(new.values()))
+            for parent, field, fk in counters.counters_for(Application):
+                for pk, added in Counter(getattr(a, f'{fk}_id') for a in inserted).items():
+                    counters.adjust(parent, field, pk, added)
+            application_stats.record_created(inserted)
+            lost = keys - found.keys() - {(a.vacancy_id, a.job_seeker_id) for a in inserted}
+            if lost:
+                found.update(_existing(lost))
+    except Exception as e:
+        for submission in submissions:
+            submission.future.set_exception(e)
+        raise
+
+    created = {(a.vacancy_id, a.job_seeker_id): a for a in inserted}
+    for submission in submissions:
+        application = created.pop(submission.key, None)  # only its first submission created it
+        if application is not None:
+            submission.future.set_result((application, True))
+        else:
+            submission.future.set_result((found.get(submission.key) or new[submission.key], False))
+
+
+class WriteQueue:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, submission):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='application-writer', daemon=True)
+                self._thread.start()
+        self._queue.put(submission)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < batch_size():
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            close_old_connections()
+            try:
+                write_batch(batch)
+            except Exception:
+                logger.exception('Writing %s applications failed', len(batch))
+            finally:
+                close_old_connections()
+
+
+_write_queue = WriteQueue()
+
+
+def submit(vacancy_id, job_seeker_id, cover_letter=''):
+    """Apply ``job_seeker_id`` to ``vacancy_id``. Returns (Application,
+    created); raises TimeoutError if the write queue is backed up."""
+    submission = Submission(vacancy_id, job_seeker_id, cover_letter)
+    if not getattr(settings, 'JOBS_APPLICATION_QUEUE', True):
+        write_batch([submission])
+    else:
+        _write_queue.put(submission)
+    return submission.future.result(timeout=submit_timeout())
@@ -0,0 +1,136 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from . import cache, imaging
+from .models import Vacancy
+from .storage import is_blob_name
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------
+# Attachment derivatives
+# ----------------------------
+# Uploaded job cards are rendered into a first-page PNG (PDFs only) and
+# fixed-size WebP/JPEG thumbnails by a local process pool, so neither the
+# upload request nor list pages pay for it. JOBS_ATTACHMENT_WORKERS = 0
+# renders inline instead (used by tests and `manage.py process_attachments`).
+
+DERIVATIVE_SUFFIXES = {
+    'page_preview': '.page1.png',
+    'thumbnail_webp': '.thumb.webp',
+    'thumbnail_jpeg': '.thumb.jpg',
+}
+
+_executor = None
+
+
+def _workers():
+    return getattr(settings, 'JOBS_ATTACHMENT_WORKERS', 2)
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        # spawn, not fork: the parent holds DB connections and threads
+        _executor = ProcessPoolExecutor(
+            max_workers=_workers(), mp_context=multiprocessing.get_context('spawn')
+        )
+    return _executor
+
+
+def derivative_names(attachment_name):
+    base, _ = os.path.splitext(attachment_name)
+    return {field: base + suffix for field, suffix in DERIVATIVE_SUFFIXES.items()}
+
+
+def _render_args(vacancy):
+    storage = vacancy.attachment.storage
+    targets = {
+        field: storage.path(name)
+        for field, name in derivative_names(vacancy.attachment.name).items()
+    }
+    return storage.path(vacancy.attachment.name), targets
+
+
+def _store(pk, source_name, written):
+    names = derivative_names(source_name)
+    fields = {field: (names[field] if field in written else '') for field in DERIVATIVE_SUFFIXES}
+    # Guarded on the attachment so a result for a since-replaced upload is dropped
+    updated = Vacancy.objects.filter(pk=pk, attachment=source_name).update(
+        derivatives_source=source_name, updated_at=timezone.now(), **fields
+    )
+    if updated:
+        cache.invalidate('vacancies')
+
+
+def _on_rendered(pk, source_name, future):
+    # Runs on the executor's callback thread, which has its own DB connection
+    close_old_connections()
+    try:
+        _store(pk, source_name, future.result())
+    except Exception:
+        logger.exception('Rendering attachment derivatives failed for vacancy %s', pk)
+    finally:
+        close_old_connections()
+
+
+def process_now(vacancy):
+    """Render and store derivatives for one vacancy in this process."""
+    source, targets = _render_args(vacancy)
+    _store(vacancy.pk, vacancy.attachment.name, imaging.render_derivatives(source, targets))
+
+
+def schedule(vacancy):
+    """Queue derivative rendering once the current transaction commits."""
+    if _workers() == 0:
+        def render_inline():
+            try:
+                process_now(vacancy)
+            except Exception:
+                logger.exception('Rendering attachment derivatives failed for vacancy %s', vacancy.pk)
+        transaction.on_commit(render_inline)
+        return
+
+    def submit():
+        source, targets = _render_args(vacancy)
+        future = get_executor().submit(imaging.render_derivatives, source, targets)
+        future.add_done_callback(partial(_on_rendered, vacancy.pk, vacancy.attachment.name))
+    transaction.on_commit(submit)
+
+
+def delete_derivatives(vacancy):
+    if is_blob_name(vacancy.derivatives_source):
+        return  # shared with every vacancy using the blob; removed with it
+    for field in DERIVATIVE_SUFFIXES:
+        derivative = getattr(vacancy, field)
+        if derivative.name:
+            derivative.storage.delete(derivative.name)
+
+
+def attachment_changed(vacancy):
+    """Queue or clear derivatives after a save; called from jobs/signals.py."""
+    if vacancy.attachment and vacancy.attachment.name != vacancy.derivatives_source:
+        if vacancy.derivatives_source:
+            delete_derivatives(vacancy)
+        # A deduplicated upload may already have been rendered for another vacancy
+        rendered = Vacancy.objects.filter(derivatives_source=vacancy.attachment.name).exclude(pk=vacancy.pk)
+        fields = rendered.values('derivatives_source', *DERIVATIVE_SUFFIXES).first()
+        if fields:
+            Vacancy.objects.filter(pk=vacancy.pk).update(updated_at=timezone.now(), **fields)
+            cache.invalidate('vacancies')
+            return
+        schedule(vacancy)
+    elif not vacancy.attachment and vacancy.derivatives_source:
+        delete_derivatives(vacancy)
+        Vacancy.objects.filter(pk=vacancy.pk).update(
+            derivatives_source='', updated_at=timezone.now(), **{field: '' for field in DERIVATIVE_SUFFIXES}
+        )
+        cache.invalidate('vacancies')
@@ -0,0 +1,172 @@
+import hashlib
+import time
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.http import HttpResponse
+
+
+# ----------------------------
+# Public page cache
+# ----------------------------
+# Rendered pages for anonymous visitors are stored in the cache named by
+# JOBS_PAGE_CACHE (see CACHES in settings.py; TTL and LRU eviction come
+# from the backend's TIMEOUT / MAX_ENTRIES). Every page depends on one or
+# more namespaces, e.g. "vacancies" or "advisory-category:3". Each
+# namespace has a generation number that is part of the cache key, so
+# bumping it from a signal (jobs/signals.py) makes exactly the dependent
+# pages miss without having to know their keys.
+
+def page_cache():
+    return caches[getattr(settings, 'JOBS_PAGE_CACHE', 'default')]
+
+
+def _generation_key(namespace):
+    return f'jobs:gen:{namespace}'
+
+
+def _generations(namespaces):
+    cache = page_cache()
+    keys = [_generation_key(namespace) for namespace in namespaces]
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        # A fresh, never-before-used generation, so an evicted counter
+        # can't bring back pages cached under an old one.
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return [str(found[key]) for key in keys]
+
+
+def invalidate(*namespaces):
+    cache = page_cache()
+    for namespace in namespaces:
+        key = _generation_key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def cached_value(key, namespaces, compute, timeout=DEFAULT_TIMEOUT):
+    """``compute()``, kept in the page cache until one of ``namespaces``
+    is invalidated. Falsy results are cached too."""
+    full_key = f'jobs:value:{key}:' + '.'.join(_generations(namespaces))
+    cached = page_cache().get(full_key)
+    if cached is not None:
+        return cached[0]
+    value = compute()
+    page_cache().set(full_key, (value,), timeout)
+    return value
+
+
+def _page_key(view, request, namespaces, kwargs):
+    resolved = [ns(kwargs) if callable(ns) else ns for ns in namespaces]
+    path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'jobs:page:{view.__name__}:{path_hash}:' + '.'.join(_generations(resolved))
+
+
+def _cached_response(key):
+    cached = page_cache().get(key)
+    if cached is None:
+        return None
+    content, content_type, *impressions = cached
+    response = HttpResponse(content, content_type=content_type)
+    # The vacancies the page lists, for traffic.count_impressions
+    response.vacancy_impressions = impressions[0] if impressions else ()
+    return response
+
+
+def _store_response(key, response):
+    if response.status_code == 200 and not response.cookies and not getattr(response, 'streaming', False):
+        impressions = tuple(getattr(response, 'vacancy_impressions', ()))
+        page_cache().set(key, (response.content, response['Content-Type'], impressions))
+
+
+def cache_public_page(*namespaces):
+    """Cache a GET view's response for anonymous visitors.
+
+    ``namespaces`` are strings, or callables taking the view kwargs and
+    returning a string for per-object pages, e.g.
+    ``lambda kwargs: f"advisory-article:{kwargs['article_id']}"``.
+    Works on sync and async views.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                user = await request.auser()
+                if request.method not in ('GET', 'HEAD') or user.is_authenticated:
+                    return await view(request, *args, **kwargs)
+                # Cache calls stay synchronous: the configured backends are
+                # in-memory, and their async API only moves them to a thread.
+                key = _page_key(view, request, namespaces, kwargs)
+                response = _cached_response(key)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                    _store_response(key, response)
+                return response
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            key = _page_key(view, request, namespaces, kwargs)
+            response = _cached_response(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                _store_response(key, response)
+            return response
+        return wrapper
+    return decorator
+
+
+# ----------------------------
+# Rendered vacancy cards
+# ----------------------------
+# Listings show the same cards in different orders and filters, so each
+# card is rendered once and kept in JOBS_FRAGMENT_CACHE under its pk and
+# updated_at (bumped by save(), and explicitly by the bulk writes that
+# change what a card shows). An edit makes the old key unreachable rather
+# than invalidating it. Cards must not show anything that changes on its
+# own, like their age: timeline_card.html renders the posting time in a
+# <time> element that partials/timesince_script.html turns into "3 hours
+# ago" in the browser. invalidate('cards') drops every card, e.g. after
+# changing a card template on a shared cache.
+
+def fragment_cache():
+    return caches[getattr(settings, 'JOBS_FRAGMENT_CACHE', getattr(settings, 'JOBS_PAGE_CACHE', 'default'))]
+
+
+def _card_key(obj, template_name, generation, vary):
+    parts = [template_name, generation, obj.updated_at.isoformat(), *map(str, vary)]
+    digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+    return f'jobs:card:{obj.pk}:{digest}'
+
+
+def render_cards(objects, template_name, render, vary=()):
+    """Concatenated card HTML for ``objects``, in order.
+
+    One get_many for the whole list; ``render(obj)`` is only called for the
+    cards that are not cached yet. ``vary`` adds anything else the template
+    depends on (e.g. the viewer) to every key.
+    """
+    objects = list(objects)
+    if not objects:
+        return ''
+    generation, = _generations(['cards'])
+    keys = [_card_key(obj, template_name, generation, vary) for obj in objects]
+
+    cache = fragment_cache()
+    found = cache.get_many(keys)
+    missing = {}
+    for key, obj in zip(keys, objects):
+        if key not in found:
+            missing[key] = found[key] = str(render(obj))
+    if missing:
+        cache.set_many(missing)
+    return ''.join(found[key] for key in keys)
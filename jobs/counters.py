@@ -0,0 +1,95 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import (
+    Vacancy, JobSeeker, Application,
+    AdvisoryCategory, AdvisoryArticle,
+    ReferralPartner, ReferralRequest
+)
+
+
+# ----------------------------
+# Denormalized counters
+# ----------------------------
+# (parent model, counter field, child model, child FK to the parent).
+# The counters are bumped with F() expressions from jobs/signals.py, so
+# concurrent writers never read-modify-write (and full saves leave them
+# alone, see CounterFieldsMixin), and `manage.py recount`
+# repairs any drift (e.g. after bulk_create or raw SQL, which skip signals).
+COUNTERS = [
+    (Vacancy, 'application_count', Application, 'vacancy'),
+    (JobSeeker, 'application_count', Application, 'job_seeker'),
+    (JobSeeker, 'referral_count', ReferralRequest, 'job_seeker'),
+    (ReferralPartner, 'referral_count', ReferralRequest, 'partner'),
+    (AdvisoryCategory, 'article_count', AdvisoryArticle, 'category'),
+]
+
+
+def counters_for(child_model):
+    return [(parent, field, fk) for parent, field, child, fk in COUNTERS if child is child_model]
+
+
+def adjust(parent_model, field, pk, delta):
+    if pk is None or not delta:
+        return
+    parent_model.objects.filter(pk=pk).update(
+        **{field: Greatest(F(field) + delta, Value(0))}
+    )
+
+
+def previous_parents(instance):
+    """FK ids the row had in the database before this save, per counter."""
+    fks = [fk for _, _, fk in counters_for(type(instance))]
+    if not fks or instance.pk is None:
+        return {}
+    row = type(instance).objects.filter(pk=instance.pk).values(*[f'{fk}_id' for fk in fks]).first()
+    return {fk: row[f'{fk}_id'] for fk in fks} if row else {}
+
+
+def record_save(instance, created, previous):
+    for parent, field, fk in counters_for(type(instance)):
+        current = getattr(instance, f'{fk}_id')
+        if created:
+            adjust(parent, field, current, +1)
+        elif previous.get(fk) != current:
+            adjust(parent, field, previous.get(fk), -1)
+            adjust(parent, field, current, +1)
+
+
+def record_delete(instance):
+    for parent, field, fk in counters_for(type(instance)):
+        adjust(parent, field, getattr(instance, f'{fk}_id'), -1)
+
+
+def actual_count(child_model, fk):
+    return Coalesce(
+        Subquery(
+            child_model.objects.filter(**{fk: OuterRef('pk')})
+            .order_by().values(fk).annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def recount():
+    """Recompute every counter; returns {"Model.field": rows fixed}."""
+    fixed = {}
+    for parent, field, child, fk in COUNTERS:
+        drifted = parent.objects.annotate(actual=actual_count(child, fk)).exclude(**{field: F('actual')})
+        fixed[f'{parent.__name__}.{field}'] = parent.objects.filter(
+            pk__in=drifted.values('pk')
+        ).update(**{field: actual_count(child, fk)})
+    return fixed
+
+
+def recount_reading_stats(batch_size=500):
+    """Recompute AdvisoryArticle.word_count/read_minutes; returns rows fixed."""
+    changed = []
+    for article in AdvisoryArticle.objects.only('id', 'content', 'word_count', 'read_minutes').iterator(chunk_size=batch_size):
+        stats = AdvisoryArticle.reading_stats(article.content)
+        if stats != (article.word_count, article.read_minutes):
+            article.word_count, article.read_minutes = stats
+            changed.append(article)
+    AdvisoryArticle.objects.bulk_update(changed, ['word_count', 'read_minutes'], batch_size=batch_size)
+    return len(changed)
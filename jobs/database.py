@@ -0,0 +1,83 @@
+import os
+
+from django.conf import settings
+
+
+# ----------------------------
+# SQLite tuning
+# ----------------------------
+# Every new SQLite connection gets the PRAGMAs below, merged with
+# JOBS_SQLITE_PRAGMAS (jobs/signals.py connects configure_connection to
+# connection_created). WAL lets readers and the one writer work at the
+# same time; synchronous=NORMAL is safe in WAL mode (a power cut may lose
+# the last commits, never corrupt the file) and saves an fsync per
+# commit; busy_timeout makes a writer wait for the lock instead of
+# failing with "database is locked". With persistent connections
+# (CONN_MAX_AGE) this runs once per connection, not per request. The
+# settings also start transactions IMMEDIATE, so a transaction that
+# would write takes the lock up front rather than failing to upgrade
+# from a read lock. `manage.py db_health` reports the result.
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,  # ms
+    'cache_size': -64000,  # negative: KiB, i.e. ~64 MB per connection
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+    # Truncate the WAL back to this size after a checkpoint resets it
+    'journal_size_limit': 64 * 1024 * 1024,
+}
+
+# Reported by db_health; journal_mode is persistent, the rest are per
+# connection
+REPORTED_PRAGMAS = ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size', 'page_size')
+
+
+def sqlite_pragmas():
+    return {**DEFAULT_PRAGMAS, **getattr(settings, 'JOBS_SQLITE_PRAGMAS', {})}
+
+
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = sqlite_pragmas()
+    if connection.is_in_memory_db():
+        pragmas.pop('journal_mode', None)  # in-memory databases have no journal file
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def _pragma(cursor, name):
+    cursor.execute(f'PRAGMA {name}')
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def health(connection, checkpoint='PASSIVE'):
+    """Settings and file sizes of a SQLite connection's database, and the
+    result of a ``checkpoint`` WAL checkpoint (PASSIVE never blocks)."""
+    name = str(connection.settings_dict['NAME'])
+    in_memory = connection.is_in_memory_db()
+    with connection.cursor() as cursor:
+        report = {pragma: _pragma(cursor, pragma) for pragma in REPORTED_PRAGMAS}
+        report['page_count'] = _pragma(cursor, 'page_count')
+        report['freelist_count'] = _pragma(cursor, 'freelist_count')
+        report['in_memory'] = in_memory
+        report['database_bytes'] = 0 if in_memory else _size(name)
+        report['wal_bytes'] = 0 if in_memory else _size(f'{name}-wal')
+        report['checkpoint'] = None
+        if report['journal_mode'] == 'wal':
+            cursor.execute(f'PRAGMA wal_checkpoint({checkpoint})')
+            busy, wal_frames, checkpointed = cursor.fetchone()
+            report['checkpoint'] = {'busy': bool(busy), 'wal_frames': wal_frames, 'checkpointed': checkpointed}
+            report['wal_bytes_after'] = _size(f'{name}-wal')
+    return report
@@ -0,0 +1,129 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import cache, match_store, storage
+from .models import Application, ArchivedApplication, ArchivedVacancy, Vacancy
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------
+# Vacancy expiry
+# ----------------------------
+# Active vacancies whose closing_date has passed are deactivated, and
+# vacancies deactivated (Vacancy.closed_at) over JOBS_ARCHIVE_AFTER_DAYS
+# ago are moved, with their applications, to the archive tables, so the live
+# tables and their indexes only hold rows the site still shows. Both run
+# in batches of JOBS_EXPIRY_BATCH_SIZE rows, one transaction each, from
+# `manage.py expire_vacancies` (cron) or, with JOBS_EXPIRY_INTERVAL set,
+# from a thread in each web process (see jobs/periodic.py).
+# Either is safe to run concurrently: a batch only touches rows that
+# still match, and a batch that loses a race to archive rolls back.
+
+# Columns copied to ArchivedVacancy's own fields; the rest go into ``data``
+ARCHIVED_VACANCY_FIELDS = (
+    'title', 'company', 'location', 'posted_date', 'closing_date', 'attachment', 'application_count',
+)
+ARCHIVED_APPLICATION_FIELDS = ('vacancy_id', 'job_seeker_id', 'applied_date', 'status', 'cover_letter')
+
+
+def batch_size():
+    return getattr(settings, 'JOBS_EXPIRY_BATCH_SIZE', 500)
+
+
+def archive_after_days():
+    return getattr(settings, 'JOBS_ARCHIVE_AFTER_DAYS', 90)
+
+
+def expired_vacancies(today=None):
+    return Vacancy.objects.filter(is_active=True, closing_date__lt=today or timezone.localdate())
+
+
+def archivable_vacancies(days=None):
+    cutoff = timezone.now() - timedelta(days=archive_after_days() if days is None else days)
+    return Vacancy.objects.filter(is_active=False, closed_at__lt=cutoff)
+
+
+def expire(today=None, size=None):
+    """Deactivate active vacancies closed before ``today``. Returns the
+    number deactivated."""
+    expired = expired_vacancies(today)
+    total = 0
+    while True:
+        with transaction.atomic():
+            pks = list(expired.order_by('closing_date').values_list('pk', flat=True)[:size or batch_size()])
+            if not pks:
+                break
+            now = timezone.now()
+            total += Vacancy.objects.filter(pk__in=pks, is_active=True).update(
+                is_active=False, closed_at=now, updated_at=now
+            )
+            match_store.update_later('vacancies', pks)
+    if total:
+        cache.invalidate('vacancies')
+    return total
+
+
+def _archive_batch(pks):
+    vacancy_fields = [field.attname for field in Vacancy._meta.concrete_fields]
+    rows = Vacancy.objects.filter(pk__in=pks, is_active=False).values(*vacancy_fields)
+    vacancies = []
+    for row in rows:
+        own = {name: row.pop(name) for name in ('id', *ARCHIVED_VACANCY_FIELDS)}
+        vacancies.append(ArchivedVacancy(**own, data=row))
+    applications = [
+        ArchivedApplication(**row)
+        for row in Application.objects.filter(vacancy_id__in=pks).values('id', *ARCHIVED_APPLICATION_FIELDS)
+    ]
+    ArchivedVacancy.objects.bulk_create(vacancies)
+    ArchivedApplication.objects.bulk_create(applications)
+    # bulk_create skips the signals that count blob references; deleting
+    # the vacancy below drops its reference
+    for vacancy in vacancies:
+        storage.add_reference(vacancy.attachment.name or '')
+    # Deletes one at a time through the ORM, so signals clean up after it
+    Vacancy.objects.filter(pk__in=[vacancy.id for vacancy in vacancies]).delete()
+    return len(vacancies), len(applications)
+
+
+def archive(days=None, size=None):
+    """Move vacancies deactivated over ``days`` days ago, and their
+    applications, to the archive. Returns (vacancies, applications)."""
+    archivable = archivable_vacancies(days)
+    vacancies = applications = 0
+    while True:
+        with transaction.atomic():
+            pks = list(archivable.order_by('closed_at').values_list('pk', flat=True)[:size or batch_size()])
+            if not pks:
+                break
+            archived = _archive_batch(pks)
+        vacancies += archived[0]
+        applications += archived[1]
+    if vacancies:
+        cache.invalidate('vacancies')
+    return vacancies, applications
+
+
+def sweep():
+    """expire() then archive(); what the periodic job runs."""
+    expired = expire()
+    archived, applications = archive()
+    if expired or archived:
+        logger.info(
+            'Deactivated %s expired vacancies; archived %s vacancies and %s applications',
+            expired, archived, applications,
+        )
+    return expired, archived, applications
+
+
+# ----------------------------
+# In-process runner
+# ----------------------------
+def sweep_interval():
+    """Seconds between sweeps in each web process (jobs/periodic.py); 0
+    disables them."""
+    return getattr(settings, 'JOBS_EXPIRY_INTERVAL', 0)
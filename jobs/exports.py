@@ -0,0 +1,281 @@
+import csv
+import json
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.views.main import ERROR_FLAG, IGNORED_PARAMS as CHANGELIST_PARAMS, PAGE_VAR
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from .models import Application, ReferralRequest, Vacancy
+
+try:
+    import pyarrow  # optional: only needed for Parquet exports
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+# ----------------------------
+# Streaming exports
+# ----------------------------
+# Every export is a values_list() read with iterator(chunk_size), turned
+# into CSV, JSON Lines or Parquet a row (or, for Parquet, a row group) at
+# a time, so memory use does not grow with the number of rows. Filters
+# are the admin changelist's: the fields in the ModelAdmin's list_filter
+# (with the same lookups the admin puts in the query string) plus its
+# search box, so an export link can simply pass the changelist's GET
+# parameters through. Used by the admin "Export" links and by
+# `manage.py export_data`.
+
+# name -> (model, [(column, values() lookup)])
+DATASETS = {
+    'vacancies': (Vacancy, [
+        ('id', 'id'),
+        ('title', 'title'),
+        ('company', 'company'),
+        ('location', 'location'),
+        ('job_type', 'job_type'),
+        ('salary', 'salary'),
+        ('salary_min', 'salary_min'),
+        ('salary_max', 'salary_max'),
+        ('currency', 'currency'),
+        ('salary_period', 'salary_period'),
+        ('salary_min_zar_annual', 'salary_min_zar_annual'),
+        ('salary_max_zar_annual', 'salary_max_zar_annual'),
+        ('is_featured', 'is_featured'),
+        ('is_active', 'is_active'),
+        ('is_upload_only', 'is_upload_only'),
+        ('posted_date', 'posted_date'),
+        ('closing_date', 'closing_date'),
+        ('application_count', 'application_count'),
+        ('import_source', 'import_source'),
+        ('external_id', 'external_id'),
+    ]),
+    'applications': (Application, [
+        ('id', 'id'),
+        ('vacancy_id', 'vacancy'),
+        ('vacancy_title', 'vacancy__title'),
+        ('vacancy_company', 'vacancy__company'),
+        ('job_seeker_id', 'job_seeker'),
+        ('username', 'job_seeker__user__username'),
+        ('email', 'job_seeker__user__email'),
+        ('status', 'status'),
+        ('applied_date', 'applied_date'),
+    ]),
+    'referrals': (ReferralRequest, [
+        ('id', 'id'),
+        ('job_seeker_id', 'job_seeker'),
+        ('username', 'job_seeker__user__username'),
+        ('partner_id', 'partner'),
+        ('partner_name', 'partner__name'),
+        ('partner_category', 'partner__category'),
+        ('status', 'status'),
+        ('requested_date', 'requested_date'),
+        ('reason', 'reason'),
+        ('notes', 'notes'),
+    ]),
+}
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+# Lookups the admin's list filters and date hierarchy put in the query string
+FILTER_LOOKUPS = ('exact', 'gte', 'gt', 'lte', 'lt', 'isnull', 'year', 'month', 'day')
+# Changelist parameters that don't filter: ordering, page, "show all",
+# search (export_view passes it separately), "show counts", popup and
+# to_field state, the invalid-filter flag and the preserved filters
+IGNORED_PARAMS = (*CHANGELIST_PARAMS, PAGE_VAR, ERROR_FLAG, '_changelist_filters')
+
+PARQUET_ROW_GROUP_SIZE = 50_000
+
+
+def chunk_size():
+    return getattr(settings, 'JOBS_EXPORT_CHUNK_SIZE', 2000)
+
+
+def available_formats():
+    return [fmt for fmt in FORMATS if fmt != 'parquet' or pyarrow is not None]
+
+
+def dataset_for_model(model):
+    for name, (dataset_model, _) in DATASETS.items():
+        if dataset_model is model:
+            return name
+    return None
+
+
+def _filter_fields(model):
+    model_admin = admin.site.get_model_admin(model)
+    return [name for name in model_admin.list_filter if isinstance(name, str)]
+
+
+def export_queryset(dataset, params=None, search=''):
+    """values_list() queryset for ``dataset`` filtered like its changelist.
+
+    ``params`` is a mapping of admin filter parameters, e.g.
+    ``{'status__exact': 'pending', 'applied_date__gte': '2026-01-01'}``.
+    Raises ValueError for a parameter the admin would not accept.
+    """
+    model, columns = DATASETS[dataset]
+    queryset = model.objects.order_by('pk')
+    fields = _filter_fields(model)
+
+    filters = {}
+    for key, value in (params or {}).items():
+        if key in IGNORED_PARAMS:
+            continue
+        if key in fields:
+            field, lookup = key, 'exact'
+        else:
+            field, _, lookup = key.rpartition('__')
+        if field not in fields or lookup not in FILTER_LOOKUPS:
+            raise ValueError(f'Unknown filter {key!r}; filterable fields are {", ".join(fields)}.')
+        if lookup == 'isnull':
+            value = value in ('1', 'True', 'true')
+        filters[key] = value
+    try:
+        queryset = queryset.filter(**filters)
+    except (ValidationError, ValueError) as e:
+        raise ValueError(f'Invalid filter value: {e}')
+
+    if search:
+        model_admin = admin.site.get_model_admin(model)
+        queryset, _ = model_admin.get_search_results(None, queryset, search)
+    return queryset.values_list(*(lookup for _, lookup in columns))
+
+
+def _rows(queryset):
+    return queryset.iterator(chunk_size=chunk_size())
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def csv_stream(dataset, queryset):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in DATASETS[dataset][1]])
+    for row in _rows(queryset):
+        yield writer.writerow(row)
+
+
+def jsonl_stream(dataset, queryset):
+    names = [name for name, _ in DATASETS[dataset][1]]
+    for row in _rows(queryset):
+        yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+# ----------------------------
+# Parquet
+# ----------------------------
+def _resolve_field(model, lookup):
+    field = None
+    for part in lookup.split('__'):
+        field = model._meta.get_field(part)
+        if field.is_relation:
+            model = field.related_model
+    if field.is_relation:
+        field = field.target_field
+    return field
+
+
+def _arrow_type(field):
+    if isinstance(field, models.BooleanField):
+        return pyarrow.bool_()
+    if isinstance(field, (models.AutoField, models.IntegerField)):
+        return pyarrow.int64()
+    if isinstance(field, models.DecimalField):
+        return pyarrow.decimal128(field.max_digits, field.decimal_places)
+    if isinstance(field, models.DateTimeField):
+        return pyarrow.timestamp('us', tz='UTC' if settings.USE_TZ else None)
+    if isinstance(field, models.DateField):
+        return pyarrow.date32()
+    return pyarrow.string()
+
+
+def parquet_schema(dataset):
+    model, columns = DATASETS[dataset]
+    return pyarrow.schema([
+        (name, _arrow_type(_resolve_field(model, lookup))) for name, lookup in columns
+    ])
+
+
+class _ChunkSink:
+    """Write-only file that collects bytes until they are drained."""
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def parquet_stream(dataset, queryset, row_group_size=PARQUET_ROW_GROUP_SIZE):
+    """One Parquet row group per ``row_group_size`` rows, yielded as bytes
+    as soon as it is written."""
+    if pyarrow is None:
+        raise ValueError('Parquet export needs the pyarrow package.')
+    schema = parquet_schema(dataset)
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema, compression='snappy')
+
+    def write(rows):
+        columns = list(zip(*rows))
+        writer.write_table(pyarrow.Table.from_arrays(
+            [pyarrow.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema,
+        ))
+        return sink.drain()
+
+    rows = []
+    for row in _rows(queryset):
+        rows.append(row)
+        if len(rows) >= row_group_size:
+            yield write(rows)
+            rows = []
+    if rows:
+        yield write(rows)
+    writer.close()
+    yield sink.drain()
+
+
+STREAMS = {
+    'csv': csv_stream,
+    'jsonl': jsonl_stream,
+    'parquet': parquet_stream,
+}
+
+
+def export_stream(dataset, fmt, params=None, search=''):
+    """Iterator of str (csv, jsonl) or bytes (parquet) chunks."""
+    if fmt not in available_formats():
+        raise ValueError(f'Unsupported export format {fmt!r}; use one of {", ".join(available_formats())}.')
+    queryset = export_queryset(dataset, params, search)
+    return STREAMS[fmt](dataset, queryset)
@@ -0,0 +1,162 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BooleanField, Case, ExpressionWrapper, F, Q, Value, When
+from django.utils import timezone
+
+from accounts.models import EmployerProfile
+
+from . import cache, live, traffic
+from .models import Vacancy
+
+
+# ----------------------------
+# Featured vacancies
+# ----------------------------
+# recompute() scores every active vacancy and features the best
+# JOBS_FEATURED_COUNT, at most JOBS_FEATURED_PER_COMPANY per company,
+# with one UPDATE of just the rows that change. The score adds up, by
+# WEIGHTS: how new it is, how soon it closes, its applications per day
+# and recent views (relative to the best of all active vacancies; see
+# jobs/traffic.py), and whether its company is an approved employer.
+# Slots rotate: a vacancy keeps its slot for at most
+# JOBS_FEATURED_ROTATION_HOURS, then rests as long before it can be
+# featured again, unless there are not enough other candidates. Run by
+# `manage.py feature_vacancies` (cron) or, with JOBS_FEATURING_INTERVAL
+# set, from a thread in each web process (see jobs/periodic.py); runs
+# are idempotent, so several processes can share the job. home reads the featured list through featured_vacancies(),
+# cached until the vacancies change.
+
+WEIGHTS = {
+    'freshness': 3,
+    'urgency': 2,
+    'applications': 2,
+    'views': 2,
+    'approved': 1,
+}
+FRESHNESS_HALF_LIFE_DAYS = 7
+URGENCY_DAYS = 14  # closing within this many days adds urgency
+VIEW_CANDIDATES = 500  # trending vacancies considered for the views score
+
+
+def featured_count():
+    return getattr(settings, 'JOBS_FEATURED_COUNT', 6)
+
+
+def per_company():
+    return getattr(settings, 'JOBS_FEATURED_PER_COMPANY', 2)
+
+
+def rotation_hours():
+    return getattr(settings, 'JOBS_FEATURED_ROTATION_HOURS', 24)
+
+
+def urgency(closing_date, today):
+    if closing_date is None or closing_date < today:
+        return 0.0
+    return max(0.0, 1 - (closing_date - today).days / URGENCY_DAYS)
+
+
+def candidates(now=None):
+    """Active vacancies as dicts with their ``score``, best first."""
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    approved = set(
+        EmployerProfile.objects.filter(approved=True).exclude(company_name='').values_list('company_name', flat=True)
+    )
+    views = dict(traffic.trending(VIEW_CANDIDATES, now))
+    rows = list(
+        Vacancy.objects.filter(is_active=True)
+        .values('id', 'title', 'company', 'posted_date', 'closing_date', 'application_count', 'is_featured', 'featured_at')
+    )
+    for row in rows:
+        row['age_days'] = max((now - row['posted_date']).total_seconds() / 86400, 0)
+        row['application_rate'] = row['application_count'] / max(row['age_days'], 1)
+    top_rate = max((row['application_rate'] for row in rows), default=0) or 1
+    top_views = max(views.values(), default=0) or 1
+
+    for row in rows:
+        parts = {
+            'freshness': 0.5 ** (row['age_days'] / FRESHNESS_HALF_LIFE_DAYS),
+            'urgency': urgency(row['closing_date'], today),
+            'applications': row['application_rate'] / top_rate,
+            'views': views.get(row['id'], 0) / top_views,
+            'approved': 1.0 if row['company'] in approved else 0.0,
+        }
+        row['score'] = sum(WEIGHTS[name] * value for name, value in parts.items())
+    rows.sort(key=lambda row: (-row['score'], -row['id']))
+    return rows
+
+
+def choose(rows, now=None):
+    """Ids of the vacancies to feature, best first, from candidates()."""
+    now = now or timezone.now()
+    turn = timedelta(hours=rotation_hours())
+
+    def resting(row):
+        if row['featured_at'] is None:
+            return False
+        if row['is_featured']:
+            return row['featured_at'] < now - turn  # has had its turn
+        return row['featured_at'] >= now - 2 * turn
+
+    chosen, companies = [], Counter()
+    for row in [row for row in rows if not resting(row)] + [row for row in rows if resting(row)]:
+        if len(chosen) == featured_count():
+            break
+        company = row['company'] or row['id']  # upload-only jobs have no company
+        if companies[company] < per_company():
+            chosen.append(row['id'])
+            companies[company] += 1
+    return chosen
+
+
+def apply(chosen, now=None):
+    """Make exactly ``chosen`` the featured active vacancies, in one
+    UPDATE. Returns (newly featured ids, unfeatured ids)."""
+    now = now or timezone.now()
+    picked = Q(pk__in=chosen)
+    changes = (
+        Q(is_featured=True, is_active=True) & ~picked
+        | picked & (Q(is_featured=False) | Q(featured_at__isnull=True))
+    )
+    with transaction.atomic():
+        was_featured = dict(Vacancy.objects.filter(changes).values_list('pk', 'is_featured'))
+        Vacancy.objects.filter(pk__in=list(was_featured)).update(
+            is_featured=ExpressionWrapper(picked, output_field=BooleanField()),
+            featured_at=Case(When(picked, then=Value(now)), default=F('featured_at')),
+            updated_at=now,
+        )
+        featured = [pk for pk in chosen if pk in was_featured and not was_featured[pk]]
+        unfeatured = [pk for pk in was_featured if pk not in chosen]
+        for vacancy in Vacancy.objects.filter(pk__in=featured):
+            live.publish_vacancy(vacancy, 'featured')
+    if was_featured:
+        cache.invalidate('vacancies')
+    return featured, unfeatured
+
+
+def recompute(now=None):
+    """Score, choose and apply. Returns (newly featured, unfeatured) ids."""
+    now = now or timezone.now()
+    return apply(choose(candidates(now), now), now)
+
+
+def featured_vacancies(count):
+    """Up to ``count`` featured active vacancies, newest first; cached
+    until the vacancies change."""
+    return cache.cached_value(
+        f'featured:{count}', ['vacancies'],
+        lambda: list(Vacancy.objects.filter(is_active=True, is_featured=True).order_by('-posted_date', '-id')[:count]),
+    )
+
+
+# ----------------------------
+# In-process runner
+# ----------------------------
+def featuring_interval():
+    """Seconds between runs of recompute() in each web process
+    (jobs/periodic.py); 0 disables them."""
+    return getattr(settings, 'JOBS_FEATURING_INTERVAL', 0)
@@ -1,5 +1,6 @@
 from django import forms
-from .models import Vacancy
+from .imports import detect_format
+from .models import Application, Vacancy
 
 class VacancyForm(forms.ModelForm):
     class Meta:
@@ -8,3 +9,24 @@ class VacancyForm(forms.ModelForm):
         widgets = {
             "description": forms.Textarea(attrs={"rows": 5}),
         }
+
+
+class ApplicationForm(forms.ModelForm):
+    class Meta:
+        model = Application
+        fields = ["cover_letter"]
+        widgets = {
+            "cover_letter": forms.Textarea(attrs={"rows": 8}),
+        }
+
+
+class VacancyImportForm(forms.Form):
+    feed = forms.FileField(help_text="CSV with a header row, or JSON Lines (.jsonl).")
+    source = forms.SlugField(max_length=50, help_text="Partner feed name; rows are matched on source + external_id.")
+    dry_run = forms.BooleanField(required=False, help_text="Validate only, write nothing.")
+
+    def clean_feed(self):
+        feed = self.cleaned_data["feed"]
+        if detect_format(feed.name) is None:
+            raise forms.ValidationError("Upload a .csv or .jsonl file.")
+        return feed
@@ -0,0 +1,76 @@
+"""Pure image/PDF rendering used by the attachment worker processes.
+
+Nothing in here touches Django, so it can run in a spawned process
+without setting up the project.
+"""
+import os
+
+from PIL import Image, ImageOps
+
+try:
+    import pymupdf  # PyMuPDF, optional: only needed for PDF previews
+except ImportError:
+    pymupdf = None
+
+
+THUMBNAIL_SIZE = (640, 400)
+PDF_PREVIEW_DPI = 110
+
+
+def _flatten(image):
+    """RGB copy of ``image`` with any transparency composited onto white."""
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render_pdf_page(source_path, target_path, dpi=PDF_PREVIEW_DPI):
+    """Render the first page of a PDF to PNG. Returns False if PyMuPDF is
+    not installed or the document has no pages."""
+    if pymupdf is None:
+        return False
+    with pymupdf.open(source_path) as document:
+        if document.page_count == 0:
+            return False
+        pixmap = document[0].get_pixmap(dpi=dpi)
+        pixmap.save(target_path)
+    return True
+
+
+def render_thumbnails(source_path, webp_path, jpeg_path, size=THUMBNAIL_SIZE):
+    """Write fixed-size WebP and JPEG thumbnails of an image.
+
+    Cropped from the top rather than the centre: uploads are job cards and
+    letterheads, where the title is at the top.
+    """
+    with Image.open(source_path) as image:
+        thumbnail = ImageOps.fit(_flatten(image), size, Image.LANCZOS, centering=(0.5, 0.0))
+    thumbnail.save(webp_path, 'WEBP', quality=80, method=4)
+    thumbnail.save(jpeg_path, 'JPEG', quality=82, optimize=True, progressive=True)
+
+
+def render_derivatives(source_path, targets, size=THUMBNAIL_SIZE):
+    """Render every derivative of one attachment.
+
+    ``targets`` maps derivative name ("page_preview", "thumbnail_webp",
+    "thumbnail_jpeg") to an absolute output path. Returns the names that
+    were written.
+    """
+    for path in targets.values():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    written = []
+    image_path = source_path
+    if source_path.lower().endswith('.pdf'):
+        if not render_pdf_page(source_path, targets['page_preview']):
+            return written
+        written.append('page_preview')
+        image_path = targets['page_preview']
+
+    render_thumbnails(image_path, targets['thumbnail_webp'], targets['thumbnail_jpeg'], size)
+    written += ['thumbnail_webp', 'thumbnail_jpeg']
+    return written
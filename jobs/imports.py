@@ -0,0 +1,223 @@
+import codecs
+import csv
+import json
+import os
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from . import cache, match_store
+from .models import Vacancy
+from .salaries import exchange_rates
+from .search import reindex_vacancies
+
+
+# ----------------------------
+# Bulk vacancy import
+# ----------------------------
+# Partner feeds arrive as CSV (header row) or JSON Lines (one object per
+# line). Rows are read lazily, validated a batch at a time and written
+# with one bulk_create per batch, each batch in its own transaction, so a
+# bad batch does not undo the ones before it. Rows are upserted on
+# (import_source, external_id). bulk_create skips model signals, so the
+# search index, match index and page cache are refreshed here instead.
+
+IMPORT_FIELDS = (
+    'title', 'company', 'description', 'location',
+    'salary', 'salary_min', 'salary_max', 'currency', 'salary_period',
+    'job_type', 'requirements', 'benefits',
+    'application_email', 'application_url',
+    'is_featured', 'is_active', 'closing_date',
+)
+REQUIRED_FIELDS = ('external_id', 'title')
+BOOLEAN_VALUES = {
+    'true': True, 'yes': True, 'y': True, '1': True,
+    'false': False, 'no': False, 'n': False, '0': False,
+}
+FORMATS = ('csv', 'jsonl')
+
+
+def default_batch_size():
+    return getattr(settings, 'JOBS_IMPORT_BATCH_SIZE', 1000)
+
+
+def detect_format(filename):
+    extension = os.path.splitext(filename or '')[1].lower().lstrip('.')
+    if extension in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if extension == 'csv':
+        return 'csv'
+    return None
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, dict or error message) from a binary stream."""
+    lines = codecs.iterdecode(stream, 'utf-8-sig')
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(row, dict):
+            yield number, 'Expected a JSON object.'
+            continue
+        yield number, row
+
+
+class BatchReport:
+    def __init__(self, number, first_line, last_line):
+        self.number = number
+        self.first_line = first_line
+        self.last_line = last_line
+        self.created = 0
+        self.updated = 0
+        self.errors = []  # [(line number, message)]
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    def __str__(self):
+        return (
+            f'Batch {self.number} (lines {self.first_line}-{self.last_line}): '
+            f'{self.created} created, {self.updated} updated, {self.failed} failed'
+        )
+
+
+def _error_message(error):
+    if hasattr(error, 'message_dict'):
+        return '; '.join(
+            f"{field}: {' '.join(messages)}" for field, messages in error.message_dict.items()
+        )
+    return ' '.join(error.messages)
+
+
+def _clean_exclusions():
+    # Only the imported columns are validated; the rest keep model defaults
+    keep = set(IMPORT_FIELDS) | {'import_source', 'external_id'}
+    return [field.name for field in Vacancy._meta.concrete_fields if field.name not in keep]
+
+
+def _build_vacancy(row, source, exclude, rates):
+    """Validated, unsaved Vacancy for one row. Raises ValidationError."""
+    values = {}
+    for name in ('external_id',) + IMPORT_FIELDS:
+        value = row.get(name)
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == '':
+            field = Vacancy._meta.get_field(name)
+            if name in REQUIRED_FIELDS:
+                raise ValidationError({name: ['This field is required.']})
+            if field.null:
+                values[name] = None
+            elif not field.has_default():
+                values[name] = ''
+            continue
+        if isinstance(value, str) and name in ('is_featured', 'is_active'):
+            value = BOOLEAN_VALUES.get(value.lower(), value)
+        values[name] = value
+
+    values['external_id'] = str(values['external_id'])
+    vacancy = Vacancy(import_source=source, **values)
+    vacancy.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+    vacancy.normalize_salary(rates)  # save() isn't called by bulk_create
+    return vacancy
+
+
+def _write_batch(vacancies, source):
+    """Upsert one batch. Returns the number of rows that were new."""
+    keys = [vacancy.external_id for vacancy in vacancies]
+    existing = dict(
+        Vacancy.objects.filter(import_source=source, external_id__in=keys)
+        .values_list('external_id', 'closed_at')
+    )
+    now = timezone.now()
+    for vacancy in vacancies:
+        # As Vacancy.save() does: a row stays closed since it was first closed
+        vacancy.closed_at = None if vacancy.is_active else existing.get(vacancy.external_id) or now
+    Vacancy.objects.bulk_create(
+        vacancies,
+        update_conflicts=True,
+        unique_fields=['import_source', 'external_id'],
+        update_fields=[*IMPORT_FIELDS, *Vacancy.SALARY_ZAR_FIELDS, 'closed_at', 'updated_at'],
+    )
+    pks = list(Vacancy.objects.filter(import_source=source, external_id__in=keys).values_list('pk', flat=True))
+    reindex_vacancies(pks)
+    match_store.update_later('vacancies', pks)
+    return len(keys) - len(existing)
+
+
+def _process_batch(report, rows, source, dry_run):
+    # Last row wins when a feed repeats a key within one batch
+    vacancies = {}
+    exclude = _clean_exclusions()
+    rates = exchange_rates()
+    for line, row in rows:
+        if isinstance(row, str):
+            report.errors.append((line, row))
+            continue
+        try:
+            vacancy = _build_vacancy(row, source, exclude, rates)
+        except ValidationError as e:
+            report.errors.append((line, _error_message(e)))
+            continue
+        vacancies[vacancy.external_id] = vacancy
+
+    if not vacancies:
+        return
+    batch = list(vacancies.values())
+    if dry_run:
+        existing = Vacancy.objects.filter(
+            import_source=source, external_id__in=list(vacancies)
+        ).count()
+        report.created, report.updated = len(batch) - existing, existing
+        return
+
+    try:
+        with transaction.atomic():
+            created = _write_batch(batch, source)
+    except DatabaseError as e:
+        report.errors.append((report.first_line, f'Batch rolled back: {e}'))
+        return
+    report.created, report.updated = created, len(batch) - created
+
+
+def import_vacancies(stream, fmt, source, batch_size=None, dry_run=False, on_batch=None):
+    """Import a CSV or JSON Lines feed from a binary stream.
+
+    Returns the list of BatchReports; ``on_batch`` is called with each one
+    as soon as its batch is written, for progress output.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown import format {fmt!r}; expected one of {", ".join(FORMATS)}.')
+    batch_size = batch_size or default_batch_size()
+
+    reports = []
+    rows = read_rows(stream, fmt)
+    try:
+        while True:
+            chunk = list(islice(rows, batch_size))
+            if not chunk:
+                break
+            report = BatchReport(len(reports) + 1, chunk[0][0], chunk[-1][0])
+            _process_batch(report, chunk, source, dry_run)
+            reports.append(report)
+            if on_batch:
+                on_batch(report)
+    finally:
+        if not dry_run and any(report.created or report.updated for report in reports):
+            cache.invalidate('vacancies')
+    return reports
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import logging
+import threading
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.template.loader import get_template
+from django.utils.module_loading import import_string
+
+from . import cache
+
+try:
+    import redis  # optional: only needed for RedisBroker
+    import redis.asyncio
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------
+# Live job feed
+# ----------------------------
+# New vacancies, and vacancies that become featured, are pushed to the
+# feed page over server-sent events (views.job_feed_stream) instead of
+# every open feed re-fetching its first page. jobs/signals.py publishes an
+# event per vacancy once the saving transaction commits; the broker named
+# by JOBS_LIVE_BROKER fans it out to the subscribed streams. LocalBroker
+# only reaches streams in the same process. RedisBroker relays events
+# through a Redis (or Redis-compatible) pub/sub channel, so a save in any
+# web or admin process reaches every ASGI worker; each worker holds one
+# Redis subscription and fans out locally. Bulk imports don't publish.
+
+FEED_CARD_TEMPLATE = 'jobs/vacancy_card.html'
+EVENT_FIELDS = ('title', 'company', 'location')
+
+
+def keepalive_seconds():
+    return getattr(settings, 'JOBS_LIVE_KEEPALIVE', 15)
+
+
+def queue_size():
+    return getattr(settings, 'JOBS_LIVE_QUEUE_SIZE', 100)
+
+
+def vacancy_event(vacancy, kind):
+    """JSON-ready event for one vacancy, with its feed card pre-rendered."""
+    card = get_template(FEED_CARD_TEMPLATE)
+    # Keyed like the feed page's cards, so the two share renders
+    html = cache.render_cards([vacancy], FEED_CARD_TEMPLATE, lambda job: card.render({'job': job}))
+    event = {'kind': kind, 'id': vacancy.pk, 'url': vacancy.get_absolute_url(), 'html': html}
+    event.update((name, getattr(vacancy, name)) for name in EVENT_FIELDS)
+    return event
+
+
+def format_event(event):
+    """One SSE message. Only "created" events carry an id, the cursor a
+    reconnecting client resumes from (Last-Event-ID)."""
+    lines = ['event: vacancy']
+    if event['kind'] == 'created':
+        lines.append(f"id: {event['id']}")
+    lines.append('data: ' + json.dumps(event, cls=DjangoJSONEncoder))
+    return '\n'.join(lines) + '\n\n'
+
+
+class LocalBroker:
+    """In-process fan-out to the streams of this process."""
+
+    def __init__(self):
+        self._subscribers = set()  # (event loop, asyncio.Queue)
+        self._lock = threading.Lock()
+
+    def publish(self, event):
+        self.deliver(event)
+
+    def deliver(self, event):
+        # Called from request threads; each queue belongs to its stream's loop
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            loop, queue = subscriber
+            try:
+                loop.call_soon_threadsafe(self._put, queue, event)
+            except RuntimeError:  # loop closed
+                with self._lock:
+                    self._subscribers.discard(subscriber)
+
+    @staticmethod
+    def _put(queue, event):
+        if queue.full():
+            queue.get_nowait()  # a client that stopped reading loses the oldest
+        queue.put_nowait(event)
+
+    @asynccontextmanager
+    async def subscribe(self):
+        """``async with broker.subscribe() as queue: await queue.get()``"""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=queue_size()))
+        with self._lock:
+            self._subscribers.add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+
+class RedisBroker(LocalBroker):
+    """Publishes to a Redis channel; one relay task per event loop feeds
+    the channel back into LocalBroker's fan-out."""
+
+    channel = 'jobs:live-feed'
+
+    def __init__(self):
+        super().__init__()
+        if redis is None:
+            raise ImproperlyConfigured('RedisBroker needs the redis package.')
+        self.url = getattr(settings, 'JOBS_LIVE_REDIS_URL', 'redis://localhost:6379/0')
+        self._client = redis.Redis.from_url(self.url)
+        self._relays = {}  # event loop -> relay task
+
+    def publish(self, event):
+        self._client.publish(self.channel, json.dumps(event, cls=DjangoJSONEncoder))
+
+    async def _relay(self):
+        client = redis.asyncio.Redis.from_url(self.url)
+        try:
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        self.deliver(json.loads(message['data']))
+        finally:
+            await client.aclose()
+
+    @asynccontextmanager
+    async def subscribe(self):
+        loop = asyncio.get_running_loop()
+        relay = self._relays.get(loop)
+        if relay is None or relay.done():
+            if relay is not None and not relay.cancelled() and relay.exception():
+                logger.error('Live feed relay stopped', exc_info=relay.exception())
+            self._relays[loop] = loop.create_task(self._relay())
+        async with super().subscribe() as queue:
+            yield queue
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(getattr(settings, 'JOBS_LIVE_BROKER', 'jobs.live.LocalBroker'))()
+    return _broker
+
+
+def publish_vacancy(vacancy, kind):
+    """Push ``vacancy`` to live feeds once the current transaction commits."""
+    def send():
+        try:
+            get_broker().publish(vacancy_event(vacancy, kind))
+        except Exception:
+            logger.exception('Publishing vacancy %s to the live feed failed', vacancy.pk)
+    transaction.on_commit(send)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import matching
+from jobs.related import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the related articles shown on every advisory article page '
+        '(saved articles keep them up to date afterwards)'
+    )
+
+    def handle(self, *args, **options):
+        if not matching.available():
+            raise CommandError('Related articles need the numpy package.')
+
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Computed related articles for {count} published articles.'))
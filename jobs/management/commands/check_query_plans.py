@@ -0,0 +1,83 @@
+import re
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from jobs.expiry import archivable_vacancies, expired_vacancies
+from jobs.models import Vacancy
+from jobs.pagination import CursorPaginator, encode_cursor
+from jobs.salaries import MAX_ZAR_ANNUAL
+
+# "SCAN jobs_vacancy" (SQLite) / "Seq Scan on jobs_vacancy" (PostgreSQL) mean
+# every row is read.
+FULL_SCAN_PATTERNS = [
+    re.compile(r'\bSCAN (?P<table>\w+)(?! USING)(?:\s|$)'),
+    re.compile(r'\bSeq Scan on (?P<table>\w+)'),
+]
+# SQLite's "SCAN ... USING INDEX" walks an index in order and stops at the
+# LIMIT. That is the plan for the first page of a listing, but a query
+# with a cursor or filter the index can seek to should be a "SEARCH ...
+# USING INDEX (...<?)": walking it is still O(rows) for a deep page or a
+# selective filter.
+INDEX_WALK_PATTERN = re.compile(r'\bSCAN (?P<table>\w+) USING (?:COVERING )?INDEX\b')
+
+
+def hot_queries():
+    """(label, queryset, ranged) for every query on the public hot path.
+    ``ranged`` queries have a cursor or filter an index can seek to, so
+    they must not walk a whole index either."""
+    active = Vacancy.objects.filter(is_active=True)
+    cursor = encode_cursor(timezone.now(), 1)
+    deep_cursor = encode_cursor(timezone.now() - timedelta(days=3650), 1)  # near the end of the table
+    salaried = active.filter(salary_max_zar_annual__isnull=False)
+    salary_cursor = encode_cursor(Decimal('240000'), 1)
+    return [
+        ('home: active job count', active.values('id'), False),
+        ('home: featured jobs', active.filter(is_featured=True).order_by('-posted_date', '-id')[:6], False),
+        ('home: recent jobs fallback', active.order_by('-posted_date', '-id')[:6], False),
+        ('vacancy_list: first page', CursorPaginator(active).page_queryset(), False),
+        ('vacancy_list: next page', CursorPaginator(active).page_queryset(cursor), True),
+        ('vacancy_list: deep page', CursorPaginator(active).page_queryset(deep_cursor), True),
+        ('vacancy_list: job_type filter', CursorPaginator(active.filter(job_type='full_time')).page_queryset(cursor), True),
+        ('vacancy_list: highest salary', CursorPaginator(salaried, field='salary_max_zar_annual').page_queryset(salary_cursor), True),
+        ('vacancy_list: minimum salary', CursorPaginator(active.filter(salary_max_zar_annual__range=(180000, MAX_ZAR_ANNUAL))).page_queryset(), True),
+        ('admin: is_active + job_type filter', Vacancy.objects.filter(is_active=True, job_type='contract').order_by('-pk'), True),
+        ('feature_vacancies: featured rows', Vacancy.objects.filter(is_featured=True, is_active=True).values('pk', 'is_featured'), False),
+        ('expire_vacancies: expired batch', expired_vacancies().order_by('closing_date').values('pk')[:500], True),
+        ('expire_vacancies: archive batch', archivable_vacancies().order_by('closed_at').values('pk')[:500], True),
+        ('employer_dashboard: vacancies', Vacancy.objects.filter(company='Acme').order_by('-is_active', '-posted_date'), True),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot-path Vacancy queries and fail if any of them scans the whole table or, given a cursor or filter, a whole index'
+
+    def handle(self, *args, **options):
+        table = Vacancy._meta.db_table
+        failures = []
+
+        for label, queryset, ranged in hot_queries():
+            plan = queryset.explain()
+            patterns = [*FULL_SCAN_PATTERNS, INDEX_WALK_PATTERN] if ranged else FULL_SCAN_PATTERNS
+            scanned = [
+                line for line in plan.splitlines()
+                if any(
+                    match.group('table') == table
+                    for pattern in patterns
+                    for match in pattern.finditer(line)
+                )
+            ]
+            if scanned:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f'✗ {label}'))
+            else:
+                self.stdout.write(f'✓ {label}')
+            if options['verbosity'] > 1 or scanned:
+                for line in plan.splitlines():
+                    self.stdout.write(f'    {line}')
+
+        if failures:
+            raise CommandError(f'{len(failures)} hot-path queries scan all of {table} or an index on it: ' + ', '.join(failures))
+        self.stdout.write(self.style.SUCCESS('All hot-path queries search an index.'))
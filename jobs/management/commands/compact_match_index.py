@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import matching
+from jobs.match_store import get_store
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the recommendation index from the database, folding in its change logs '
+        'and dropping removed rows (run periodically, e.g. nightly)'
+    )
+
+    def handle(self, *args, **options):
+        if not matching.available():
+            raise CommandError('The match index needs the numpy package.')
+
+        store = get_store()
+        logged = store.pending_changes()
+        counts = store.compact()  # waits for a compaction already running
+
+        for collection, rows in counts.items():
+            self.stdout.write(f'✓ {collection}: {rows} rows ({logged[collection]} logged changes folded in)')
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote index generation {store.current_name()} to {store.directory}.'
+        ))
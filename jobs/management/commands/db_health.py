@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from jobs.database import health, sqlite_pragmas
+
+CHECKPOINT_MODES = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+
+
+def _mb(size):
+    return f'{size / (1024 * 1024):.1f} MB'
+
+
+class Command(BaseCommand):
+    help = 'Report the SQLite journal mode, connection PRAGMAs, WAL size and checkpoint progress'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias (default "default")')
+        parser.add_argument(
+            '--checkpoint', default='PASSIVE', choices=CHECKPOINT_MODES, type=str.upper,
+            help='WAL checkpoint to run: PASSIVE (default) never waits for readers; '
+                 'TRUNCATE waits for them and empties the WAL file',
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError(f'db_health only supports SQLite, not {connection.vendor}.')
+
+        report = health(connection, options['checkpoint'])
+        problems = []
+
+        expected = sqlite_pragmas()
+        for name in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size'):
+            actual = report[name]
+            wanted = expected.get(name)
+            if name in ('journal_mode', 'mmap_size') and report['in_memory']:
+                self.stdout.write(f'✓ {name} = {actual} (in-memory database)')
+                continue
+            # synchronous reads back as a number: 0 OFF, 1 NORMAL, 2 FULL, 3 EXTRA
+            if name == 'synchronous' and isinstance(wanted, str):
+                wanted = {'off': 0, 'normal': 1, 'full': 2, 'extra': 3}.get(wanted.lower(), wanted)
+            if wanted is None or str(actual).lower() == str(wanted).lower():
+                self.stdout.write(f'✓ {name} = {actual}')
+            else:
+                problems.append(name)
+                self.stdout.write(self.style.ERROR(f'✗ {name} = {actual} (expected {wanted})'))
+
+        page_size = report['page_size']
+        self.stdout.write(
+            f"  Database: {_mb(report['database_bytes'])}, {report['page_count']} pages of {page_size} bytes, "
+            f"{report['freelist_count']} free ({_mb(report['freelist_count'] * page_size)} reclaimable by VACUUM)"
+        )
+        self.stdout.write(
+            f"  Persistent connections: CONN_MAX_AGE = {connection.settings_dict['CONN_MAX_AGE']}, "
+            f"transaction mode {connection.settings_dict['OPTIONS'].get('transaction_mode') or 'DEFERRED'}"
+        )
+
+        checkpoint = report['checkpoint']
+        if checkpoint is not None:
+            self.stdout.write(
+                f"  WAL: {_mb(report['wal_bytes'])}; {options['checkpoint']} checkpoint copied "
+                f"{checkpoint['checkpointed']} of {checkpoint['wal_frames']} frames"
+                f"{' (blocked by a writer or reader)' if checkpoint['busy'] else ''}; "
+                f"{_mb(report['wal_bytes_after'])} afterwards"
+            )
+            limit = getattr(settings, 'JOBS_WAL_WARN_BYTES', 64 * 1024 * 1024)
+            if report['wal_bytes_after'] > limit:
+                self.stdout.write(self.style.WARNING(
+                    f'WAL is larger than {_mb(limit)}: long-running readers keep checkpoints from '
+                    f'resetting it; try --checkpoint TRUNCATE at a quiet time.'
+                ))
+
+        if problems:
+            raise CommandError(f'{len(problems)} settings differ from jobs/database.py: ' + ', '.join(problems))
+        self.stdout.write(self.style.SUCCESS('Database is healthy.'))
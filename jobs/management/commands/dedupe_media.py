@@ -0,0 +1,74 @@
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.attachments import DERIVATIVE_SUFFIXES, delete_derivatives
+from jobs.models import StoredBlob, Vacancy
+from jobs.storage import BLOB_FIELDS, BLOB_PREFIX, blob_references, blob_storage
+
+
+class Command(BaseCommand):
+    help = 'Move existing uploads into the content-addressed blob store, then fix reference counts and collect orphans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-originals', action='store_true', help='Do not delete the files that were moved')
+
+    def handle(self, *args, **options):
+        store = blob_storage()
+        moved = {}
+        missing = 0
+        size_before = 0
+
+        for label, field in BLOB_FIELDS:
+            model = apps.get_model(label)
+            rows = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).exclude(
+                **{f'{field}__startswith': BLOB_PREFIX + '/'}
+            )
+            for row in rows.iterator():
+                old = getattr(row, field).name
+                if old not in moved:
+                    if not default_storage.exists(old):
+                        missing += 1
+                        self.stdout.write(self.style.WARNING(f'Missing file: {old}'))
+                        continue
+                    size_before += default_storage.size(old)
+                    with default_storage.open(old) as content:
+                        moved[old] = store.save(old, content)
+                    self.stdout.write(f'{old} -> {moved[old]}')
+
+                updates = {field: moved[old]}
+                if model is Vacancy:
+                    updates['updated_at'] = timezone.now()  # the card links the new name
+                if model is Vacancy and row.derivatives_source:
+                    # Re-rendered next to the blob by `manage.py process_attachments`
+                    delete_derivatives(row)
+                    updates.update(derivatives_source='', **{name: '' for name in DERIVATIVE_SUFFIXES})
+                model.objects.filter(pk=row.pk).update(**updates)
+
+        if not options['keep_originals']:
+            for old in moved:
+                default_storage.delete(old)
+
+        with transaction.atomic():
+            references = blob_references()
+            for blob in StoredBlob.objects.all():
+                count = references.get(blob.name, 0)
+                if blob.ref_count != count:
+                    StoredBlob.objects.filter(pk=blob.pk).update(ref_count=count)
+            orphans = list(StoredBlob.objects.filter(ref_count__lte=0).values_list('name', flat=True))
+            StoredBlob.objects.filter(name__in=orphans).delete()
+        for name in orphans:
+            store.delete_blob(name)
+
+        size_after = sum(
+            StoredBlob.objects.filter(name__in=set(moved.values())).values_list('size', flat=True)
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved {len(moved)} files into {len(set(moved.values()))} blobs '
+            f'({size_before - size_after} bytes saved), collected {len(orphans)} orphaned blobs, '
+            f'{missing} missing files.'
+        ))
+        if moved:
+            self.stdout.write('Run `manage.py process_attachments` to re-render vacancy thumbnails.')
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import expiry
+
+
+class Command(BaseCommand):
+    help = (
+        'Deactivate vacancies past their closing date and archive long-closed ones '
+        'with their applications (safe to run from cron, e.g. hourly)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--archive-after', type=int, metavar='DAYS',
+            help='Archive vacancies closed and unchanged for this many days (default JOBS_ARCHIVE_AFTER_DAYS)',
+        )
+        parser.add_argument('--no-archive', action='store_true', help='Only deactivate expired vacancies')
+        parser.add_argument('--batch-size', type=int, help='Rows per UPDATE/transaction (default JOBS_EXPIRY_BATCH_SIZE)')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the rows that would change')
+
+    def handle(self, *args, **options):
+        days, size = options['archive_after'], options['batch_size']
+        if days is not None and days < 0:
+            raise CommandError('--archive-after must not be negative.')
+        if size is not None and size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        if options['dry_run']:
+            self.stdout.write(f'{expiry.expired_vacancies().count()} vacancies would be deactivated.')
+            if not options['no_archive']:
+                self.stdout.write(f'{expiry.archivable_vacancies(days).count()} vacancies would be archived.')
+            return
+
+        expired = expiry.expire(size=size)
+        self.stdout.write(f'✓ Deactivated {expired} expired vacancies')
+        if not options['no_archive']:
+            archived, applications = expiry.archive(days, size=size)
+            self.stdout.write(f'✓ Archived {archived} vacancies and {applications} applications')
+        self.stdout.write(self.style.SUCCESS('Vacancy expiry done.'))
@@ -0,0 +1,45 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from jobs.exports import DATASETS, FORMATS, export_stream
+
+
+class Command(BaseCommand):
+    help = 'Stream vacancies, applications or referral requests to CSV, JSON Lines or Parquet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=DATASETS)
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('-o', '--output', help='Output file (default: stdout; required for parquet)')
+        parser.add_argument(
+            '--filter', action='append', default=[], metavar='FIELD[__LOOKUP]=VALUE',
+            help='Admin list filter, e.g. status=pending or applied_date__gte=2026-01-01 (repeatable)',
+        )
+        parser.add_argument('--search', default='', help='Same as the changelist search box')
+
+    def handle(self, *args, **options):
+        params = {}
+        for item in options['filter']:
+            key, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f'Filters look like field=value, got {item!r}.')
+            params[key] = value
+
+        fmt = options['format']
+        if fmt == 'parquet' and not options['output']:
+            raise CommandError('Parquet is binary; pass --output.')
+        try:
+            stream = export_stream(options['dataset'], fmt, params, options['search'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['output']:
+            mode = 'wb' if fmt == 'parquet' else 'w'
+            encoding = None if fmt == 'parquet' else 'utf-8'
+            with open(options['output'], mode, encoding=encoding, newline='' if encoding else None) as out:
+                for chunk in stream:
+                    out.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f'✓ Wrote {options["dataset"]} to {options["output"]}'))
+        else:
+            for chunk in stream:
+                sys.stdout.write(chunk)
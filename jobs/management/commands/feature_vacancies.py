@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from jobs import featuring
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the featured vacancies from freshness, closing dates, applications, '
+        'views and employer approval (safe to run from cron, e.g. hourly)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only show what would be featured')
+
+    def handle(self, *args, **options):
+        rows = featuring.candidates()
+        chosen = featuring.choose(rows)
+        if options['dry_run']:
+            by_id = {row['id']: row for row in rows}
+            for pk in chosen:
+                row = by_id[pk]
+                self.stdout.write(f"{row['score']:.2f}  #{pk} {row['title']} at {row['company']}")
+            return
+
+        featured, unfeatured = featuring.apply(chosen)
+        self.stdout.write(f'✓ Featured {len(featured)} vacancies, unfeatured {len(unfeatured)}')
+        self.stdout.write(self.style.SUCCESS(f'{len(chosen)} vacancies are featured.'))
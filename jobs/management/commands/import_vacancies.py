@@ -0,0 +1,56 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from jobs.imports import FORMATS, detect_format, import_vacancies
+
+
+class Command(BaseCommand):
+    help = 'Import vacancies from a CSV or JSON Lines partner feed, upserting on (source, external_id)'
+    errors_per_batch = 20
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Feed file, or - for stdin')
+        parser.add_argument('--source', required=True, help='Feed name stored on each vacancy, e.g. "careers24"')
+        parser.add_argument('--format', choices=FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, help='Rows per transaction (default JOBS_IMPORT_BATCH_SIZE)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, write nothing')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or detect_format(path)
+        if fmt is None:
+            raise CommandError('Cannot tell the feed format from the file name; pass --format.')
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        def report(batch):
+            style = self.style.WARNING if batch.errors else self.style.SUCCESS
+            self.stdout.write(style(('✗ ' if batch.errors else '✓ ') + str(batch)))
+            for line, message in batch.errors[:self.errors_per_batch]:
+                self.stdout.write(f'    line {line}: {message}')
+            if batch.failed > self.errors_per_batch:
+                self.stdout.write(f'    ... and {batch.failed - self.errors_per_batch} more')
+
+        try:
+            stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        except OSError as e:
+            raise CommandError(f'Cannot open {path}: {e}')
+        try:
+            reports = import_vacancies(
+                stream, fmt, options['source'],
+                batch_size=options['batch_size'], dry_run=options['dry_run'], on_batch=report,
+            )
+        except (UnicodeDecodeError, ValueError) as e:
+            raise CommandError(f'Import stopped: {e}')
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+        created = sum(batch.created for batch in reports)
+        updated = sum(batch.updated for batch in reports)
+        failed = sum(batch.failed for batch in reports)
+        prefix = 'Dry run, nothing written: ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}{created} created, {updated} updated, {failed} rows rejected '
+            f'in {len(reports)} batches.'
+        ))
@@ -0,0 +1,65 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from jobs import cache
+from jobs.models import Vacancy
+from jobs.salaries import exchange_rates
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Parse free-text salaries into structured fields and refresh the annualized ZAR columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reparse', action='store_true',
+            help='Re-parse the salary text even where salary_min/salary_max are already set',
+        )
+
+    def handle(self, *args, **options):
+        rates = exchange_rates()
+        fields = sorted(Vacancy.SALARY_FIELDS | Vacancy.SALARY_ZAR_FIELDS)
+        parsed = 0
+        unparsed = Counter()
+        self.updated = 0
+
+        batch = []
+        for vacancy in Vacancy.objects.only('pk', *fields).order_by('pk').iterator(chunk_size=BATCH_SIZE):
+            before = [getattr(vacancy, name) for name in fields]
+            if options['reparse'] and vacancy.salary:
+                vacancy.salary_min = vacancy.salary_max = None
+            structured = vacancy.salary_min is not None or vacancy.salary_max is not None
+            vacancy.normalize_salary(rates)
+            if vacancy.salary and not structured:
+                if vacancy.salary_min is None and vacancy.salary_max is None:
+                    unparsed[vacancy.salary] += 1
+                else:
+                    parsed += 1
+            if [getattr(vacancy, name) for name in fields] == before:
+                continue
+            batch.append(vacancy)
+            if len(batch) >= BATCH_SIZE:
+                self._save(batch, fields)
+                batch = []
+        self._save(batch, fields)
+        cache.invalidate('vacancies')
+
+        for text, count in unparsed.most_common(20):
+            self.stdout.write(self.style.WARNING(f'✗ {text!r} ({count})'))
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated {self.updated} vacancies: parsed {parsed} salaries, '
+            f'{sum(unparsed.values())} could not be parsed.'
+        ))
+
+    def _save(self, batch, fields):
+        if not batch:
+            return
+        with transaction.atomic():
+            now = timezone.now()
+            for vacancy in batch:
+                vacancy.updated_at = now  # bulk_update skips auto_now
+            Vacancy.objects.bulk_update(batch, [*fields, 'updated_at'])
+        self.updated += len(batch)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from jobs.attachments import process_now
+from jobs.models import Vacancy
+
+
+class Command(BaseCommand):
+    help = 'Render thumbnails and PDF previews for vacancy attachments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Re-render attachments that already have derivatives')
+
+    def handle(self, *args, **options):
+        vacancies = Vacancy.objects.exclude(attachment='').exclude(attachment__isnull=True)
+        if not options['all']:
+            vacancies = vacancies.exclude(derivatives_source=F('attachment'))
+
+        done = failed = 0
+        for vacancy in vacancies.iterator():
+            try:
+                process_now(vacancy)
+            except Exception as exc:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'✗ {vacancy.attachment.name}: {exc}'))
+            else:
+                done += 1
+                self.stdout.write(f'✓ {vacancy.attachment.name}')
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {done} attachments ({failed} failed).'))
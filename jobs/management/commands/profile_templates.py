@@ -0,0 +1,103 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from jobs.models import AdvisoryArticle, AdvisoryCategory, ReferralPartner, Vacancy
+from jobs.templating import RenderProfile
+
+SORT_KEYS = {
+    'self': lambda stats: stats.self_time,
+    'render': lambda stats: stats.mean_render_ms,
+    'parse': lambda stats: stats.parse_time or 0,
+    'nodes': lambda stats: stats.nodes or 0,
+    'bytes': lambda stats: stats.mean_bytes,
+}
+
+
+def representative_pages():
+    """(label, url) for each public page, using existing rows for the
+    detail pages; a label with url None means there was no row to use."""
+    vacancy = (
+        Vacancy.objects.filter(is_active=True).exclude(attachment='').order_by('-posted_date').first()
+        or Vacancy.objects.filter(is_active=True).order_by('-posted_date').first()
+    )
+    category = AdvisoryCategory.objects.first()
+    article = AdvisoryArticle.objects.filter(is_published=True).first()
+    partner = ReferralPartner.objects.filter(is_active=True).first()
+    query = vacancy.title.split()[0] if vacancy and vacancy.title else 'jobs'
+    return [
+        ('home', reverse('home')),
+        ('vacancy_list', reverse('jobs:vacancy_list')),
+        ('job_feed', reverse('jobs:job_feed')),
+        ('vacancy_search', reverse('jobs:vacancy_search') + '?' + urlencode({'q': query})),
+        ('vacancy_detail', vacancy and reverse('jobs:vacancy_detail', args=[vacancy.pk])),
+        ('advisory_home', reverse('advisory_home')),
+        ('advisory_category', category and reverse('advisory_category', args=[category.pk])),
+        ('advisory_detail', article and reverse('advisory_detail', args=[article.pk])),
+        ('referrals_home', reverse('referrals_home')),
+        ('referral_partner_detail', partner and reverse('referral_partner_detail', args=[partner.pk])),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Render every public page and report parse/render time, node count and output size per template'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help='Renders per page (default 5)')
+        parser.add_argument('--sort', choices=SORT_KEYS, default='self', help='Order of the template table')
+        parser.add_argument('--limit', type=int, default=30, help='Templates to list (0 for all)')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        if repeat < 1:
+            raise CommandError('--repeat must be at least 1.')
+
+        profile = RenderProfile()
+        # Page and card caches off, so every request renders every template
+        caches = {**settings.CACHES, 'profile': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        with override_settings(
+            CACHES=caches, JOBS_PAGE_CACHE='profile', JOBS_FRAGMENT_CACHE='profile', ALLOWED_HOSTS=['*'],
+        ):
+            client = Client()
+            for label, url in representative_pages():
+                if url is None:
+                    self.stdout.write(self.style.WARNING(
+                        f'✗ {label}: no data (try `manage.py create_sample_data`)'
+                    ))
+                    continue
+                client.get(url)  # first request compiles templates and warms the ORM
+                with profile.active():
+                    start = time.perf_counter()
+                    for _ in range(repeat):
+                        response = client.get(url)
+                    elapsed = (time.perf_counter() - start) * 1000 / repeat
+                if response.status_code != 200:
+                    self.stdout.write(self.style.ERROR(f'✗ {label} {url}: HTTP {response.status_code}'))
+                    continue
+                self.stdout.write(f'✓ {label} {url}: {elapsed:.1f} ms, {len(response.content) / 1024:.1f} KB')
+
+        profile.measure_parsing()
+        rows = sorted(profile.stats.values(), key=SORT_KEYS[options['sort']], reverse=True)
+        if options['limit']:
+            rows = rows[:options['limit']]
+
+        self.stdout.write('')
+        self.stdout.write(
+            f'{"template":<48} {"calls":>6} {"parse ms":>9} {"nodes":>6} '
+            f'{"render ms":>10} {"self ms":>8} {"bytes":>8}'
+        )
+        for stats in rows:
+            parse = f'{stats.parse_time * 1000:.2f}' if stats.parse_time is not None else '-'
+            nodes = stats.nodes if stats.nodes is not None else '-'
+            self.stdout.write(
+                f'{stats.name[-48:]:<48} {stats.calls // repeat:>6} {parse:>9} {nodes:>6} '
+                f'{stats.mean_render_ms:>10.2f} {stats.self_time * 1000 / repeat:>8.2f} {stats.mean_bytes:>8}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Profiled {len(profile.stats)} templates; calls and self ms are per round of all pages, '
+            f'render ms and bytes per call.'
+        ))
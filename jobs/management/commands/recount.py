@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from jobs import application_stats
+from jobs.counters import recount, recount_reading_stats
+
+
+class Command(BaseCommand):
+    help = 'Repair drift in the denormalized counters, article read times and daily application stats'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fixed = recount()
+            fixed['AdvisoryArticle.word_count/read_minutes'] = recount_reading_stats()
+            fixed['ApplicationDailyStats'] = application_stats.rebuild()
+
+        for name, rows in fixed.items():
+            if rows:
+                self.stdout.write(self.style.WARNING(f'Fixed {rows} drifted {name}'))
+            else:
+                self.stdout.write(f'✓ {name}')
+        self.stdout.write(self.style.SUCCESS('Counters are up to date.'))
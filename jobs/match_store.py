@@ -0,0 +1,265 @@
+import logging
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+from . import matching
+from .matching import VECTOR, MatchIndex, numpy
+
+try:
+    import fcntl  # not on Windows, where appends are not locked across processes
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------
+# Match index store
+# ----------------------------
+# The vectors behind jobs/matching.py, kept on disk under
+# JOBS_MATCH_INDEX_DIR so that every worker process maps the same files
+# instead of building its own copy. A generation is a directory holding
+# the idf weights and, per collection, a compacted base (a MatchIndex
+# saved as .npy files, opened with mmap_mode='r', so the pages are shared
+# through the OS page cache) and an append-only change log of VECTOR rows.
+#
+# jobs/signals.py appends a row to the log whenever a vacancy, job seeker
+# or article is saved or deleted (once the transaction commits); the
+# latest row per id wins over the base and earlier rows. Workers notice a
+# longer log, or a new CURRENT generation, on their next query. New rows
+# are weighted with the generation's idf, which only changes when
+# `manage.py compact_match_index` writes a new generation from the
+# database, dropping the logs and every removed row. Bulk writes that
+# bypass save() call update_later() themselves (imports, admin actions)
+# or are picked up by the next compaction.
+
+COLLECTIONS = ('vacancies', 'seekers', 'articles')
+INDEX_PARTS = ('ids', 'colptr', 'rows', 'weights')
+CURRENT_FILE = 'CURRENT'
+APPEND_LOCK = 'append.lock'
+COMPACT_LOCK = 'compact.lock'
+
+
+def index_dir():
+    return str(getattr(settings, 'JOBS_MATCH_INDEX_DIR', os.path.join(settings.BASE_DIR, 'var', 'matching')))
+
+
+@contextmanager
+def _locked(directory, name):
+    """Exclusive lock across processes (and threads: each opens its own file)."""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, name), 'a') as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _log_rows(path):
+    try:
+        return os.path.getsize(path) // VECTOR.itemsize
+    except FileNotFoundError:
+        return 0
+
+
+class Collection:
+    """One collection of a generation: the mapped base plus the latest
+    live row per id from the change log."""
+
+    def __init__(self, directory, name):
+        self.log_path = os.path.join(directory, f'{name}.log')
+        self.base = MatchIndex(*(
+            numpy.load(os.path.join(directory, f'{name}.{part}.npy'), mmap_mode='r') for part in INDEX_PARTS
+        ))
+        self.log_rows = 0
+        # (latest live log rows, base rows they replace or remove)
+        self.changes = (numpy.zeros(0, VECTOR), numpy.zeros(0, numpy.int64))
+
+    def __len__(self):
+        live, hidden = self.changes
+        return len(self.base) - len(hidden) + len(live)
+
+    def refresh(self):
+        rows = _log_rows(self.log_path)
+        if rows == self.log_rows:
+            return
+        log = numpy.memmap(self.log_path, VECTOR, 'r', shape=(rows,))
+        ids, last = numpy.unique(log['id'][::-1], return_index=True)
+        latest = log[rows - 1 - last]  # a copy; the log is small between compactions
+        positions = numpy.searchsorted(self.base.ids, ids)
+        found = positions < len(self.base.ids)
+        found[found] = self.base.ids[positions[found]] == ids[found]
+        self.changes = (latest[latest['live'] == 1], positions[found])
+        self.log_rows = rows
+
+    def top(self, query_features, query_weights, k):
+        live, hidden = self.changes
+        scores = self.base.scores(query_features, query_weights)
+        scores[hidden] = 0
+        matches = matching.best(self.base.ids, scores, k)
+        if len(live):
+            matches += matching.best(live['id'], matching.row_scores(live, query_features, query_weights), k)
+            matches.sort(key=lambda match: match[1], reverse=True)
+        return matches[:k]
+
+
+class Generation:
+    def __init__(self, directory, name):
+        path = os.path.join(directory, name)
+        self.name = name
+        self.idf = numpy.load(os.path.join(path, 'idf.npy'), mmap_mode='r')
+        self.collections = {collection: Collection(path, collection) for collection in COLLECTIONS}
+
+    def top(self, collection, terms, k):
+        """[(id, score)] of the ``k`` rows of ``collection`` best matching
+        ``terms`` (a (features, counts) pair), best first."""
+        query_features, query_weights = matching.weigh(terms, self.idf, max_terms=None)
+        if not len(query_features):
+            return []
+        return self.collections[collection].top(query_features, query_weights, k)
+
+
+class IndexStore:
+    def __init__(self, directory):
+        self.directory = directory
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def _path(self, *parts):
+        return os.path.join(self.directory, *parts)
+
+    def current_name(self):
+        try:
+            with open(self._path(CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def generation(self):
+        """The current generation with its logs read up to date; built from
+        the database first if there is none yet."""
+        name = self.current_name()
+        if name is None:
+            self.compact(only_if_missing=True)
+            name = self.current_name()
+        with self._lock:
+            if self._generation is None or self._generation.name != name:
+                self._generation = Generation(self.directory, name)
+            for collection in self._generation.collections.values():
+                collection.refresh()
+            return self._generation
+
+    def top(self, collection, terms, k):
+        return self.generation().top(collection, terms, k)
+
+    def pending_changes(self):
+        """{collection: rows in the current change log}"""
+        name = self.current_name()
+        return {
+            collection: _log_rows(self._path(name, f'{collection}.log')) if name else 0
+            for collection in COLLECTIONS
+        }
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+    def _append(self, name, collection, pks):
+        idf = numpy.load(self._path(name, 'idf.npy'), mmap_mode='r')
+        documents = matching.documents(collection, pks)
+        indexed = {pk for pk, _ in documents}
+        rows = numpy.concatenate([
+            matching.vectors(documents, idf),
+            matching.removals(sorted(set(pks) - indexed)),
+        ])
+        with open(self._path(name, f'{collection}.log'), 'ab') as log:
+            log.write(rows.tobytes())
+        return len(rows)
+
+    def update(self, collection, pks):
+        """Re-read ``pks`` of ``collection`` from the database and log
+        their current vectors, or their removal. Returns the rows logged."""
+        if self.current_name() is None:
+            return 0  # the first build reads the database anyway
+        with _locked(self.directory, APPEND_LOCK):
+            return self._append(self.current_name(), collection, pks)
+
+    def compact(self, only_if_missing=False):
+        """Write a new generation from the database and make it current.
+        Returns {collection: rows}, or None if nothing was written."""
+        with _locked(self.directory, COMPACT_LOCK):
+            previous = self.current_name()
+            if only_if_missing and previous is not None:
+                return None
+            with _locked(self.directory, APPEND_LOCK):
+                logged = self.pending_changes()
+
+            name = f'{int(previous or 0) + 1:06d}'
+            path = self._path(name)
+            shutil.rmtree(path, ignore_errors=True)  # left by an interrupted run
+            os.makedirs(path)
+            documents = {collection: matching.documents(collection) for collection in COLLECTIONS}
+            idf = matching.inverse_document_frequencies(
+                terms for rows in documents.values() for _, terms in rows
+            )
+            numpy.save(os.path.join(path, 'idf.npy'), idf)
+            for collection, rows in documents.items():
+                index = MatchIndex.build(matching.vectors(rows, idf))
+                for part in INDEX_PARTS:
+                    numpy.save(os.path.join(path, f'{collection}.{part}.npy'), getattr(index, part))
+
+            with _locked(self.directory, APPEND_LOCK):
+                # Rows changed while the database was being read
+                for collection in COLLECTIONS:
+                    if not previous:
+                        continue
+                    log_path = self._path(previous, f'{collection}.log')
+                    rows = _log_rows(log_path)
+                    if rows > logged[collection]:
+                        log = numpy.memmap(log_path, VECTOR, 'r', shape=(rows,))
+                        changed = numpy.unique(log['id'][logged[collection]:]).tolist()
+                        self._append(name, collection, changed)
+                with open(self._path(CURRENT_FILE + '.tmp'), 'w') as f:
+                    f.write(name)
+                os.replace(self._path(CURRENT_FILE + '.tmp'), self._path(CURRENT_FILE))
+
+        # Workers may still be opening the previous generation
+        for entry in os.listdir(self.directory):
+            if entry.isdigit() and entry not in (name, previous):
+                shutil.rmtree(self._path(entry), ignore_errors=True)
+        return {collection: len(rows) for collection, rows in documents.items()}
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store():
+    directory = index_dir()
+    with _stores_lock:
+        store = _stores.get(directory)
+        if store is None:
+            store = _stores[directory] = IndexStore(directory)
+        return store
+
+
+def update_later(collection, pks):
+    """Bring ``pks`` of ``collection`` up to date in the match index once
+    the current transaction commits."""
+    if not matching.available() or collection is None:
+        return
+    pks = list(pks)
+
+    def update():
+        try:
+            get_store().update(collection, pks)
+        except Exception:
+            logger.exception('Updating the match index for %s %s failed', collection, pks)
+    transaction.on_commit(update)
@@ -0,0 +1,281 @@
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+try:
+    import numpy  # optional: only needed for recommendations
+except ImportError:
+    numpy = None
+
+
+# ----------------------------
+# Job-seeker / vacancy matching
+# ----------------------------
+# Vacancies, job seekers and advisory articles are turned into TF-IDF
+# vectors over hashed word features (no vocabulary to store or keep in
+# sync), each pruned to its MAX_TERMS heaviest terms and L2-normalized.
+# A collection of vectors is held feature-major, like a CSC matrix: for
+# every feature, the rows that contain it and their weights. Scoring a
+# query is then one sparse matrix-vector product that only touches the
+# postings of the query's own terms, accumulated with numpy.bincount,
+# followed by an argpartition for the top k; cosine similarity, since
+# both sides are normalized. The vectors live in jobs/match_store.py.
+
+NUM_FEATURES = 1 << 18
+MAX_TERMS = 64
+TITLE_WEIGHT = 2  # title and skills words count this many times
+
+# Punctuation that separates words; + # . - are kept so "c++", "c#",
+# "node.js" and "full-time" stay whole (trailing dots are stripped).
+SEPARATORS = str.maketrans(dict.fromkeys(',;:!?()[]{}<>"\'/\\|*&=~`^%$@', ' '))
+STOP_WORDS = frozenset('''
+    a an and are as at be been but by can for from has have in is it its of on or our
+    that the their this to was we were will with you your who what which work working
+    job jobs role position candidate candidates company team experience required
+    requirements ability must should able years year etc
+'''.split())
+
+
+def available():
+    return numpy is not None
+
+
+def _words(text):
+    return (text or '').lower().translate(SEPARATORS).split()
+
+
+@lru_cache(maxsize=1 << 17)
+def _token(word):
+    token = word.strip('.-')
+    if len(token) < 2 or not token[0].isalpha() or token in STOP_WORDS:
+        return None
+    return token
+
+
+def tokenize(text):
+    return [token for token in map(_token, _words(text)) if token]
+
+
+@lru_cache(maxsize=1 << 17)
+def feature(word):
+    """Hashed feature of a raw word, or None if it is not a token."""
+    token = _token(word)
+    if token is None:
+        return None
+    return zlib.crc32(token.encode()) & (NUM_FEATURES - 1)
+
+
+def term_counts(*weighted_texts):
+    """(features, counts) arrays for (text, weight) pairs."""
+    counts = {}
+    for text, weight in weighted_texts:
+        # Count words first so each distinct word is looked up once
+        for word, n in Counter(_words(text)).items():
+            index = feature(word)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + n * weight
+    return (
+        numpy.fromiter(counts.keys(), numpy.int32, len(counts)),
+        numpy.fromiter(counts.values(), numpy.float32, len(counts)),
+    )
+
+
+def vacancy_terms(title, description, requirements):
+    return term_counts((title, TITLE_WEIGHT), (description, 1), (requirements, 1))
+
+
+def seeker_terms(skills, experience):
+    return term_counts((skills, TITLE_WEIGHT), (experience, 1))
+
+
+def article_terms(title, excerpt, content):
+    return term_counts((title, TITLE_WEIGHT), (excerpt, 1), (content, 1))
+
+
+def weigh(terms, idf, max_terms=MAX_TERMS):
+    """(features, weights) arrays: sublinear tf * idf, pruned, L2-normalized."""
+    features, tf = terms
+    if not len(features):
+        return features, tf
+    weights = (1 + numpy.log(tf)) * idf[features]
+    if max_terms and len(features) > max_terms:
+        keep = numpy.argpartition(weights, -max_terms)[-max_terms:]
+        features, weights = features[keep], weights[keep]
+    norm = float(numpy.sqrt(numpy.dot(weights, weights)))
+    if norm == 0:
+        return numpy.empty(0, numpy.int32), numpy.empty(0, numpy.float32)
+    return features, (weights / norm).astype(numpy.float32)
+
+
+def inverse_document_frequencies(documents):
+    """Smoothed idf per feature from an iterable of (features, counts)."""
+    df = numpy.zeros(NUM_FEATURES, numpy.int32)
+    total = 0
+    for features, _ in documents:
+        total += 1
+        df[features] += 1
+    return (numpy.log((1 + total) / (1 + df)) + 1).astype(numpy.float32)
+
+
+# One fixed-width row per document: its weighted terms, padded to
+# MAX_TERMS. ``live`` is 0 for a row that records a removal.
+VECTOR = numpy.dtype([
+    ('id', '<i8'),
+    ('live', '<i4'),
+    ('size', '<i4'),
+    ('features', '<i4', (MAX_TERMS,)),
+    ('weights', '<f4', (MAX_TERMS,)),
+]) if numpy is not None else None
+
+
+def vectors(documents, idf):
+    """VECTOR array for a list of (id, terms) documents."""
+    result = numpy.zeros(len(documents), VECTOR)
+    for row, (pk, terms) in enumerate(documents):
+        features, weights = weigh(terms, idf)
+        result['id'][row] = pk
+        result['size'][row] = len(features)
+        result['features'][row, :len(features)] = features
+        result['weights'][row, :len(features)] = weights
+    result['live'] = 1
+    return result
+
+
+def removals(pks):
+    """VECTOR rows recording that ``pks`` are gone."""
+    result = numpy.zeros(len(pks), VECTOR)
+    result['id'] = pks
+    return result
+
+
+class MatchIndex:
+    """Feature-major sparse matrix of document vectors.
+
+    ``ids[row]`` is the document id of a row; ``colptr[f]:colptr[f + 1]``
+    slices ``rows``/``weights`` to the postings of feature ``f``.
+    """
+
+    def __init__(self, ids, colptr, rows, weights):
+        self.ids = ids
+        self.colptr = colptr
+        self.rows = rows
+        self.weights = weights
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def postings(rows):
+        """(colptr, rows, weights) arrays for a VECTOR array."""
+        used = numpy.arange(MAX_TERMS) < rows['size'][:, None]
+        features = rows['features'][used]
+        order = numpy.argsort(features, kind='stable')
+        colptr = numpy.zeros(NUM_FEATURES + 1, numpy.int64)
+        numpy.cumsum(numpy.bincount(features, minlength=NUM_FEATURES), out=colptr[1:])
+        row_numbers = numpy.nonzero(used)[0].astype(numpy.int32)
+        return colptr, row_numbers[order], rows['weights'][used][order]
+
+    @classmethod
+    def build(cls, rows):
+        return cls(rows['id'], *cls.postings(rows))
+
+    def scores(self, query_features, query_weights):
+        """Cosine similarity of every row with the query: X @ q."""
+        starts = self.colptr[query_features]
+        ends = self.colptr[query_features + 1]
+        lengths = ends - starts
+        if not lengths.sum():
+            return numpy.zeros(len(self.ids))
+        # Postings of all query features, gathered in one go
+        offsets = numpy.repeat(starts - numpy.cumsum(lengths) + lengths, lengths)
+        postings = offsets + numpy.arange(lengths.sum())
+        contributions = self.weights[postings] * numpy.repeat(query_weights, lengths)
+        return numpy.bincount(self.rows[postings], weights=contributions, minlength=len(self.ids))
+
+
+def row_scores(rows, query_features, query_weights):
+    """Cosine similarity of each VECTOR row with the query, row by row;
+    for the few rows not (yet) in a MatchIndex."""
+    query = numpy.zeros(NUM_FEATURES, numpy.float32)
+    query[query_features] = query_weights
+    return (query[rows['features']] * rows['weights']).sum(axis=1, dtype=numpy.float64)
+
+
+def best(ids, scores, k):
+    """[(id, score)] of the ``k`` highest scores > 0, best first."""
+    k = min(k, len(scores))
+    if not k:
+        return []
+    top = numpy.argpartition(scores, -k)[-k:]
+    top = top[numpy.argsort(scores[top])[::-1]]
+    return [(int(ids[row]), float(scores[row])) for row in top if scores[row] > 0]
+
+
+# ----------------------------
+# Indexed models
+# ----------------------------
+# collection -> (model, rows to index, text fields, terms function)
+def sources():
+    from .models import AdvisoryArticle, JobSeeker, Vacancy
+
+    return {
+        'vacancies': (
+            Vacancy, Vacancy.objects.filter(is_active=True),
+            ('title', 'description', 'requirements'), vacancy_terms,
+        ),
+        'seekers': (JobSeeker, JobSeeker.objects.all(), ('skills', 'experience'), seeker_terms),
+        'articles': (
+            AdvisoryArticle, AdvisoryArticle.objects.filter(is_published=True),
+            ('title', 'excerpt', 'content'), article_terms,
+        ),
+    }
+
+
+def collection_for(model):
+    for name, (source_model, *_) in sources().items():
+        if source_model is model:
+            return name
+    return None
+
+
+def documents(collection, pks=None):
+    """(id, terms) for every indexable row of ``collection``, or for those
+    of ``pks`` that are (still) indexable."""
+    _, queryset, fields, terms = sources()[collection]
+    if pks is not None:
+        queryset = queryset.filter(pk__in=pks)
+    rows = queryset.values_list('pk', *fields).order_by('pk')
+    return [(pk, terms(*texts)) for pk, *texts in rows.iterator(chunk_size=2000)]
+
+
+# ----------------------------
+# Matching
+# ----------------------------
+def _top(collection, terms, k):
+    from .match_store import get_store
+
+    return get_store().top(collection, terms, k)
+
+
+def recommend(seeker, k=10):
+    """[(Vacancy, score)] best matching ``seeker``'s skills and experience,
+    best first."""
+    from .models import Vacancy
+
+    if not available():
+        return []
+    # Over-fetch a little in case a vacancy closed without a save signal
+    matches = _top('vacancies', seeker_terms(seeker.skills, seeker.experience), k * 2)
+    vacancies = Vacancy.objects.filter(is_active=True).in_bulk([pk for pk, _ in matches])
+    return [(vacancies[pk], score) for pk, score in matches if pk in vacancies][:k]
+
+
+def candidates(vacancy, k=10):
+    """[(JobSeeker, score)] whose profiles best match ``vacancy``."""
+    from .models import JobSeeker
+
+    if not available():
+        return []
+    matches = _top('seekers', vacancy_terms(vacancy.title, vacancy.description, vacancy.requirements), k)
+    seekers = JobSeeker.objects.select_related('user').in_bulk([pk for pk, _ in matches])
+    return [(seekers[pk], score) for pk, score in matches if pk in seekers]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_vacancy_is_upload_only_alter_vacancy_company_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-posted_date', '-id'], name='vacancy_active_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['job_type', '-posted_date', '-id'], name='vacancy_active_type_posted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_featured', True)), fields=['-posted_date', '-id'], name='vacancy_featured_posted_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_vacancy_indexes'),
+    ]
+
+    # The FTS5 mirror of jobs_vacancy (see jobs/search.py), filled from the
+    # existing rows; jobs/signals.py keeps it in sync from here on.
+    operations = [
+        migrations.RunSQL(
+            sql=[
+                "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_vacancy_fts USING fts5("
+                "title, company, location, description, requirements, "
+                "tokenize = 'unicode61 remove_diacritics 2')",
+                "INSERT INTO jobs_vacancy_fts (rowid, title, company, location, description, requirements) "
+                "SELECT id, title, company, location, description, requirements FROM jobs_vacancy",
+            ],
+            reverse_sql="DROP TABLE IF EXISTS jobs_vacancy_fts",
+        ),
+    ]
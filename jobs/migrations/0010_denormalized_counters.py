@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:32
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+COUNTERS = [
+    ('Vacancy', 'application_count', 'Application', 'vacancy'),
+    ('JobSeeker', 'application_count', 'Application', 'job_seeker'),
+    ('JobSeeker', 'referral_count', 'ReferralRequest', 'job_seeker'),
+    ('ReferralPartner', 'referral_count', 'ReferralRequest', 'partner'),
+    ('AdvisoryCategory', 'article_count', 'AdvisoryArticle', 'category'),
+]
+
+
+def backfill(apps, schema_editor):
+    for parent_name, field, child_name, fk in COUNTERS:
+        parent = apps.get_model('jobs', parent_name)
+        child = apps.get_model('jobs', child_name)
+        total = Subquery(
+            child.objects.filter(**{fk: OuterRef('pk')})
+            .order_by().values(fk).annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField(),
+        )
+        parent.objects.update(**{field: Coalesce(total, 0)})
+
+    AdvisoryArticle = apps.get_model('jobs', 'AdvisoryArticle')
+    articles = list(AdvisoryArticle.objects.only('id', 'content'))
+    for article in articles:
+        article.word_count = len(article.content.split())
+        article.read_minutes = max(1, round(article.word_count / 200))
+    AdvisoryArticle.objects.bulk_update(articles, ['word_count', 'read_minutes'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_vacancy_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='advisoryarticle',
+            name='read_minutes',
+            field=models.PositiveSmallIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='advisoryarticle',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='advisorycategory',
+            name='article_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobseeker',
+            name='application_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='jobseeker',
+            name='referral_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='referralpartner',
+            name='referral_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='application_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0010_denormalized_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacancy',
+            name='derivatives_source',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='page_preview',
+            field=models.FileField(blank=True, editable=False, max_length=255, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='thumbnail_jpeg',
+            field=models.FileField(blank=True, editable=False, max_length=255, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='thumbnail_webp',
+            field=models.FileField(blank=True, editable=False, max_length=255, upload_to=''),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:35
+
+import django.core.validators
+import jobs.models
+import jobs.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_vacancy_attachment_derivatives'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='jobseeker',
+            name='resume',
+            field=models.FileField(blank=True, null=True, upload_to='resumes/', validators=[jobs.models.validate_file_size, jobs.uploads.FileContentValidator(('pdf', 'doc', 'docx'))]),
+        ),
+        migrations.AlterField(
+            model_name='vacancy',
+            name='attachment',
+            field=models.FileField(blank=True, null=True, upload_to='vacancies/%Y/%m/%d/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'png', 'jpg', 'jpeg', 'gif']), jobs.models.validate_file_size, jobs.uploads.FileContentValidator(('pdf', 'png', 'jpeg', 'gif'))]),
+        ),
+    ]
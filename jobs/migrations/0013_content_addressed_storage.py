@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:36
+
+import django.core.validators
+import jobs.models
+import jobs.storage
+import jobs.uploads
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_upload_content_validation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='advisoryarticle',
+            name='featured_image',
+            field=models.ImageField(blank=True, null=True, storage=jobs.storage.blob_storage, upload_to='advisory/'),
+        ),
+        migrations.AlterField(
+            model_name='jobseeker',
+            name='resume',
+            field=models.FileField(blank=True, null=True, storage=jobs.storage.blob_storage, upload_to='resumes/', validators=[jobs.models.validate_file_size, jobs.uploads.FileContentValidator(('pdf', 'doc', 'docx'))]),
+        ),
+        migrations.AlterField(
+            model_name='vacancy',
+            name='attachment',
+            field=models.FileField(blank=True, null=True, storage=jobs.storage.blob_storage, upload_to='vacancies/%Y/%m/%d/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'png', 'jpg', 'jpeg', 'gif']), jobs.models.validate_file_size, jobs.uploads.FileContentValidator(('pdf', 'png', 'jpeg', 'gif'))]),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0013_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacancy',
+            name='external_id',
+            field=models.CharField(blank=True, editable=False, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='import_source',
+            field=models.CharField(blank=True, editable=False, max_length=50),
+        ),
+        migrations.AddConstraint(
+            model_name='vacancy',
+            constraint=models.UniqueConstraint(fields=('import_source', 'external_id'), name='vacancy_import_natural_key'),
+        ),
+    ]
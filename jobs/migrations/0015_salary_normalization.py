@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:50
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+# Starting values only; kept up to date in the admin. Existing vacancies
+# are parsed and annualized by `manage.py normalize_salaries`.
+DEFAULT_RATES = {
+    'USD': Decimal('18.50'),
+    'EUR': Decimal('20.00'),
+    'GBP': Decimal('23.50'),
+}
+
+
+def seed_rates(apps, schema_editor):
+    ExchangeRate = apps.get_model('jobs', 'ExchangeRate')
+    for currency, rate in DEFAULT_RATES.items():
+        ExchangeRate.objects.get_or_create(currency=currency, defaults={'zar_per_unit': rate})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0014_vacancy_import_natural_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(max_length=3, unique=True)),
+                ('zar_per_unit', models.DecimalField(decimal_places=6, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['currency'],
+            },
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='salary_max_zar_annual',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=14, null=True),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='salary_min_zar_annual',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=14, null=True),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='salary_period',
+            field=models.CharField(choices=[('hour', 'per hour'), ('day', 'per day'), ('week', 'per week'), ('month', 'per month'), ('year', 'per annum')], default='year', max_length=5),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(condition=models.Q(('is_active', True), ('salary_max_zar_annual__isnull', False)), fields=['-salary_max_zar_annual', '-id'], name='vacancy_active_salary_idx'),
+        ),
+        migrations.RunPython(seed_rates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0016_vacancy_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedArticle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='jobs.advisoryarticle')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jobs.advisoryarticle')),
+            ],
+            options={
+                'ordering': ['article', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('article', 'rank'), name='related_article_rank')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:23
+
+import django.core.serializers.json
+import django.db.models.deletion
+import jobs.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0017_related_article'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedApplication',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('applied_date', models.DateTimeField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('reviewed', 'Reviewed'), ('accepted', 'Accepted'), ('rejected', 'Rejected')], max_length=20)),
+                ('cover_letter', models.TextField(blank=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedVacancy',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('company', models.CharField(blank=True, max_length=200)),
+                ('location', models.CharField(blank=True, max_length=100)),
+                ('posted_date', models.DateTimeField()),
+                ('closing_date', models.DateField(blank=True, null=True)),
+                ('attachment', models.FileField(blank=True, null=True, storage=jobs.storage.blob_storage, upload_to='')),
+                ('application_count', models.PositiveIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+            options={
+                'verbose_name_plural': 'archived vacancies',
+                'ordering': ['-archived_at', '-id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(condition=models.Q(('closing_date__isnull', False), ('is_active', True)), fields=['closing_date'], name='vacancy_active_closing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['updated_at'], name='vacancy_inactive_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedapplication',
+            name='job_seeker',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='jobs.jobseeker'),
+        ),
+        migrations.AddField(
+            model_name='archivedapplication',
+            name='vacancy',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='jobs.archivedvacancy'),
+        ),
+    ]
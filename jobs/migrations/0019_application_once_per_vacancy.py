@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:26
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def drop_duplicates(apps, schema_editor):
+    """Keep each job seeker's first application per vacancy, and fix the
+    counters of the rows that lost duplicates."""
+    Application = apps.get_model('jobs', 'Application')
+    duplicated = (
+        Application.objects.order_by().values('vacancy_id', 'job_seeker_id')
+        .annotate(copies=Count('id'), first=Min('id')).filter(copies__gt=1)
+    )
+    vacancies, seekers = set(), set()
+    for group in duplicated:
+        Application.objects.filter(
+            vacancy_id=group['vacancy_id'], job_seeker_id=group['job_seeker_id'],
+        ).exclude(id=group['first']).delete()
+        vacancies.add(group['vacancy_id'])
+        seekers.add(group['job_seeker_id'])
+
+    for parent_name, fk, pks in (('Vacancy', 'vacancy', vacancies), ('JobSeeker', 'job_seeker', seekers)):
+        total = Subquery(
+            Application.objects.filter(**{fk: OuterRef('pk')})
+            .order_by().values(fk).annotate(total=Count('pk')).values('total'),
+            output_field=IntegerField(),
+        )
+        apps.get_model('jobs', parent_name).objects.filter(pk__in=pks).update(application_count=Coalesce(total, 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0018_vacancy_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='application',
+            constraint=models.UniqueConstraint(fields=('vacancy', 'job_seeker'), name='application_once_per_vacancy'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def fill_stats(apps, schema_editor):
+    Application = apps.get_model('jobs', 'Application')
+    ApplicationDailyStats = apps.get_model('jobs', 'ApplicationDailyStats')
+    rows = (
+        Application.objects.order_by()
+        .annotate(date=TruncDate('applied_date', tzinfo=timezone.get_current_timezone()))
+        .values('vacancy_id', 'date', 'status').annotate(total=Count('pk'))
+    )
+    ApplicationDailyStats.objects.bulk_create(
+        (ApplicationDailyStats(vacancy_id=row['vacancy_id'], date=row['date'], status=row['status'], count=row['total'])
+         for row in rows.iterator()),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0019_application_once_per_vacancy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('reviewed', 'Reviewed'), ('accepted', 'Accepted'), ('rejected', 'Rejected')], max_length=20)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('vacancy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='jobs.vacancy')),
+            ],
+            options={
+                'verbose_name_plural': 'application daily stats',
+                'constraints': [models.UniqueConstraint(fields=('vacancy', 'date', 'status'), name='application_daily_stats_key')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['company'], name='vacancy_company_idx'),
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0020_application_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacancy',
+            name='impression_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='view_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='VacancyHourlyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('impressions', models.PositiveIntegerField(default=0)),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('vacancy', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hourly_stats', to='jobs.vacancy')),
+            ],
+            options={
+                'verbose_name_plural': 'vacancy hourly stats',
+                'indexes': [models.Index(fields=['hour'], name='vacancy_hourly_stats_hour_idx')],
+                'constraints': [models.UniqueConstraint(fields=('vacancy', 'hour'), name='vacancy_hourly_stats_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0021_vacancy_traffic'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacancy',
+            name='featured_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(condition=models.Q(('is_featured', True)), fields=['featured_at'], name='vacancy_featured_idx'),
+        ),
+    ]
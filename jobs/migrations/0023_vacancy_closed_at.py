@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:51
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_closed_at(apps, schema_editor):
+    """Closed rows have no record of when they closed; their last change
+    is what archiving counted from until now."""
+    apps.get_model('jobs', 'Vacancy').objects.filter(is_active=False).update(closed_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0022_vacancy_featured_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='vacancy',
+            name='vacancy_inactive_updated_idx',
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_closed_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(condition=models.Q(('is_active', False)), fields=['closed_at'], name='vacancy_inactive_closed_idx'),
+        ),
+    ]
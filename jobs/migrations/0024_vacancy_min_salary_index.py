@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0023_vacancy_closed_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(condition=models.Q(('is_active', True), ('salary_max_zar_annual__isnull', False)), fields=['-salary_max_zar_annual', '-posted_date', '-id'], name='vacancy_active_min_salary_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:04
+
+import jobs.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0024_vacancy_min_salary_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='vacancy',
+            name='page_preview',
+            field=models.FileField(blank=True, editable=False, max_length=255, storage=jobs.storage.blob_storage, upload_to=''),
+        ),
+        migrations.AlterField(
+            model_name='vacancy',
+            name='thumbnail_jpeg',
+            field=models.FileField(blank=True, editable=False, max_length=255, storage=jobs.storage.blob_storage, upload_to=''),
+        ),
+        migrations.AlterField(
+            model_name='vacancy',
+            name='thumbnail_webp',
+            field=models.FileField(blank=True, editable=False, max_length=255, storage=jobs.storage.blob_storage, upload_to=''),
+        ),
+    ]
@@ -1,12 +1,33 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
+from django.utils import timezone
 from django.core.validators import FileExtensionValidator
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from .uploads import ATTACHMENT_TYPES, MAX_UPLOAD_MB, RESUME_TYPES, FileContentValidator
+from .salaries import annual_zar, exchange_rates, parse_salary
+from .storage import blob_storage
 import os
 
 
+# ----------------------------
+# Denormalized counters
+# ----------------------------
+class CounterFieldsMixin:
+    """Leaves COUNTER_FIELDS out of full saves of existing rows. The
+    counters are only ever changed with F() updates (jobs/counters.py), so
+    writing back the value an instance loaded would undo any change made
+    since, e.g. an application sent while an admin edits the vacancy."""
+    COUNTER_FIELDS = ()
 
+    def save(self, *args, **kwargs):
+        if kwargs.get('update_fields') is None and not kwargs.get('force_insert') and not self._state.adding:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
 
 
 
@@ -30,11 +51,42 @@ class Vacancy(models.Model):
         return reverse("vacancy_detail", args=[self.pk])
 
 
+# ----------------------------
+# Stored file blobs (see jobs/storage.py)
+# ----------------------------
+class StoredBlob(models.Model):
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+# ----------------------------
+# Exchange rates (see jobs/salaries.py)
+# ----------------------------
+class ExchangeRate(models.Model):
+    """Offline FX table used to compare salaries in ZAR, edited in the admin."""
+
+    currency = models.CharField(max_length=3, unique=True)
+    zar_per_unit = models.DecimalField(max_digits=12, decimal_places=6)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['currency']
+
+    def __str__(self):
+        return f"1 {self.currency} = R{self.zar_per_unit}"
+
+
 # ----------------------------
 # Helper Validators
 # ----------------------------
 def validate_file_size(value):
-    max_mb = 8
+    max_mb = MAX_UPLOAD_MB
     limit = max_mb * 1024 * 1024
     if value.size > limit:
         raise ValidationError(f"File too large. Size should not exceed {max_mb} MB.")
@@ -42,12 +94,23 @@ def validate_file_size(value):
 # ----------------------------
 # Job Seeker
 # ----------------------------
-class JobSeeker(models.Model):
+class JobSeeker(CounterFieldsMixin, models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     skills = models.TextField(blank=True)
     experience = models.TextField(blank=True)
     phone = models.CharField(max_length=20, blank=True)
-    resume = models.FileField(upload_to='resumes/', blank=True, null=True)
+    resume = models.FileField(
+        upload_to='resumes/',
+        storage=blob_storage,
+        blank=True,
+        null=True,
+        validators=[validate_file_size, FileContentValidator(RESUME_TYPES)]
+    )
+
+    # Denormalized counters, maintained by jobs/counters.py
+    application_count = models.PositiveIntegerField(default=0, editable=False)
+    referral_count = models.PositiveIntegerField(default=0, editable=False)
+    COUNTER_FIELDS = ('application_count', 'referral_count')
 
     def __str__(self):
         return self.user.get_full_name() or self.user.username
@@ -55,7 +118,7 @@ class JobSeeker(models.Model):
 # ----------------------------
 # Vacancy (Unified Model for Manual + Upload)
 # ----------------------------
-class Vacancy(models.Model):
+class Vacancy(CounterFieldsMixin, models.Model):
 
     title = models.CharField(max_length=255)
     attachment = models.FileField(upload_to="vacancy_uploads/", blank=True, null=True)
@@ -82,6 +145,17 @@ class Vacancy(models.Model):
         ('EUR', 'Euro (€)'),
         ('GBP', 'British Pound (£)'),
     ]
+    CURRENCY_SYMBOLS = {'ZAR': 'R', 'USD': '$', 'EUR': '€', 'GBP': '£'}
+
+    SALARY_PERIODS = [
+        ('hour', 'per hour'),
+        ('day', 'per day'),
+        ('week', 'per week'),
+        ('month', 'per month'),
+        ('year', 'per annum'),
+    ]
+    SALARY_FIELDS = {'salary', 'salary_min', 'salary_max', 'currency', 'salary_period'}
+    SALARY_ZAR_FIELDS = {'salary_min_zar_annual', 'salary_max_zar_annual'}
 
     # Core fields
     title = models.CharField(max_length=200, blank=True)
@@ -94,6 +168,12 @@ class Vacancy(models.Model):
     salary_min = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     salary_max = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, default='ZAR')
+    salary_period = models.CharField(max_length=5, choices=SALARY_PERIODS, default='year')
+
+    # Annualized ZAR equivalent of salary_min/salary_max (see
+    # jobs/salaries.py), what salary filters and sorting use
+    salary_min_zar_annual = models.DecimalField(max_digits=14, decimal_places=2, blank=True, null=True, editable=False)
+    salary_max_zar_annual = models.DecimalField(max_digits=14, decimal_places=2, blank=True, null=True, editable=False)
 
     # Job meta
     job_type = models.CharField(max_length=20, choices=JOB_TYPES, default='full_time')
@@ -102,24 +182,122 @@ class Vacancy(models.Model):
     application_email = models.EmailField(blank=True)
     application_url = models.URLField(blank=True)
     is_featured = models.BooleanField(default=False)
+    # When it last became featured; featuring rotation (jobs/featuring.py)
+    featured_at = models.DateTimeField(blank=True, null=True, editable=False)
     is_active = models.BooleanField(default=True)
+    # When it was last deactivated; what archiving counts from
+    # (jobs/expiry.py). save() keeps it in step with is_active, bulk
+    # updates of is_active set it themselves.
+    closed_at = models.DateTimeField(blank=True, null=True, editable=False)
     posted_date = models.DateTimeField(auto_now_add=True)
     closing_date = models.DateField(blank=True, null=True)
 
     # File upload (PDF/Image)
     attachment = models.FileField(
         upload_to='vacancies/%Y/%m/%d/',
+        storage=blob_storage,
         blank=True,
         null=True,
         validators=[
             FileExtensionValidator(allowed_extensions=['pdf', 'png', 'jpg', 'jpeg', 'gif']),
-            validate_file_size
+            validate_file_size,
+            FileContentValidator(ATTACHMENT_TYPES),
         ]
     )
 
     # Type flag: True = uploaded job only, False = manual job
     is_upload_only = models.BooleanField(default=False)
 
+    # Partner feed provenance, the natural key `manage.py import_vacancies`
+    # upserts on. Null external_id (manual jobs) never collides.
+    import_source = models.CharField(max_length=50, blank=True, editable=False)
+    external_id = models.CharField(max_length=100, blank=True, null=True, editable=False)
+
+    # Derivatives of the attachment, rendered off the request thread by
+    # jobs/attachments.py and stored next to the original, in its storage
+    page_preview = models.FileField(max_length=255, storage=blob_storage, blank=True, editable=False)
+    thumbnail_webp = models.FileField(max_length=255, storage=blob_storage, blank=True, editable=False)
+    thumbnail_jpeg = models.FileField(max_length=255, storage=blob_storage, blank=True, editable=False)
+    derivatives_source = models.CharField(max_length=255, blank=True, editable=False)
+
+    # Denormalized counter, maintained by jobs/counters.py
+    application_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # All-time traffic, added to by jobs/traffic.py's batched flush
+    impression_count = models.PositiveIntegerField(default=0, editable=False)
+    view_count = models.PositiveIntegerField(default=0, editable=False)
+    COUNTER_FIELDS = ('application_count', 'impression_count', 'view_count')
+
+    # Row version stamp for the rendered-card cache (jobs/cache.py). save()
+    # bumps it; bulk writes that change what a card shows set it to Now().
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        # Every public listing filters on is_active and walks posted_date
+        # newest-first (with id as the cursor tie-breaker, see
+        # jobs/pagination.py). Partial indexes because Django renders
+        # is_active=True as a bare "WHERE is_active" on SQLite, which can't
+        # use is_active as a leading index column. Checked by
+        # `manage.py check_query_plans`.
+        indexes = [
+            models.Index(
+                fields=['-posted_date', '-id'],
+                condition=models.Q(is_active=True),
+                name='vacancy_active_posted_idx',
+            ),
+            models.Index(
+                fields=['job_type', '-posted_date', '-id'],
+                condition=models.Q(is_active=True),
+                name='vacancy_active_type_posted_idx',
+            ),
+            models.Index(
+                fields=['-posted_date', '-id'],
+                condition=models.Q(is_active=True, is_featured=True),
+                name='vacancy_featured_posted_idx',
+            ),
+            # "Highest salary" ordering
+            models.Index(
+                fields=['-salary_max_zar_annual', '-id'],
+                condition=models.Q(is_active=True, salary_max_zar_annual__isnull=False),
+                name='vacancy_active_salary_idx',
+            ),
+            # The minimum-salary filter, newest first: a range search on
+            # salary that sorts the matches from the index alone, reading
+            # only the rows on the page
+            models.Index(
+                fields=['-salary_max_zar_annual', '-posted_date', '-id'],
+                condition=models.Q(is_active=True, salary_max_zar_annual__isnull=False),
+                name='vacancy_active_min_salary_idx',
+            ),
+            # `manage.py expire_vacancies` (jobs/expiry.py): active rows past
+            # their closing date, and rows closed a long time ago
+            models.Index(
+                fields=['closing_date'],
+                condition=models.Q(is_active=True, closing_date__isnull=False),
+                name='vacancy_active_closing_idx',
+            ),
+            models.Index(
+                fields=['closed_at'],
+                condition=models.Q(is_active=False),
+                name='vacancy_inactive_closed_idx',
+            ),
+            # Featured rows the featuring engine may unfeature (few of the
+            # table; jobs/featuring.py)
+            models.Index(
+                fields=['featured_at'],
+                condition=models.Q(is_featured=True),
+                name='vacancy_featured_idx',
+            ),
+            # An employer's vacancies on their applicant dashboard
+            models.Index(fields=['company'], name='vacancy_company_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['import_source', 'external_id'],
+                name='vacancy_import_natural_key',
+            ),
+        ]
+
     # ----------------------------
     # Display helpers
     # ----------------------------
@@ -131,10 +309,52 @@ class Vacancy(models.Model):
     def get_absolute_url(self):
         return reverse('jobs:vacancy_detail', kwargs={'pk': self.id})
 
+    def save(self, *args, **kwargs):
+        self.normalize_salary()
+        if self.is_active:
+            self.closed_at = None
+        elif self.closed_at is None:
+            self.closed_at = timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            # auto_now only fires for fields being saved
+            update_fields = {*update_fields, 'updated_at'}
+            if 'is_active' in update_fields:
+                update_fields.add('closed_at')
+            if self.SALARY_FIELDS & update_fields:
+                update_fields |= self.SALARY_FIELDS | self.SALARY_ZAR_FIELDS
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+    def normalize_salary(self, rates=None):
+        """Fill the structured salary from the free-text one when it has
+        not been entered, then refresh the annualized ZAR range."""
+        if self.salary and self.salary_min is None and self.salary_max is None:
+            parsed = parse_salary(self.salary)
+            if parsed:
+                self.salary_min, self.salary_max, self.currency, self.salary_period = parsed
+        if rates is None:
+            rates = exchange_rates()
+        self.salary_min_zar_annual, self.salary_max_zar_annual = annual_zar(
+            self.salary_min, self.salary_max, self.currency, self.salary_period, rates
+        )
+
+    @property
+    def has_salary(self):
+        return bool(self.salary or self.salary_min or self.salary_max)
+
     def formatted_salary(self):
-        """Return formatted salary with ZAR symbol"""
-        if self.salary_min and self.salary_max:
-            return f"R{self.salary_min:,.0f} - R{self.salary_max:,.0f} per annum"
+        """Return the salary for display, e.g. R15,000 - R20,000 per month."""
+        symbol = self.CURRENCY_SYMBOLS.get(self.currency, f"{self.currency} ")
+        period = self.get_salary_period_display()
+        if self.salary_min and self.salary_max and self.salary_min != self.salary_max:
+            return f"{symbol}{self.salary_min:,.0f} - {symbol}{self.salary_max:,.0f} {period}"
+        elif self.salary_min and self.salary_max:
+            return f"{symbol}{self.salary_min:,.0f} {period}"
+        elif self.salary_min:
+            return f"From {symbol}{self.salary_min:,.0f} {period}"
+        elif self.salary_max:
+            return f"Up to {symbol}{self.salary_max:,.0f} {period}"
         elif self.salary:
             if self.salary.startswith('$'):
                 return self.salary.replace('$', 'R')
@@ -160,6 +380,11 @@ class Vacancy(models.Model):
     def is_image(self):
         return self._attachment_ext in ('png', 'jpg', 'jpeg', 'gif')
 
+    @property
+    def has_thumbnail(self):
+        """True once the derivatives match the current attachment."""
+        return bool(self.thumbnail_jpeg) and self.derivatives_source == self.attachment.name
+
 # ----------------------------
 # Job Applications
 # ----------------------------
@@ -177,17 +402,109 @@ class Application(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     cover_letter = models.TextField(blank=True)
 
+    class Meta:
+        # One application per job seeker and vacancy (see jobs/applications.py)
+        constraints = [
+            models.UniqueConstraint(fields=['vacancy', 'job_seeker'], name='application_once_per_vacancy'),
+        ]
+
+    def __str__(self):
+        return f"{self.job_seeker} applied for {self.vacancy}"
+
+
+class ApplicationDailyStats(models.Model):
+    """How many of a vacancy's applications were sent on ``date`` and now
+    have ``status``; maintained by jobs/application_stats.py."""
+    vacancy = models.ForeignKey(Vacancy, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField()
+    status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'application daily stats'
+        constraints = [
+            models.UniqueConstraint(fields=['vacancy', 'date', 'status'], name='application_daily_stats_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.vacancy_id} {self.date} {self.status}: {self.count}"
+
+
+# ----------------------------
+# Vacancy traffic
+# ----------------------------
+class VacancyHourlyStats(models.Model):
+    """Impressions (cards shown in listings) and views (detail pages) of a
+    vacancy in the hour starting at ``hour``; written by jobs/traffic.py."""
+    vacancy = models.ForeignKey(Vacancy, on_delete=models.CASCADE, related_name='hourly_stats')
+    hour = models.DateTimeField()
+    impressions = models.PositiveIntegerField(default=0)
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'vacancy hourly stats'
+        constraints = [
+            models.UniqueConstraint(fields=['vacancy', 'hour'], name='vacancy_hourly_stats_key'),
+        ]
+        # Trending reads, and pruning deletes, a range of recent hours
+        indexes = [
+            models.Index(fields=['hour'], name='vacancy_hourly_stats_hour_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.vacancy_id} {self.hour:%Y-%m-%d %H:00}: {self.views} views, {self.impressions} impressions"
+
+
+# ----------------------------
+# Archive
+# ----------------------------
+# Vacancies closed long ago, and their applications, are moved here by
+# `manage.py expire_vacancies` (jobs/expiry.py) so the live tables only
+# hold rows the site still shows. Rows keep their original ids; ``data``
+# holds every other column of the original row.
+class ArchivedVacancy(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200, blank=True)
+    company = models.CharField(max_length=200, blank=True)
+    location = models.CharField(max_length=100, blank=True)
+    posted_date = models.DateTimeField()
+    closing_date = models.DateField(blank=True, null=True)
+    attachment = models.FileField(storage=blob_storage, blank=True, null=True)
+    application_count = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+    class Meta:
+        ordering = ['-archived_at', '-id']
+        verbose_name_plural = 'archived vacancies'
+
+    def __str__(self):
+        return f"{self.title} at {self.company}" if self.title else f"Vacancy #{self.id}"
+
+
+class ArchivedApplication(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    vacancy = models.ForeignKey(ArchivedVacancy, on_delete=models.CASCADE, related_name='applications')
+    job_seeker = models.ForeignKey(JobSeeker, on_delete=models.SET_NULL, blank=True, null=True)
+    applied_date = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=Application.STATUS_CHOICES)
+    cover_letter = models.TextField(blank=True)
+
     def __str__(self):
         return f"{self.job_seeker} applied for {self.vacancy}"
 
 # ----------------------------
 # Advisory Models
 # ----------------------------
-class AdvisoryCategory(models.Model):
+class AdvisoryCategory(CounterFieldsMixin, models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     icon = models.CharField(max_length=50, default='📚')
 
+    # Denormalized counter, maintained by jobs/counters.py
+    article_count = models.PositiveIntegerField(default=0, editable=False)
+    COUNTER_FIELDS = ('article_count',)
+
     def __str__(self):
         return self.name
 
@@ -199,18 +516,56 @@ class AdvisoryArticle(models.Model):
     author = models.CharField(max_length=100, default='Career Advisor')
     published_date = models.DateTimeField(auto_now_add=True)
     is_published = models.BooleanField(default=True)
-    featured_image = models.ImageField(upload_to='advisory/', blank=True, null=True)
+    featured_image = models.ImageField(upload_to='advisory/', storage=blob_storage, blank=True, null=True)
+
+    # Derived from content on save
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    read_minutes = models.PositiveSmallIntegerField(default=1, editable=False)
+
+    WORDS_PER_MINUTE = 200
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.word_count, self.read_minutes = self.reading_stats(self.content)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'content' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'word_count', 'read_minutes'}
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def reading_stats(cls, content):
+        """Return (word_count, read_minutes) for a body of text."""
+        word_count = len(content.split())
+        return word_count, max(1, round(word_count / cls.WORDS_PER_MINUTE))
+
     def get_absolute_url(self):
         return reverse('advisory_detail', kwargs={'article_id': self.id})
 
+
+class RelatedArticle(models.Model):
+    """One of an article's most similar articles, precomputed by
+    jobs/related.py; ``rank`` 0 is the closest."""
+    article = models.ForeignKey(AdvisoryArticle, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(AdvisoryArticle, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['article', 'rank']
+        # Also the index advisory_detail's lookup walks
+        constraints = [
+            models.UniqueConstraint(fields=['article', 'rank'], name='related_article_rank'),
+        ]
+
+    def __str__(self):
+        return f"{self.article_id} -> {self.related_id} ({self.score:.2f})"
+
 # ----------------------------
 # Referral Models
 # ----------------------------
-class ReferralPartner(models.Model):
+class ReferralPartner(CounterFieldsMixin, models.Model):
     CATEGORY_CHOICES = [
         ('training', 'Training & Education'),
         ('counseling', 'Career Counseling'),
@@ -232,6 +587,10 @@ class ReferralPartner(models.Model):
     address = models.TextField(blank=True)
     is_active = models.BooleanField(default=True)
 
+    # Denormalized counter, maintained by jobs/counters.py
+    referral_count = models.PositiveIntegerField(default=0, editable=False)
+    COUNTER_FIELDS = ('referral_count',)
+
     def __str__(self):
         return self.name
 
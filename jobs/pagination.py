@@ -0,0 +1,123 @@
+import base64
+import binascii
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import DateTimeField, Q
+from django.utils.dateparse import parse_datetime
+
+
+# ----------------------------
+# Keyset (cursor) pagination
+# ----------------------------
+# Pages are addressed by an opaque "after" token that encodes the
+# (posted_date, id) of the last row on the previous page, so fetching
+# page 500 is the same indexed range scan as fetching page 1. Other
+# non-null sort columns (e.g. salary_max_zar_annual) work the same way.
+
+def default_page_size():
+    return getattr(settings, 'JOBS_PAGE_SIZE', 10)
+
+
+def max_page_size():
+    return getattr(settings, 'JOBS_MAX_PAGE_SIZE', 50)
+
+
+def encode_cursor(value, pk):
+    stamp = value.isoformat() if hasattr(value, 'isoformat') else str(value)
+    raw = f"{stamp}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token, parse=parse_datetime):
+    """Return (value, pk) for a token, or None if it is malformed."""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        stamp, pk = raw.rsplit('|', 1)
+        value = parse(stamp)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError, ValidationError):
+        return None
+    if value is None:
+        return None
+    return value, pk
+
+
+def get_page_size(value, default=None):
+    """Clamp a user supplied ``page_size`` to 1..JOBS_MAX_PAGE_SIZE."""
+    default = default or default_page_size()
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, max_page_size()))
+
+
+class CursorPage:
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+class CursorPaginator:
+    """Newest-first paginator over ``(posted_date, id)``.
+
+    Unlike ``django.core.paginator.Paginator`` there is no COUNT query and
+    no OFFSET: each page is ``WHERE (posted_date, id) < cursor LIMIT n+1``,
+    an index range search starting at the cursor.
+    ``field`` may name another column, as long as it is never NULL in
+    ``queryset``.
+    """
+
+    def __init__(self, queryset, per_page=None, field='posted_date'):
+        self.field = field
+        self.per_page = per_page or default_page_size()
+        self.queryset = queryset.order_by(f'-{field}', '-id')
+        model_field = queryset.model._meta.get_field(field)
+        self.parse = parse_datetime if isinstance(model_field, DateTimeField) else model_field.to_python
+
+    def page_queryset(self, after=None):
+        """The unevaluated query for the page after ``after`` (plus one
+        look-ahead row used to detect whether a next page exists)."""
+        queryset = self.queryset
+        cursor = decode_cursor(after, self.parse)
+        if cursor is not None:
+            value, pk = cursor
+            # The bare ``<=`` bound is what SQLite can turn into an index
+            # range (SEARCH ... <?); the OR alone makes it walk the index
+            # from the start and filter every row before the cursor
+            queryset = queryset.filter(**{f'{self.field}__lte': value}).filter(
+                Q(**{f'{self.field}__lt': value}) |
+                Q(**{self.field: value, 'id__lt': pk})
+            )
+        return queryset[:self.per_page + 1]
+
+    def get_page(self, after=None):
+        return self._page(list(self.page_queryset(after)))
+
+    async def aget_page(self, after=None):
+        return self._page([row async for row in self.page_queryset(after)])
+
+    def _page(self, rows):
+        next_cursor = None
+        if len(rows) > self.per_page:
+            rows = rows[:self.per_page]
+            last = rows[-1]
+            next_cursor = encode_cursor(getattr(last, self.field), last.pk)
+        return CursorPage(rows, next_cursor)
@@ -0,0 +1,74 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import expiry, featuring, traffic
+from .templating import prewarm_templates
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------
+# In-process periodic jobs
+# ----------------------------
+# The maintenance jobs (expiry sweeps, traffic flushes, featuring) each
+# have a management command for cron and, when their interval setting is
+# non-zero, also run from a daemon thread in every web process, started
+# by start_background_jobs() from wsgi.py/asgi.py. They are idempotent
+# and safe to run concurrently, so several processes can share them.
+
+_runners = {}
+_lock = threading.Lock()
+
+
+def start_periodic(name, func, interval, at_exit=None):
+    """Call ``func()`` every ``interval`` seconds on a daemon thread named
+    ``name``, on fresh database connections, logging its exceptions, and
+    ``at_exit()`` when the process exits. Returns the threading.Event that
+    stops it; one runner per name and process."""
+    with _lock:
+        if name in _runners:
+            return _runners[name]
+        stop = _runners[name] = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            close_old_connections()
+            try:
+                func()
+            except Exception:
+                logger.exception('Periodic job %s failed', name)
+            finally:
+                close_old_connections()
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+    if at_exit is not None:
+        atexit.register(_run_at_exit, name, at_exit)
+    return stop
+
+
+def _run_at_exit(name, func):
+    try:
+        func()
+    except Exception:
+        logger.exception('Periodic job %s failed at exit', name)
+
+
+def start_background_jobs():
+    """Per-process startup: compile the templates if
+    JOBS_PREWARM_TEMPLATES is set, and start each periodic job whose
+    interval setting is non-zero."""
+    if getattr(settings, 'JOBS_PREWARM_TEMPLATES', False):
+        prewarm_templates()
+
+    jobs = [
+        ('vacancy-expiry', expiry.sweep, expiry.sweep_interval(), None),
+        ('vacancy-traffic', traffic.flush_and_prune, traffic.flush_interval(), traffic.flush),
+        ('vacancy-featuring', featuring.recompute, featuring.featuring_interval(), None),
+    ]
+    for name, func, interval, at_exit in jobs:
+        if interval:
+            start_periodic(name, func, interval, at_exit)
@@ -0,0 +1,48 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+# ----------------------------
+# Token-bucket rate limiting
+# ----------------------------
+# A bucket holds up to ``capacity`` tokens and gains one every
+# ``refill_seconds``; each action takes one, so a user can do ``capacity``
+# actions in a burst and then one per refill period. Buckets live in the
+# cache named by JOBS_RATE_LIMIT_CACHE as (tokens, last refill time), so
+# with a shared cache backend the limit holds across processes; the
+# read-modify-write is only serialized within a process, which at worst
+# lets a few extra actions through under a cross-process race.
+
+_lock = threading.Lock()
+
+
+def rate_limit_cache():
+    return caches[getattr(settings, 'JOBS_RATE_LIMIT_CACHE', 'default')]
+
+
+class TokenBucket:
+    def __init__(self, name, capacity, refill_seconds):
+        self.name = name
+        self.capacity = capacity
+        self.refill_seconds = refill_seconds
+
+    def _key(self, key):
+        return f'jobs:bucket:{self.name}:{key}'
+
+    def take(self, key):
+        """Take a token for ``key``. Returns 0 if one was available,
+        otherwise the seconds until there will be one."""
+        cache = rate_limit_cache()
+        cache_key = self._key(key)
+        with _lock:
+            now = time.time()
+            tokens, updated = cache.get(cache_key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) / self.refill_seconds)
+            if tokens < 1:
+                return (1 - tokens) * self.refill_seconds
+            # Expires once it would be full again anyway
+            cache.set(cache_key, (tokens - 1, now), timeout=int(self.capacity * self.refill_seconds) + 1)
+            return 0
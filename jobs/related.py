@@ -0,0 +1,108 @@
+import logging
+
+from django.db import transaction
+
+from . import cache, matching
+from .match_store import get_store
+from .models import AdvisoryArticle, RelatedArticle
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------
+# Related articles
+# ----------------------------
+# Each published article's NEIGHBOURS most similar published articles, by
+# cosine similarity of their TF-IDF vectors in the match index
+# (jobs/match_store.py), are stored in RelatedArticle, so advisory_detail
+# reads them with one indexed lookup. `manage.py build_related_articles`
+# computes the whole table; after that, saving or deleting an article
+# recomputes only the lists it is in or should now be in (refresh_later,
+# from jobs/signals.py). Vacancy pages query the index directly: there
+# are far more vacancies than articles, and they change far more often.
+
+NEIGHBOURS = 5
+
+
+def _neighbours(index, documents):
+    """{article id: [(related id, score)]} for (id, terms) documents."""
+    return {
+        pk: [(other, score) for other, score in index.top('articles', terms, NEIGHBOURS + 1) if other != pk][:NEIGHBOURS]
+        for pk, terms in documents
+    }
+
+
+def _save(neighbours):
+    RelatedArticle.objects.filter(article_id__in=list(neighbours)).delete()
+    RelatedArticle.objects.bulk_create([
+        RelatedArticle(article_id=pk, related_id=other, rank=rank, score=score)
+        for pk, related in neighbours.items()
+        for rank, (other, score) in enumerate(related)
+    ])
+    cache.invalidate(*[f'advisory-article:{pk}' for pk in neighbours])
+
+
+def rebuild():
+    """Recompute every list. Returns the number of published articles."""
+    index = get_store().generation()
+    neighbours = _neighbours(index, matching.documents('articles'))
+    with transaction.atomic():
+        RelatedArticle.objects.exclude(article_id__in=list(neighbours)).delete()
+        _save(neighbours)
+    return len(neighbours)
+
+
+def refresh(pks, listed_in=()):
+    """Recompute the lists of articles ``pks``, of the articles whose lists
+    held them (or ``listed_in``, for deleted articles) and of the articles
+    they are now similar to."""
+    index = get_store().generation()
+    neighbours = _neighbours(index, matching.documents('articles', pks))
+    neighbours.update((pk, []) for pk in pks if pk not in neighbours)  # unpublished or deleted
+
+    affected = set(listed_in)
+    affected.update(RelatedArticle.objects.filter(related_id__in=pks).values_list('article_id', flat=True))
+    for related in neighbours.values():
+        affected.update(other for other, _ in related)
+    affected.difference_update(neighbours)
+    neighbours.update(_neighbours(index, matching.documents('articles', affected)))
+
+    with transaction.atomic():
+        _save(neighbours)
+
+
+def refresh_later(pks, listed_in=()):
+    """refresh() once the current transaction commits, after the match
+    index has logged the change. Skipped until the index has been built."""
+    if not matching.available():
+        return
+    pks, listed_in = list(pks), list(listed_in)
+
+    def update():
+        if get_store().current_name() is None:
+            return
+        try:
+            refresh(pks, listed_in)
+        except Exception:
+            logger.exception('Updating related articles for %s failed', pks)
+    transaction.on_commit(update)
+
+
+def related_links(article_id, count):
+    """``article_id``'s closest published articles as RelatedArticle rows
+    (with ``related`` loaded), best first."""
+    return (
+        RelatedArticle.objects.filter(article_id=article_id, related__is_published=True)
+        .select_related('related').order_by('rank')[:count]
+    )
+
+
+def articles_for_vacancy(vacancy, count=3):
+    """Published articles closest to ``vacancy``'s text, best first; empty
+    until the match index has been built."""
+    if not matching.available() or get_store().current_name() is None:
+        return []
+    terms = matching.vacancy_terms(vacancy.title, vacancy.description, vacancy.requirements)
+    matches = get_store().top('articles', terms, count)
+    articles = AdvisoryArticle.objects.filter(is_published=True).in_bulk([pk for pk, _ in matches])
+    return [articles[pk] for pk, _ in matches if pk in articles]
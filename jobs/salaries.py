@@ -0,0 +1,143 @@
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+
+
+# ----------------------------
+# Salary normalization
+# ----------------------------
+# Free-text salaries ("R15 000 - R18 000 pm", "$25/hour", "R420k p.a.")
+# are parsed once, when a vacancy is saved or imported, into
+# salary_min/salary_max/currency/salary_period. From those and the
+# admin-maintained ExchangeRate table each vacancy also stores an
+# annualized ZAR range, which is what vacancy_list filters and sorts on.
+# `manage.py normalize_salaries` backfills existing rows.
+
+PERIOD_MULTIPLIERS = {
+    'hour': 40 * 52,
+    'day': 5 * 52,
+    'week': 52,
+    'month': 12,
+    'year': 1,
+}
+
+CURRENCY_MARKERS = [
+    ('USD', re.compile(r'\$|\bUSD\b|\bdollars?\b', re.I)),
+    ('EUR', re.compile(r'€|\bEUR\b|\beuros?\b', re.I)),
+    ('GBP', re.compile(r'£|\bGBP\b|\bpounds?\b', re.I)),
+    ('ZAR', re.compile(r'\bR\s?\d|\bZAR\b|\brands?\b', re.I)),
+]
+
+# (?<![a-z]) rather than \b so "15000pm" still counts as per month
+PERIOD_MARKERS = [
+    ('hour', re.compile(r'(?<![a-z])p/?h(?![a-z])|/\s*h(ou)?r\b|\bper\s+h(ou)?r\b|\bhourly\b|\ban\s+hour\b', re.I)),
+    ('day', re.compile(r'(?<![a-z])p/?d(?![a-z])|/\s*day\b|\bper\s+day\b|\bdaily\b|\ba\s+day\b', re.I)),
+    ('week', re.compile(r'(?<![a-z])p/?w(?![a-z])|/\s*w(ee)?k\b|\bper\s+week\b|\bweekly\b', re.I)),
+    ('month', re.compile(
+        r'(?<![a-z])p\.?/?m\.?(?![a-z])|(?<![a-z])pcm\b|/\s*m(on)?th\b|/\s*m\b|\bper\s+month\b|\bmonthly\b', re.I
+    )),
+    ('year', re.compile(
+        r'(?<![a-z])p\.?/?a\.?(?![a-z])|/\s*y(ea)?r\b|\bper\s+(annum|year)\b|\bannual(ly)?\b|\byearly\b|\bctc\b', re.I
+    )),
+]
+
+# "15 000", "15,000.50", "15000", "15.5", optionally followed by k or m
+AMOUNT_RE = re.compile(r'(\d{1,3}(?:[ ,\u00a0]\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)(?:\s*([km])\b)?', re.I)
+UPPER_BOUND_RE = re.compile(r'\b(up\s+to|max(imum)?|below|under)\b', re.I)
+LOWER_BOUND_RE = re.compile(r'\b(from|min(imum)?|starting|at\s+least)\b|\d\s*k?\s*\+', re.I)
+ORDINAL_RE = re.compile(r'\b\d+(st|nd|rd|th)\b', re.I)  # "13th cheque"
+
+# Adverts here quote monthly pay unless they say otherwise; a six-figure
+# amount with no period is an annual package.
+ANNUAL_THRESHOLD = 100_000
+# The largest amount the *_zar_annual columns hold (max_digits=14)
+MAX_ZAR_ANNUAL = Decimal('999999999999.99')
+
+
+def _amounts(text):
+    values = []
+    for number, suffix in AMOUNT_RE.findall(text):
+        try:
+            value = Decimal(re.sub(r'[ ,\u00a0]', '', number))
+        except InvalidOperation:
+            continue
+        if suffix:
+            value *= 1000 if suffix.lower() == 'k' else 1_000_000
+        values.append(value)
+    return values
+
+
+def parse_salary(text):
+    """Parse a free-text salary.
+
+    Returns ``(salary_min, salary_max, currency, period)``, with one bound
+    None for "from"/"up to" salaries, or None if there is no amount.
+    """
+    if not text:
+        return None
+    text = ORDINAL_RE.sub(' ', text)
+    amounts = [value for value in _amounts(text) if value > 0]
+    if not amounts:
+        return None
+
+    if len(amounts) >= 2:
+        low, high = sorted(amounts[:2])
+    elif UPPER_BOUND_RE.search(text):
+        low, high = None, amounts[0]
+    elif LOWER_BOUND_RE.search(text):
+        low, high = amounts[0], None
+    else:
+        low = high = amounts[0]
+
+    currency = next((code for code, pattern in CURRENCY_MARKERS if pattern.search(text)), 'ZAR')
+    period = next((name for name, pattern in PERIOD_MARKERS if pattern.search(text)), None)
+    if period is None:
+        period = 'year' if max(value for value in (low, high) if value) >= ANNUAL_THRESHOLD else 'month'
+    return low, high, currency, period
+
+
+def exchange_rates():
+    """{currency: ZAR per unit}, always including ZAR itself."""
+    from .models import ExchangeRate
+    rates = dict(ExchangeRate.objects.values_list('currency', 'zar_per_unit'))
+    rates['ZAR'] = Decimal(1)
+    return rates
+
+
+def annual_zar(salary_min, salary_max, currency, period, rates):
+    """Annualized ZAR (low, high) for a structured salary.
+
+    A missing bound takes the other one's value, so "from R10 000" still
+    matches a minimum-salary filter. (None, None) when there is no amount
+    or no exchange rate for the currency.
+    """
+    low = salary_min if salary_min is not None else salary_max
+    high = salary_max if salary_max is not None else salary_min
+    rate = rates.get(currency)
+    if low is None or rate is None:
+        return None, None
+    factor = Decimal(rate) * PERIOD_MULTIPLIERS.get(period, 1)
+    cents = Decimal('0.01')
+    return (Decimal(low) * factor).quantize(cents), (Decimal(high) * factor).quantize(cents)
+
+
+def refresh_zar_salaries(currency):
+    """Recompute the annualized ZAR columns of every vacancy paid in
+    ``currency`` after its exchange rate changed: one UPDATE per period."""
+    from .models import Vacancy
+
+    vacancies = Vacancy.objects.filter(currency=currency)
+    rate = exchange_rates().get(currency)
+    if rate is None:
+        return vacancies.update(salary_min_zar_annual=None, salary_max_zar_annual=None)
+
+    updated = 0
+    for period, multiplier in PERIOD_MULTIPLIERS.items():
+        factor = Value(Decimal(rate) * multiplier)
+        updated += vacancies.filter(salary_period=period).update(
+            salary_min_zar_annual=Coalesce(F('salary_min'), F('salary_max')) * factor,
+            salary_max_zar_annual=Coalesce(F('salary_max'), F('salary_min')) * factor,
+        )
+    return updated
@@ -0,0 +1,179 @@
+import re
+
+from django.db import OperationalError, connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Vacancy
+
+
+# ----------------------------
+# Vacancy full-text search
+# ----------------------------
+# On SQLite the searchable text of every vacancy is mirrored into an FTS5
+# table (rowid = vacancy id), created by migration 0009, kept in sync by
+# jobs/signals.py and rebuilt with `manage.py rebuild_search_index`.
+# Without the table (other databases) searches fall back to icontains
+# lookups.
+
+FTS_TABLE = 'jobs_vacancy_fts'
+FTS_COLUMNS = ('title', 'company', 'location', 'description', 'requirements')
+
+# bm25() weights, in FTS_COLUMNS order: a hit in the title matters more
+# than one buried in the description.
+FTS_WEIGHTS = (10.0, 5.0, 3.0, 1.0, 1.0)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _uses_fts():
+    if connection.vendor != 'sqlite':
+        return False
+    available = getattr(connection, '_jobs_fts_available', None)
+    if available is None:
+        available = FTS_TABLE in connection.introspection.table_names()
+        connection._jobs_fts_available = available
+    return available
+
+
+def create_search_table(schema_connection):
+    """Create the FTS5 table. Returns False if FTS5 is not compiled in."""
+    if schema_connection.vendor != 'sqlite':
+        return False
+    with schema_connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                + ', '.join(FTS_COLUMNS)
+                + ", tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except OperationalError:
+            return False
+    schema_connection._jobs_fts_available = True
+    return True
+
+
+def build_match_expression(query, column=None):
+    """Turn free text into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, so user input can never be
+    parsed as FTS5 syntax: ``sales durb`` -> ``"sales"* AND "durb"*``.
+    """
+    terms = [f'"{token}"*' for token in TOKEN_RE.findall(query.lower())]
+    if not terms:
+        return ''
+    expression = ' AND '.join(terms)
+    if column:
+        return f'{column} : ({expression})'
+    return expression
+
+
+def index_vacancy(vacancy):
+    if not _uses_fts():
+        return
+    values = [getattr(vacancy, name) or '' for name in FTS_COLUMNS]
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [vacancy.pk])
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+            f"VALUES (%s, {', '.join(['%s'] * len(FTS_COLUMNS))})",
+            [vacancy.pk, *values],
+        )
+
+
+def unindex_vacancy(pk):
+    if not _uses_fts():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [pk])
+
+
+def reindex_vacancies(pks):
+    """Re-index many vacancies at once, for writes that bypass signals
+    (bulk_create, queryset.update)."""
+    pks = list(pks)
+    if not pks or not _uses_fts():
+        return
+    table = Vacancy._meta.db_table
+    columns = ', '.join(FTS_COLUMNS)
+    placeholders = ', '.join(['%s'] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", pks)
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, {columns}) "
+            f"SELECT id, {columns} FROM {table} WHERE id IN ({placeholders})",
+            pks,
+        )
+
+
+def rebuild_index():
+    """Repopulate the FTS table from jobs_vacancy. Returns the row count."""
+    if connection.vendor != 'sqlite' or not create_search_table(connection):
+        return 0
+    table = Vacancy._meta.db_table
+    columns = ', '.join(FTS_COLUMNS)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, {columns}) SELECT id, {columns} FROM {table}"
+        )
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def _fallback_q(query, fields):
+    q = Q()
+    for token in TOKEN_RE.findall(query):
+        token_q = Q()
+        for field in fields:
+            token_q |= Q(**{f'{field}__icontains': token})
+        q &= token_q
+    return q
+
+
+def filter_vacancies(queryset, query, column=None):
+    """Restrict ``queryset`` to vacancies matching ``query``.
+
+    Stays a lazy queryset (the FTS lookup is a subquery), so it composes
+    with further filters, ordering and the cursor paginator.
+    """
+    expression = build_match_expression(query, column)
+    if not expression:
+        return queryset
+    if _uses_fts():
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [expression]
+        ))
+    return queryset.filter(_fallback_q(query, [column] if column else FTS_COLUMNS))
+
+
+def search_vacancies(query, limit=50, active_only=True):
+    """Best matches for ``query``, most relevant first."""
+    expression = build_match_expression(query)
+    if not expression:
+        return []
+
+    queryset = Vacancy.objects.all()
+    if active_only:
+        queryset = queryset.filter(is_active=True)
+
+    if not _uses_fts():
+        return list(queryset.filter(_fallback_q(query, FTS_COLUMNS)).order_by('-posted_date')[:limit])
+
+    table = Vacancy._meta.db_table
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+    active_clause = f"AND {table}.is_active" if active_only else ''
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {table}.id FROM {FTS_TABLE} "
+            f"JOIN {table} ON {table}.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s {active_clause} "
+            f"ORDER BY bm25({FTS_TABLE}, {weights}), {table}.posted_date DESC "
+            f"LIMIT %s",
+            [expression, limit],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+
+    vacancies = queryset.in_bulk(ids)
+    return [vacancies[pk] for pk in ids if pk in vacancies]
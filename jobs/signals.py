@@ -0,0 +1,225 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save
+from django.dispatch import receiver
+from .models import (
+    Vacancy, JobSeeker, Application, AdvisoryCategory, AdvisoryArticle, RelatedArticle,
+    ReferralPartner, ReferralRequest, ExchangeRate
+)
+from . import application_stats, attachments, cache, counters, database, live, match_store, matching, related, salaries, search, storage
+
+
+# ----------------------------
+# SQLite connection tuning (see jobs/database.py)
+# ----------------------------
+connection_created.connect(database.configure_connection, dispatch_uid='jobs.configure_connection')
+
+
+# ----------------------------
+# Search index
+# ----------------------------
+@receiver(post_save, sender=Vacancy)
+def index_vacancy(sender, instance, **kwargs):
+    search.index_vacancy(instance)
+
+
+@receiver(post_delete, sender=Vacancy)
+def unindex_vacancy(sender, instance, **kwargs):
+    search.unindex_vacancy(instance.pk)
+
+
+# ----------------------------
+# Match index (see jobs/match_store.py)
+# ----------------------------
+@receiver(post_save, sender=Vacancy)
+@receiver(post_save, sender=JobSeeker)
+@receiver(post_save, sender=AdvisoryArticle)
+@receiver(post_delete, sender=Vacancy)
+@receiver(post_delete, sender=JobSeeker)
+@receiver(post_delete, sender=AdvisoryArticle)
+def update_match_index(sender, instance, signal, **kwargs):
+    if signal is post_delete and sender is Vacancy and not instance.is_active:
+        return  # closed vacancies already left the index (e.g. archived ones)
+    match_store.update_later(matching.collection_for(sender), [instance.pk])
+
+
+# ----------------------------
+# Related articles (see jobs/related.py)
+# ----------------------------
+@receiver(pre_delete, sender=AdvisoryArticle)
+def remember_related_lists(sender, instance, **kwargs):
+    # The cascade removes the rows listing this article before post_delete
+    instance._related_listed_in = list(
+        RelatedArticle.objects.filter(related=instance).values_list('article_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=AdvisoryArticle)
+@receiver(post_delete, sender=AdvisoryArticle)
+def update_related_articles(sender, instance, **kwargs):
+    # Connected after update_match_index, so the index is current by then
+    related.refresh_later([instance.pk], getattr(instance, '_related_listed_in', ()))
+
+
+# ----------------------------
+# Attachment derivatives
+# ----------------------------
+@receiver(post_save, sender=Vacancy)
+def process_attachment(sender, instance, raw=False, **kwargs):
+    if not raw:
+        attachments.attachment_changed(instance)
+
+
+@receiver(post_delete, sender=Vacancy)
+def delete_attachment_derivatives(sender, instance, **kwargs):
+    attachments.delete_derivatives(instance)
+
+
+# ----------------------------
+# Live feed (see jobs/live.py)
+# ----------------------------
+@receiver(pre_save, sender=Vacancy)
+def remember_featured(sender, instance, raw=False, **kwargs):
+    # Only matters when the vacancy is (now) featured
+    instance._was_featured = bool(
+        not raw and instance.pk and instance.is_featured
+        and Vacancy.objects.filter(pk=instance.pk, is_featured=True).exists()
+    )
+
+
+@receiver(post_save, sender=Vacancy)
+def publish_to_live_feed(sender, instance, created, raw=False, **kwargs):
+    if raw or not instance.is_active:
+        return
+    if created:
+        live.publish_vacancy(instance, 'created')
+    elif instance.is_featured and not getattr(instance, '_was_featured', True):
+        live.publish_vacancy(instance, 'featured')
+
+
+# ----------------------------
+# Salary exchange rates
+# ----------------------------
+@receiver(post_save, sender=ExchangeRate)
+@receiver(post_delete, sender=ExchangeRate)
+def refresh_zar_salaries(sender, instance, **kwargs):
+    if salaries.refresh_zar_salaries(instance.currency):
+        cache.invalidate('vacancies')
+
+
+# ----------------------------
+# Page cache invalidation
+# ----------------------------
+def invalidate_advisory_categories(*category_ids):
+    """Drop the advisory home, the given category pages and every article
+    page in them (each shows its category and related articles)."""
+    category_ids = {pk for pk in category_ids if pk is not None}
+    article_ids = AdvisoryArticle.objects.filter(category_id__in=category_ids).values_list('id', flat=True)
+    cache.invalidate(
+        'advisory',
+        *[f'advisory-category:{pk}' for pk in category_ids],
+        *[f'advisory-article:{pk}' for pk in article_ids],
+    )
+
+
+@receiver(post_save, sender=Vacancy)
+@receiver(post_delete, sender=Vacancy)
+def invalidate_vacancy_pages(sender, instance, **kwargs):
+    cache.invalidate('vacancies')
+
+
+@receiver(post_save, sender=ReferralPartner)
+@receiver(post_delete, sender=ReferralPartner)
+def invalidate_referral_pages(sender, instance, **kwargs):
+    cache.invalidate('referrals')
+
+
+@receiver(post_save, sender=AdvisoryCategory)
+@receiver(post_delete, sender=AdvisoryCategory)
+def invalidate_category_pages(sender, instance, **kwargs):
+    invalidate_advisory_categories(instance.pk)
+
+
+@receiver(post_save, sender=AdvisoryArticle)
+@receiver(post_delete, sender=AdvisoryArticle)
+def invalidate_article_pages(sender, instance, **kwargs):
+    cache.invalidate(f'advisory-article:{instance.pk}')
+    # An article moved to another category must also leave the old one
+    previous = getattr(instance, '_counter_previous', {})
+    invalidate_advisory_categories(instance.category_id, previous.get('category'))
+
+
+# ----------------------------
+# Denormalized counters
+# ----------------------------
+@receiver(pre_save, sender=Application)
+@receiver(pre_save, sender=ReferralRequest)
+@receiver(pre_save, sender=AdvisoryArticle)
+def remember_counter_parents(sender, instance, **kwargs):
+    instance._counter_previous = counters.previous_parents(instance)
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_save, sender=ReferralRequest)
+@receiver(post_save, sender=AdvisoryArticle)
+def count_saved_child(sender, instance, created, **kwargs):
+    counters.record_save(instance, created, getattr(instance, '_counter_previous', {}))
+
+
+@receiver(post_delete, sender=Application)
+@receiver(post_delete, sender=ReferralRequest)
+@receiver(post_delete, sender=AdvisoryArticle)
+def count_deleted_child(sender, instance, **kwargs):
+    counters.record_delete(instance)
+
+
+# ----------------------------
+# Daily application stats (see jobs/application_stats.py)
+# ----------------------------
+@receiver(pre_save, sender=Application)
+def remember_stats_key(sender, instance, raw=False, **kwargs):
+    instance._stats_previous = None if raw else application_stats.previous_key(instance)
+
+
+@receiver(post_save, sender=Application)
+def count_application_stats(sender, instance, raw=False, **kwargs):
+    if not raw:
+        application_stats.record_save(instance, instance._stats_previous)
+
+
+@receiver(post_delete, sender=Application)
+def uncount_application_stats(sender, instance, **kwargs):
+    application_stats.record_delete(instance)
+
+
+# ----------------------------
+# Blob reference counts
+# ----------------------------
+def _blob_fields(instance):
+    return [field for label, field in storage.BLOB_FIELDS if label == instance._meta.label]
+
+
+def remember_blob_names(sender, instance, **kwargs):
+    fields = _blob_fields(instance)
+    previous = sender.objects.filter(pk=instance.pk).values(*fields).first() if instance.pk else None
+    instance._blob_previous = previous or {}
+
+
+def count_blob_references(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, '_blob_previous', {})
+    for field in _blob_fields(instance):
+        name = getattr(instance, field).name or ''
+        old = previous.get(field) or ''
+        if name != old:
+            storage.add_reference(name)
+            storage.drop_reference(old)
+
+
+def release_blob_references(sender, instance, **kwargs):
+    for field in _blob_fields(instance):
+        storage.drop_reference(getattr(instance, field).name or '')
+
+
+for label, _ in storage.BLOB_FIELDS:
+    pre_save.connect(remember_blob_names, sender=label, dispatch_uid=f'remember_blob_names:{label}')
+    post_save.connect(count_blob_references, sender=label, dispatch_uid=f'count_blob_references:{label}')
+    post_delete.connect(release_blob_references, sender=label, dispatch_uid=f'release_blob_references:{label}')
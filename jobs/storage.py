@@ -0,0 +1,130 @@
+import hashlib
+import os
+import posixpath
+
+from django.apps import apps
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import transaction
+from django.db.models import F
+
+
+# ----------------------------
+# Content-addressed blob storage
+# ----------------------------
+# Uploads are stored once per distinct content under
+# blobs/<sha[:2]>/<sha256>/<first upload's file name>; re-uploading the
+# same PDF or image returns the existing blob instead of writing a copy.
+# jobs.models.StoredBlob keeps a reference count per blob, maintained by
+# jobs/signals.py for every field in BLOB_FIELDS, and a blob directory
+# (including its rendered thumbnails) is deleted when the count drops to
+# zero. `manage.py dedupe_media` moves pre-existing files into the store.
+
+BLOB_PREFIX = 'blobs'
+HASH_CHUNK_SIZE = 64 * 1024
+
+# (model label, field name) of every FileField stored here
+BLOB_FIELDS = [
+    ('jobs.Vacancy', 'attachment'),
+    ('jobs.ArchivedVacancy', 'attachment'),
+    ('jobs.JobSeeker', 'resume'),
+    ('jobs.AdvisoryArticle', 'featured_image'),
+    ('accounts.JobseekerProfile', 'resume'),
+]
+
+
+def blob_storage():
+    return storages['blobs']
+
+
+def is_blob_name(name):
+    return bool(name) and name.startswith(BLOB_PREFIX + '/')
+
+
+def blob_directory(sha256):
+    return posixpath.join(BLOB_PREFIX, sha256[:2], sha256)
+
+
+def sha256_of(content):
+    """Hex SHA-256 of a File, reusing the digest computed while streaming
+    the upload (jobs/uploads.py) when there is one."""
+    digest = getattr(content, 'sha256', None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK_SIZE):
+        hasher.update(chunk)
+    if hasattr(content, 'seek'):
+        content.seek(0)
+    return hasher.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def get_available_name(self, name, max_length=None):
+        # Only the base name is kept (see _save) and blob directories are
+        # unique per content, so there is nothing to de-collide.
+        return name
+
+    def _save(self, name, content):
+        from .models import StoredBlob
+
+        sha256 = sha256_of(content)
+        existing = StoredBlob.objects.filter(sha256=sha256).values_list('name', flat=True).first()
+        if existing and self.exists(existing):
+            return existing
+
+        blob_name = posixpath.join(blob_directory(sha256), os.path.basename(name))
+        if not self.exists(blob_name):
+            blob_name = super()._save(blob_name, content)
+        StoredBlob.objects.update_or_create(
+            sha256=sha256, defaults={'name': blob_name, 'size': content.size}
+        )
+        return blob_name
+
+    def delete_blob(self, name):
+        """Remove a blob's directory: the file and anything rendered next to it."""
+        directory = posixpath.dirname(name)
+        if not is_blob_name(directory) or not self.exists(directory):
+            return
+        _, files = self.listdir(directory)
+        for filename in files:
+            self.delete(posixpath.join(directory, filename))
+        try:
+            os.rmdir(self.path(directory))
+        except OSError:
+            pass
+
+
+# ----------------------------
+# Reference counting
+# ----------------------------
+def add_reference(name):
+    if is_blob_name(name):
+        from .models import StoredBlob
+        StoredBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+
+def drop_reference(name):
+    if not is_blob_name(name):
+        return
+    from .models import StoredBlob
+    StoredBlob.objects.filter(name=name).update(ref_count=F('ref_count') - 1)
+
+    def collect():
+        # Re-checked after commit: a concurrent save may have re-used it
+        if StoredBlob.objects.filter(name=name, ref_count__lte=0).delete()[0]:
+            blob_storage().delete_blob(name)
+    transaction.on_commit(collect)
+
+
+def blob_references():
+    """{blob name: number of rows referencing it} across BLOB_FIELDS."""
+    counts = {}
+    for label, field in BLOB_FIELDS:
+        names = apps.get_model(label).objects.filter(
+            **{f'{field}__startswith': BLOB_PREFIX + '/'}
+        ).values_list(field, flat=True)
+        for name in names.iterator():
+            counts[name] = counts.get(name, 0) + 1
+    return counts
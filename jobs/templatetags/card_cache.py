@@ -0,0 +1,23 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from jobs import cache
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def render_cards(context, vacancies, template_name, name='vacancy', *vary):
+    """Render ``template_name`` once per vacancy, from the fragment cache.
+
+    Usage: ``{% render_cards vacancies 'jobs/partials/timeline_card.html' %}``.
+    The card sees the vacancy as ``name``; pass anything else it depends on
+    after that, e.g. ``{% render_cards vacancies 'jobs/vacancy_card.html' 'job' user.pk %}``.
+    """
+    card = context.template.engine.get_template(template_name)
+
+    def render(vacancy):
+        with context.push(**{name: vacancy}):
+            return card.render(context)
+
+    return mark_safe(cache.render_cards(vacancies, template_name, render, vary))
@@ -0,0 +1,146 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.base import Node, Template
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------
+# Template pre-warming
+# ----------------------------
+# With the cached loader (jobcentre/settings_production.py) a template is
+# read and compiled the first time it is used, by whichever request gets
+# there first. prewarm_templates() compiles every template under the
+# loaders' directories up front; start_background_jobs() (jobs/periodic.py)
+# calls it at startup when JOBS_PREWARM_TEMPLATES is set, so with a
+# preloading server the compiled templates are shared by every worker.
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+def django_engines():
+    return [backend.engine for backend in engines.all() if isinstance(backend, DjangoTemplates)]
+
+
+def _loader_dirs(loaders):
+    for loader in loaders:
+        if hasattr(loader, 'loaders'):  # cached.Loader
+            yield from _loader_dirs(loader.loaders)
+        elif hasattr(loader, 'get_dirs'):
+            yield from loader.get_dirs()
+
+
+def template_names(engine):
+    """Every template name the engine's filesystem/app loaders can find."""
+    names = {}
+    for directory in _loader_dirs(engine.template_loaders):
+        for root, _, files in os.walk(directory):
+            for filename in sorted(files):
+                if filename.endswith(TEMPLATE_EXTENSIONS):
+                    path = os.path.relpath(os.path.join(root, filename), directory)
+                    names.setdefault(path.replace(os.sep, '/'), None)
+    return list(names)
+
+
+def prewarm_templates():
+    """Compile every template. Returns (loaded, failed) counts."""
+    loaded = failed = 0
+    for engine in django_engines():
+        for name in template_names(engine):
+            try:
+                engine.get_template(name)
+            except (TemplateSyntaxError, TemplateDoesNotExist) as e:
+                failed += 1
+                logger.warning('Could not pre-compile template %s: %s', name, e)
+            else:
+                loaded += 1
+    logger.info('Pre-compiled %s templates (%s failed)', loaded, failed)
+    return loaded, failed
+
+
+# ----------------------------
+# Render profiling
+# ----------------------------
+# Used by `manage.py profile_templates`. Template._render is the one method
+# every render goes through (render(), {% include %} and {% extends %}'s
+# parent), so timing it gives each template's inclusive time; the time
+# spent in templates it renders is subtracted to get its self time.
+
+class TemplateStats:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.render_time = 0.0  # seconds, including nested templates
+        self.self_time = 0.0
+        self.output_bytes = 0
+        self.parse_time = None  # best of several compiles
+        self.nodes = None
+
+    @property
+    def mean_render_ms(self):
+        return self.render_time * 1000 / self.calls if self.calls else 0.0
+
+    @property
+    def mean_bytes(self):
+        return self.output_bytes // self.calls if self.calls else 0
+
+
+class RenderProfile:
+    def __init__(self):
+        self.stats = {}  # name -> TemplateStats
+        self._nested = []  # time spent in templates rendered by the one on top
+
+    @contextmanager
+    def active(self):
+        original = Template._render
+        profile = self
+
+        def _render(template, context):
+            profile._nested.append(0.0)
+            start = time.perf_counter()
+            try:
+                output = original(template, context)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = profile._nested.pop()
+                if profile._nested:
+                    profile._nested[-1] += elapsed
+            profile.record(template.name or '<string>', elapsed, elapsed - nested, output)
+            return output
+
+        Template._render = _render
+        try:
+            yield self
+        finally:
+            Template._render = original
+
+    def record(self, name, elapsed, self_time, output):
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = TemplateStats(name)
+        stats.calls += 1
+        stats.render_time += elapsed
+        stats.self_time += self_time
+        stats.output_bytes += len(str(output).encode())
+
+    def measure_parsing(self, repeat=5):
+        """Fill in parse_time and nodes by recompiling each rendered template."""
+        engine = django_engines()[0]
+        for stats in self.stats.values():
+            try:
+                template = engine.get_template(stats.name)
+            except TemplateDoesNotExist:
+                continue
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                compiled = Template(template.source, template.origin, stats.name, engine)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            stats.parse_time = best
+            stats.nodes = len(compiled.nodelist.get_nodes_by_type(Node))
@@ -1,3 +1,1445 @@
-from django.test import TestCase
+import asyncio
+import hashlib
+import io
+import json
+import os
+import unittest
+from datetime import timedelta
+from decimal import Decimal
+import shutil
+import tempfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+from PIL import Image
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection, connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import EmployerProfile
+
+from .models import (
+    Vacancy, JobSeeker, Application, ApplicationDailyStats,
+    AdvisoryCategory, AdvisoryArticle, RelatedArticle,
+    ReferralPartner, ReferralRequest, StoredBlob, ExchangeRate, validate_file_size,
+    ArchivedVacancy, ArchivedApplication, VacancyHourlyStats,
+)
+from .cache import cache_public_page, fragment_cache, invalidate, page_cache, render_cards
+from .exports import export_queryset, export_stream, parquet_stream, pyarrow
+from .imports import import_vacancies
+from .live import get_broker
+from . import application_stats, applications, attachments, database, expiry, featuring, matching, periodic, search, traffic, views
+from .match_store import IndexStore, get_store
+from .pagination import CursorPaginator
+from .ratelimit import rate_limit_cache
+from .salaries import parse_salary
+from .search import search_vacancies
+from .storage import blob_storage
+from .templating import prewarm_templates
+from .uploads import MAX_UPLOAD_MB, RejectedUpload, ValidatingUploadHandler
+
+
+class AdminChangelistQueryBudgetTests(TestCase):
+    """Changelist pages must cost a fixed number of queries, however many
+    rows are on the page (no per-row COUNT or FK lookups)."""
+
+    QUERY_BUDGET = 12
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+        self._rows = 0
+
+    def add_rows(self, count):
+        for _ in range(count):
+            n = self._rows = self._rows + 1
+            user = User.objects.create_user(f'seeker{n}')
+            seeker = JobSeeker.objects.create(user=user, skills='python')
+            vacancy = Vacancy.objects.create(title=f'Job {n}', company=f'Company {n}')
+            Application.objects.create(vacancy=vacancy, job_seeker=seeker)
+            Application.objects.create(
+                vacancy=vacancy, job_seeker=JobSeeker.objects.create(user=User.objects.create_user(f'other{n}'))
+            )
+
+            category = AdvisoryCategory.objects.create(name=f'Category {n}')
+            AdvisoryArticle.objects.create(category=category, title=f'Article {n}', content='word ' * 400)
+
+            partner = ReferralPartner.objects.create(
+                name=f'Partner {n}', category='other', description='-', contact_info='-'
+            )
+            ReferralRequest.objects.create(job_seeker=seeker, partner=partner, reason='-')
+
+    def changelist_queries(self, model):
+        url = reverse(f'admin:jobs_{model._meta.model_name}_changelist')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def assert_constant_queries(self, model):
+        self.add_rows(3)
+        small = self.changelist_queries(model)
+        self.add_rows(30)
+        large = self.changelist_queries(model)
+        self.assertEqual(small, large, f'{model.__name__} changelist queries grow with row count')
+        self.assertLessEqual(large, self.QUERY_BUDGET)
+
+    def test_jobseeker_changelist(self):
+        self.assert_constant_queries(JobSeeker)
+
+    def test_application_changelist(self):
+        self.assert_constant_queries(Application)
+
+    def test_advisory_category_changelist(self):
+        self.assert_constant_queries(AdvisoryCategory)
+
+    def test_advisory_article_changelist(self):
+        self.assert_constant_queries(AdvisoryArticle)
+
+    def test_referral_partner_changelist(self):
+        self.assert_constant_queries(ReferralPartner)
+
+    def test_referral_request_changelist(self):
+        self.assert_constant_queries(ReferralRequest)
+
+    def test_vacancy_changelist(self):
+        self.assert_constant_queries(Vacancy)
+
+    def test_count_columns_are_sortable(self):
+        self.add_rows(2)
+        partner = ReferralPartner.objects.get(name='Partner 2')
+        seeker = JobSeeker.objects.get(user__username='seeker1')
+        ReferralRequest.objects.create(job_seeker=seeker, partner=partner, reason='-')
+
+        url = reverse('admin:jobs_referralpartner_changelist')
+        column = self.client.get(url).context['cl'].list_display.index('referrals_count')
+        response = self.client.get(url, {'o': f'-{column}'})
+        names = [obj.name for obj in response.context['cl'].result_list]
+        self.assertEqual(names, ['Partner 2', 'Partner 1'])
+
+
+class DenormalizedCounterTests(TestCase):
+    def setUp(self):
+        self.seeker = JobSeeker.objects.create(user=User.objects.create_user('seeker'))
+        self.vacancy = Vacancy.objects.create(title='Job')
+        self.partner = ReferralPartner.objects.create(name='P', category='other', description='-', contact_info='-')
+        self.category = AdvisoryCategory.objects.create(name='CV')
+
+    def assertCounts(self, obj, **expected):
+        obj.refresh_from_db()
+        self.assertEqual({name: getattr(obj, name) for name in expected}, expected)
+
+    def test_counters_follow_create_move_and_delete(self):
+        application = Application.objects.create(vacancy=self.vacancy, job_seeker=self.seeker)
+        ReferralRequest.objects.create(job_seeker=self.seeker, partner=self.partner, reason='-')
+        self.assertCounts(self.vacancy, application_count=1)
+        self.assertCounts(self.seeker, application_count=1, referral_count=1)
+        self.assertCounts(self.partner, referral_count=1)
+
+        other = Vacancy.objects.create(title='Other')
+        application.vacancy = other
+        application.save()
+        self.assertCounts(self.vacancy, application_count=0)
+        self.assertCounts(other, application_count=1)
+
+        other.delete()
+        self.assertCounts(self.seeker, application_count=0, referral_count=1)
+
+    def test_saving_a_stale_instance_keeps_the_counters(self):
+        stale_vacancy = Vacancy.objects.get(pk=self.vacancy.pk)
+        stale_seeker = JobSeeker.objects.get(pk=self.seeker.pk)
+        Application.objects.create(vacancy=self.vacancy, job_seeker=self.seeker)
+        stale_vacancy.title = 'Renamed'
+        stale_vacancy.save()
+        stale_seeker.phone = '0800'
+        stale_seeker.save()
+        self.assertCounts(self.vacancy, title='Renamed', application_count=1)
+        self.assertCounts(self.seeker, phone='0800', application_count=1)
+
+    def test_article_reading_stats_and_category_count(self):
+        article = AdvisoryArticle.objects.create(category=self.category, title='A', content='word ' * 450)
+        self.assertEqual((article.word_count, article.read_minutes), (450, 2))
+        self.assertCounts(self.category, article_count=1)
+        article.delete()
+        self.assertCounts(self.category, article_count=0)
+
+    def test_recount_repairs_drift(self):
+        from .counters import recount
+        Application.objects.bulk_create([Application(vacancy=self.vacancy, job_seeker=self.seeker)])
+        fixed = recount()
+        self.assertEqual(fixed['Vacancy.application_count'], 1)
+        self.assertCounts(self.vacancy, application_count=1)
+        self.assertEqual(recount()['Vacancy.application_count'], 0)
+
+
+@override_settings(JOBS_ATTACHMENT_WORKERS=0)
+class AttachmentDerivativeTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.settings_override = override_settings(MEDIA_ROOT=media)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def upload(self, name, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            vacancy = Vacancy.objects.create(
+                is_upload_only=True, attachment=SimpleUploadedFile(name, content)
+            )
+        vacancy.refresh_from_db()
+        return vacancy
+
+    def test_image_thumbnails(self):
+        buffer = io.BytesIO()
+        Image.new('RGBA', (1200, 1600), (255, 0, 0, 128)).save(buffer, 'PNG')
+        vacancy = self.upload('card.png', buffer.getvalue())
+
+        self.assertTrue(vacancy.has_thumbnail)
+        self.assertEqual(vacancy.page_preview.name, '')
+        with Image.open(vacancy.thumbnail_webp.path) as thumb:
+            self.assertEqual((thumb.format, thumb.size), ('WEBP', (640, 400)))
+        with Image.open(vacancy.thumbnail_jpeg.path) as thumb:
+            self.assertEqual((thumb.format, thumb.size), ('JPEG', (640, 400)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            vacancy.attachment = None
+            vacancy.save()
+        vacancy.refresh_from_db()
+        self.assertEqual(vacancy.derivatives_source, '')
+        self.assertEqual(vacancy.thumbnail_jpeg.name, '')
+
+    def test_rendered_blob_is_reused_and_pages_refreshed(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (800, 600)).save(buffer, 'PNG')
+        first = self.upload('card.png', buffer.getvalue())
+        with mock.patch.object(attachments, 'cache') as cache:
+            second = self.upload('copy.png', buffer.getvalue())
+        self.assertEqual(second.thumbnail_webp.name, first.thumbnail_webp.name)
+        cache.invalidate.assert_called_once_with('vacancies')
+
+    def test_derivatives_are_written_to_the_attachment_storage(self):
+        storage = Vacancy._meta.get_field('attachment').storage
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        self.addCleanup(storage._clear_cached_properties, 'MEDIA_ROOT')
+        buffer = io.BytesIO()
+        Image.new('RGB', (800, 600)).save(buffer, 'PNG')
+        # Only the blob store moves away from MEDIA_ROOT
+        with mock.patch.object(storage, '_location', location):
+            storage._clear_cached_properties('MEDIA_ROOT')
+            vacancy = self.upload('card.png', buffer.getvalue())
+            self.assertTrue(vacancy.thumbnail_webp.path.startswith(location))
+            self.assertTrue(vacancy.thumbnail_webp.storage.exists(vacancy.thumbnail_webp.name))
+
+    def test_bad_image_is_logged_not_raised(self):
+        with self.assertLogs('jobs.attachments', 'ERROR'):
+            vacancy = self.upload('card.png', b'not an image')
+        self.assertFalse(vacancy.has_thumbnail)
+
+
+class UploadValidationTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        override = override_settings(MEDIA_ROOT=media, JOBS_ATTACHMENT_WORKERS=0)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def post_attachment(self, name, content):
+        upload = SimpleUploadedFile(name, content)
+        return self.client.post(reverse('admin:jobs_vacancy_add'), {
+            'title': '', 'currency': 'ZAR', 'salary_period': 'year', 'job_type': 'full_time',
+            'is_active': 'on', 'is_upload_only': 'on', 'attachment': upload,
+        })
+
+    def test_valid_pdf_is_hashed_while_streaming(self):
+        content = b'%PDF-1.4\n' + b'0' * 1000
+        handler = ValidatingUploadHandler()
+        handler.new_file('attachment', 'card.pdf', 'application/pdf', len(content))
+        self.assertIsNone(handler.receive_data_chunk(content[:100], 0))
+        handler.receive_data_chunk(content[100:], 100)
+        upload = handler.file_complete(len(content))
+        self.assertEqual(upload.sha256, hashlib.sha256(content).hexdigest())
+        self.assertEqual(upload.read(), content)
+
+    def test_renamed_file_is_rejected_by_content(self):
+        response = self.post_attachment('card.pdf', b'MZ\x90\x00 not really a pdf')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'does not match an allowed type')
+        self.assertFalse(Vacancy.objects.exists())
+
+    def test_valid_upload_is_saved(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (10, 10)).save(buffer, 'PNG')
+        response = self.post_attachment('card.png', buffer.getvalue())
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Vacancy.objects.get().attachment.read(), buffer.getvalue())
+
+    def test_oversized_file_stops_being_written(self):
+        handler = ValidatingUploadHandler()
+        handler.new_file('resume', 'cv.pdf', 'application/pdf', None)
+        chunk = b'%PDF-' + b'0' * (64 * 1024 - 5)
+        for start in range(0, MAX_UPLOAD_MB * 1024 * 1024 + 1, len(chunk)):
+            handler.receive_data_chunk(chunk, start)
+        self.assertIsNone(handler.file)
+        upload = handler.file_complete(handler.received)
+        self.assertIsInstance(upload, RejectedUpload)
+        with self.assertRaisesMessage(ValidationError, 'File too large'):
+            validate_file_size(upload)
+
+    def test_other_fields_pass_through(self):
+        handler = ValidatingUploadHandler()
+        handler.new_file('featured_image', 'x.png', 'image/png', 3)
+        self.assertEqual(handler.receive_data_chunk(b'abc', 0), b'abc')
+        self.assertIsNone(handler.file_complete(3))
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        # Thumbnails are covered by AttachmentDerivativeTests
+        patcher = mock.patch('jobs.attachments.schedule')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create(self, name, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Vacancy.objects.create(attachment=SimpleUploadedFile(name, content))
+
+    def test_identical_uploads_share_one_blob_until_both_are_deleted(self):
+        content = b'%PDF-1.4 same job card'
+        first = self.create('card.pdf', content)
+        second = self.create('card-copy.pdf', content)
+        self.assertEqual(first.attachment.name, second.attachment.name)
+        self.assertTrue(first.attachment.name.startswith('blobs/'))
+        blob = StoredBlob.objects.get()
+        self.assertEqual((blob.sha256, blob.ref_count), (hashlib.sha256(content).hexdigest(), 2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(blob_storage().exists(blob.name))
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(StoredBlob.objects.exists())
+        self.assertFalse(blob_storage().exists(blob.name))
+
+    def test_replacing_an_upload_releases_the_old_blob(self):
+        vacancy = self.create('a.pdf', b'%PDF-1.4 a')
+        old = vacancy.attachment.name
+        with self.captureOnCommitCallbacks(execute=True):
+            vacancy.attachment = SimpleUploadedFile('b.pdf', b'%PDF-1.4 b')
+            vacancy.save()
+        self.assertEqual(list(StoredBlob.objects.values_list('name', 'ref_count')), [(vacancy.attachment.name, 1)])
+        self.assertFalse(blob_storage().exists(old))
+
+
+class VacancySearchTests(TestCase):
+    def setUp(self):
+        # Oldest first: relevance, not recency, must put it on top
+        self.welder = Vacancy.objects.create(title='Welder', company='Acme', location='Durban')
+        self.fitter = Vacancy.objects.create(title='Fitter', company='Beta', description='Some welding and welder work.')
+        Vacancy.objects.create(title='Welder', company='Gamma', is_active=False)
+
+    def test_bm25_ranks_title_hits_first(self):
+        self.assertTrue(search._uses_fts())
+        self.assertEqual(search_vacancies('welder'), [self.welder, self.fitter])
+        self.assertEqual(search_vacancies('weld durb'), [self.welder])
+        self.assertEqual(search_vacancies('"); DROP'), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.welder.title = 'Boilermaker'
+        self.welder.save()
+        self.assertEqual(search_vacancies('welder'), [self.fitter])
+        self.assertEqual(search_vacancies('boilermaker'), [self.welder])
+
+        self.fitter.delete()
+        self.assertEqual(search_vacancies('welder'), [])
+
+    def test_search_view(self):
+        url = reverse('jobs:vacancy_search')
+        response = self.client.get(url, {'q': 'weld'})
+        self.assertEqual(response.context['vacancies'], [self.welder, self.fitter])
+        self.assertContains(response, '2 results for')
+        self.assertEqual(self.client.get(url).context['vacancies'], [])
+
+    def test_admin_search_uses_the_index(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        response = self.client.get(reverse('admin:jobs_vacancy_changelist'), {'q': 'gamma welder'})
+        self.assertEqual([v.company for v in response.context['cl'].result_list], ['Gamma'])
+
+
+class VacancyImportTests(TestCase):
+    CSV = (
+        'external_id,title,company,location,salary_min,is_active,closing_date\n'
+        'A1,Welder,Acme,Durban,12000,yes,2030-01-31\n'
+        'A2,Driver,Acme,Durban,abc,yes,\n'
+        'A3,Clerk,Acme,Pinetown,,no,\n'
+        ',Nameless,Acme,Durban,,,\n'
+    )
+
+    def run_import(self, text, fmt='csv', **kwargs):
+        return import_vacancies(io.BytesIO(text.encode()), fmt, 'acme', **kwargs)
+
+    def test_csv_rows_are_validated_and_upserted_in_batches(self):
+        reports = self.run_import(self.CSV, batch_size=2)
+        self.assertEqual([(r.created, r.updated, r.failed) for r in reports], [(1, 0, 1), (1, 0, 1)])
+        self.assertEqual([line for r in reports for line, _ in r.errors], [3, 5])
+        self.assertIn('salary_min', reports[0].errors[0][1])
+        welder = Vacancy.objects.get(external_id='A1')
+        self.assertEqual((welder.salary_min, str(welder.closing_date)), (12000, '2030-01-31'))
+        self.assertFalse(Vacancy.objects.get(external_id='A3').is_active)
+
+        Vacancy.objects.filter(pk=welder.pk).update(application_count=4)
+        reports = self.run_import('external_id,title,company\nA1,Senior Welder,Acme\nA9,Fitter,Acme\n')
+        self.assertEqual((reports[0].created, reports[0].updated), (1, 1))
+        welder.refresh_from_db()
+        self.assertEqual((welder.title, welder.application_count), ('Senior Welder', 4))
+        self.assertEqual(Vacancy.objects.filter(import_source='acme').count(), 3)
+        self.assertEqual([v.pk for v in search_vacancies('senior welder')], [welder.pk])
+
+    def test_import_keeps_closed_at_for_archiving(self):
+        self.run_import('external_id,title,is_active\nA1,Welder,yes\n')
+        self.assertIsNone(Vacancy.objects.get().closed_at)
+
+        self.run_import('external_id,title,is_active\nA1,Welder,no\n')
+        closed_at = Vacancy.objects.get().closed_at
+        self.assertIsNotNone(closed_at)
+        self.run_import('external_id,title,is_active\nA1,Welder,no\n')
+        self.assertEqual(Vacancy.objects.get().closed_at, closed_at)
+        self.assertEqual(expiry.archive(days=0), (1, 0))
+
+        self.run_import('external_id,title,is_active\nA2,Clerk,no\n')
+        self.run_import('external_id,title,is_active\nA2,Clerk,yes\n')
+        self.assertIsNone(Vacancy.objects.get().closed_at)
+
+    def test_jsonl_bad_lines_are_reported_and_dry_run_writes_nothing(self):
+        feed = '{"external_id": 7, "title": "Nurse"}\nnot json\n\n[1]\n'
+        reports = self.run_import(feed, fmt='jsonl', dry_run=True)
+        self.assertEqual((reports[0].created, [line for line, _ in reports[0].errors]), (1, [2, 4]))
+        self.assertFalse(Vacancy.objects.exists())
+
+        self.run_import(feed, fmt='jsonl')
+        self.assertEqual(Vacancy.objects.get().external_id, '7')
+
+    def test_admin_upload(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        response = self.client.post(reverse('admin:jobs_vacancy_import'), {
+            'feed': SimpleUploadedFile('feed.csv', self.CSV.encode(), 'text/csv'),
+            'source': 'acme',
+        })
+        self.assertContains(response, '2 created, 0 updated, 2 rows rejected')
+        self.assertContains(response, 'line 5')
+        self.assertEqual(Vacancy.objects.filter(import_source='acme').count(), 2)
+
+
+class StreamingExportTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        seeker = JobSeeker.objects.create(user=User.objects.create_user('thandi', 'thandi@example.com'))
+        self.welder = Vacancy.objects.create(title='Welder', company='Acme')
+        clerk = Vacancy.objects.create(title='Clerk', company='Beta')
+        Application.objects.create(vacancy=self.welder, job_seeker=seeker, status='accepted')
+        Application.objects.create(vacancy=clerk, job_seeker=seeker)
+
+    def test_admin_csv_export_uses_changelist_filters(self):
+        url = reverse('admin:jobs_application_export', args=['csv'])
+        response = self.client.get(url, {'status__exact': 'accepted', 'o': '1'})
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment; filename="applications-', response['Content-Disposition'])
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:4], ['id', 'vacancy_id', 'vacancy_title', 'vacancy_company'])
+        self.assertEqual([line.split(',')[2] for line in lines[1:]], ['Welder'])
+
+        # From a changelist with "Show counts" on, or opened as a popup
+        response = self.client.get(url, {'status__exact': 'accepted', '_facets': 'True', '_popup': '1', '_to_field': 'id'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(b''.join(response.streaming_content).decode().splitlines()), 2)
+
+        self.assertEqual(self.client.get(url, {'cover_letter': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'applied_date__gte': 'soon'}).status_code, 400)
+
+    def test_jsonl_export_with_search(self):
+        rows = [json.loads(line) for line in export_stream('vacancies', 'jsonl', {'is_active__exact': '1'}, 'welder')]
+        self.assertEqual([(row['id'], row['application_count']) for row in rows], [(self.welder.pk, 1)])
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow is not installed')
+    def test_parquet_export_in_row_groups(self):
+        content = b''.join(parquet_stream('applications', export_queryset('applications'), row_group_size=1))
+        parquet = pyarrow.parquet.ParquetFile(io.BytesIO(content))
+        self.assertEqual((parquet.metadata.num_rows, parquet.num_row_groups), (2, 2))
+        self.assertEqual(parquet.read().column('username').to_pylist(), ['thandi', 'thandi'])
+
+
+class SalaryNormalizationTests(TestCase):
+    def test_parse_salary(self):
+        cases = {
+            'R15 000 - R20 000 per month': (15000, 20000, 'ZAR', 'month'),
+            'R12 000 p/m + 13th cheque': (12000, 12000, 'ZAR', 'month'),
+            '$25/hour': (25, 25, 'USD', 'hour'),
+            'R420k p.a.': (420000, 420000, 'ZAR', 'year'),
+            'R350 000 CTC': (350000, 350000, 'ZAR', 'year'),
+            'Up to R30k': (None, 30000, 'ZAR', 'month'),
+            'From R10 000': (10000, None, 'ZAR', 'month'),
+            'Negotiable': None,
+        }
+        for text, expected in cases.items():
+            with self.subTest(text):
+                self.assertEqual(parse_salary(text), expected)
+
+    def test_save_parses_and_annualizes(self):
+        vacancy = Vacancy.objects.create(title='Welder', salary='R15 000 - R20 000 pm')
+        self.assertEqual((vacancy.salary_min, vacancy.salary_max, vacancy.salary_period), (15000, 20000, 'month'))
+        self.assertEqual((vacancy.salary_min_zar_annual, vacancy.salary_max_zar_annual), (180000, 240000))
+        self.assertEqual(vacancy.formatted_salary(), 'R15,000 - R20,000 per month')
+
+        # Entered amounts win over the text
+        vacancy = Vacancy.objects.create(title='Clerk', salary='market related', salary_min=200000)
+        self.assertEqual((vacancy.salary_min_zar_annual, vacancy.salary_max_zar_annual), (200000, 200000))
+
+    def test_rate_change_refreshes_foreign_salaries(self):
+        vacancy = Vacancy.objects.create(title='Remote dev', salary='$3,000 per month')
+        rate = ExchangeRate.objects.get(currency='USD')
+        self.assertEqual(vacancy.salary_max_zar_annual, 36000 * rate.zar_per_unit)
+
+        rate.zar_per_unit = Decimal('20')
+        rate.save()
+        vacancy.refresh_from_db()
+        self.assertEqual(vacancy.salary_max_zar_annual, 720000)
+
+        rate.delete()
+        vacancy.refresh_from_db()
+        self.assertIsNone(vacancy.salary_max_zar_annual)
+
+    def test_vacancy_list_salary_filter_and_sort(self):
+        for salary in ('R10 000 pm', 'R30 000 pm', 'R500k p.a.', ''):
+            Vacancy.objects.create(title=f'Job {salary or "unpaid"}', salary=salary)
+        url = reverse('jobs:vacancy_list')
+
+        response = self.client.get(url, {'min_salary': '300000'})
+        self.assertEqual({v.salary for v in response.context['vacancies']}, {'R30 000 pm', 'R500k p.a.'})
+        # A range search on salary, not a walk of every active row
+        vacancies, field = views._filtered_vacancies(RequestFactory().get(url, {'min_salary': '300000'}))
+        self.assertIn('SEARCH', CursorPaginator(vacancies, field=field).page_queryset().explain())
+
+        response = self.client.get(url, {'sort': 'salary', 'page_size': 2})
+        self.assertEqual([v.salary for v in response.context['vacancies']], ['R500k p.a.', 'R30 000 pm'])
+        response = self.client.get(reverse('jobs:vacancy_list_fragment') + '?' + response.context['next_query'])
+        self.assertEqual([v.salary for v in response.context['vacancies']], ['R10 000 pm'])
+
+
+class PublicPageCacheTests(TestCase):
+    def setUp(self):
+        page_cache().clear()
+
+    def test_only_anonymous_gets_are_cached(self):
+        calls = []
+
+        @cache_public_page('vacancies')
+        def view(request):
+            calls.append(request.method)
+            return HttpResponse(f'page {len(calls)}')
+
+        def request(method='get', user=None):
+            request = getattr(RequestFactory(), method)('/jobs/')
+            request.user = user or AnonymousUser()
+            return request
+
+        self.assertEqual(view(request()).content, b'page 1')
+        self.assertEqual(view(request()).content, b'page 1')
+        view(request(user=User.objects.create_user('reader')))
+        view(request('post'))
+        self.assertEqual(calls, ['GET', 'GET', 'POST'])
+
+        invalidate('vacancies')
+        self.assertEqual(view(request()).content, b'page 4')
+
+    def test_saves_invalidate_dependent_pages(self):
+        vacancy = Vacancy.objects.create(title='Barista', company='Bean Co')
+        category = AdvisoryCategory.objects.create(name='Interviews')
+        article = AdvisoryArticle.objects.create(category=category, title='First interview', content='Be early.')
+        pages = [reverse('home'), reverse('advisory_category', args=[category.pk])]
+        for url in pages:
+            self.client.get(url)
+
+        vacancy.title = 'Head barista'
+        vacancy.save()
+        article.title = 'Your first interview'
+        article.save()
+        self.assertContains(self.client.get(pages[0]), 'Head barista')
+        self.assertContains(self.client.get(pages[1]), 'Your first interview')
+
+    def test_admin_publish_from_a_filtered_changelist(self):
+        category = AdvisoryCategory.objects.create(name='Interviews')
+        draft = AdvisoryArticle.objects.create(
+            category=category, title='Salary talks', content='Know your worth.', is_published=False,
+        )
+        url = reverse('advisory_category', args=[category.pk])
+        self.assertNotContains(self.client.get(url), 'Salary talks')
+
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.client.post(reverse('admin:jobs_advisoryarticle_changelist') + '?is_published__exact=0', {
+            'action': 'publish_articles', '_selected_action': [draft.pk],
+        })
+        self.client.logout()
+        self.assertContains(self.client.get(url), 'Salary talks')
+
+
+class RenderedCardCacheTests(TestCase):
+    def setUp(self):
+        fragment_cache().clear()
+
+    def test_cards_render_once_per_version(self):
+        first = Vacancy.objects.create(title='Welder')
+        second = Vacancy.objects.create(title='Baker')
+        rendered = []
+
+        def render(vacancy):
+            rendered.append(vacancy.pk)
+            return f'<{vacancy.title}>'
+
+        template = 'jobs/partials/timeline_card.html'
+        self.assertEqual(render_cards([first, second], template, render), '<Welder><Baker>')
+        self.assertEqual(render_cards([second, first], template, render), '<Baker><Welder>')
+        self.assertEqual(rendered, [first.pk, second.pk])
+
+        first.title = 'Boilermaker'
+        first.save(update_fields=['title'])
+        self.assertEqual(render_cards([first, second], template, render), '<Boilermaker><Baker>')
+        self.assertEqual(rendered, [first.pk, second.pk, first.pk])
+
+        # Separate entries per template and per vary value
+        render_cards([second], template, render, vary=[7])
+        render_cards([second], 'jobs/vacancy_card.html', render)
+        self.assertEqual(rendered[3:], [second.pk, second.pk])
+
+    def test_card_keys_do_not_age(self):
+        vacancy = Vacancy.objects.create(title='Welder')
+        rendered = []
+        render = lambda v: rendered.append(v.pk) or '<card>'
+        render_cards([vacancy], 'jobs/partials/timeline_card.html', render)
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(hours=3)):
+            render_cards([vacancy], 'jobs/partials/timeline_card.html', render)
+        self.assertEqual(rendered, [vacancy.pk])
+
+        fragment_cache().clear()
+        html = self.client.get(reverse('jobs:vacancy_list')).content.decode()
+        self.assertRegex(html, r'<time datetime="[^"]+" data-timesince>')
+
+    def test_listing_shows_edits(self):
+        vacancy = Vacancy.objects.create(title='Night shift packer')
+        url = reverse('jobs:vacancy_list')
+        self.assertContains(self.client.get(url), 'Night shift packer')
+
+        vacancy.title = 'Day shift packer'
+        vacancy.save()
+        response = self.client.get(url)
+        self.assertContains(response, 'Day shift packer')
+        self.assertNotContains(response, 'Night shift packer')
+
+
+class TemplateProfilingTests(TestCase):
+    def test_prewarm_compiles_templates(self):
+        loaded, _ = prewarm_templates()
+        self.assertGreater(loaded, 0)
+
+    def test_profile_reports_partials(self):
+        Vacancy.objects.create(title='Forklift driver', company='Acme')
+        out = io.StringIO()
+        call_command('profile_templates', repeat=1, limit=0, stdout=out)
+        report = out.getvalue()
+        self.assertIn('✓ vacancy_list', report)
+        self.assertIn('jobs/partials/timeline_card.html', report)
+        self.assertIn('base.html', report)
+
+
+class AsyncPublicViewTests(TestCase):
+    def setUp(self):
+        self.vacancy = Vacancy.objects.create(title='Barista', company='Bean Co', is_featured=True)
+        category = AdvisoryCategory.objects.create(name='Interviews')
+        self.article = AdvisoryArticle.objects.create(category=category, title='First interview', content='Be early.')
+        AdvisoryArticle.objects.create(category=category, title='Follow-up emails', content='Say thanks.')
+        self.partner = ReferralPartner.objects.create(name='Skills Hub', category='other', description='-', contact_info='-')
+        self.urls = [
+            reverse('home'),
+            reverse('jobs:vacancy_list') + '?location=cape',
+            reverse('jobs:vacancy_list_fragment'),
+            reverse('jobs:job_feed'),
+            reverse('jobs:job_feed_fragment'),
+            reverse('jobs:vacancy_detail', args=[self.vacancy.pk]),
+            reverse('advisory_home'),
+            reverse('advisory_category', args=[category.pk]),
+            reverse('advisory_detail', args=[self.article.pk]),
+            reverse('referrals_home'),
+            reverse('referral_partner_detail', args=[self.partner.pk]),
+        ]
+
+    async def test_pages_render_in_the_event_loop(self):
+        # A lazy queryset or user left for the template would raise
+        # SynchronousOnlyOperation here.
+        user = await User.objects.acreate(username='reader')
+        await self.async_client.aforce_login(user)
+        for url in self.urls:
+            with self.subTest(url):
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_home_needs_two_queries(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('home'))
+        self.assertEqual([v.pk for v in response.context['featured_vacancies']], [self.vacancy.pk])
+        self.assertEqual(response.context['total_active_jobs'], 1)
+
+
+class LiveFeedTests(TestCase):
+    async def committed(self, write, *args, **kwargs):
+        """Run a write on the database thread and its on_commit callbacks."""
+        def run():
+            with self.captureOnCommitCallbacks(execute=True):
+                return write(*args, **kwargs)
+        return await sync_to_async(run)()
+
+    async def read_event(self, stream):
+        while True:
+            chunk = (await asyncio.wait_for(anext(stream), 2)).decode()
+            if chunk.startswith('event: vacancy'):
+                return json.loads(chunk.split('data: ', 1)[1])
+
+    async def test_stream_pushes_created_and_featured_vacancies(self):
+        earlier = await Vacancy.objects.acreate(title='Cashier')
+        response = await self.async_client.get(
+            reverse('jobs:job_feed_stream'), {'last_id': earlier.pk - 1}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        try:
+            replayed = await self.read_event(stream)
+            self.assertEqual((replayed['kind'], replayed['id']), ('created', earlier.pk))
+
+            vacancy = await self.committed(Vacancy.objects.create, title='Line cook', company='Grill')
+            event = await self.read_event(stream)
+            self.assertEqual((event['kind'], event['id'], event['title']), ('created', vacancy.pk, 'Line cook'))
+            self.assertIn(f'data-vacancy-id="{vacancy.pk}"', event['html'])
+
+            earlier.is_featured = True
+            await self.committed(earlier.save)
+            event = await self.read_event(stream)
+            self.assertEqual((event['kind'], event['id']), ('featured', earlier.pk))
+        finally:
+            # A disconnect cancels the stream while it waits for events
+            waiting = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0.01)
+            waiting.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiting
+        self.assertFalse(get_broker()._subscribers)
+
+    def test_wsgi_requests_are_told_not_to_reconnect(self):
+        self.assertEqual(self.client.get(reverse('jobs:job_feed_stream')).status_code, 204)
+
+
+@unittest.skipUnless(matching.available(), 'numpy is not installed')
+class MatchingTests(TestCase):
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.index_dir)
+        self.settings_override = override_settings(JOBS_MATCH_INDEX_DIR=self.index_dir)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.python = Vacancy.objects.create(
+            title='Python developer', company='Acme',
+            description='Build Django web services', requirements='Python, Django, SQL',
+        )
+        self.cook = Vacancy.objects.create(
+            title='Line cook', company='Grill', description='Prepare meals in a busy kitchen',
+        )
+        self.closed = Vacancy.objects.create(
+            title='Senior Python developer', description='Django and Python', is_active=False,
+        )
+        user = User.objects.create_user('thandi', password='password')
+        self.seeker = JobSeeker.objects.create(user=user, skills='Python, Django', experience='Two years of SQL')
+
+    def test_tokenize_keeps_technical_terms(self):
+        self.assertEqual(
+            matching.tokenize('Node.js, C++ and C#; full-time. Sales/marketing 5 years'),
+            ['node.js', 'c++', 'c#', 'full-time', 'sales', 'marketing'],
+        )
+
+    def test_recommend_ranks_best_match_first_and_skips_inactive(self):
+        matches = matching.recommend(self.seeker, 5)
+        self.assertEqual(matches[0][0], self.python)
+        self.assertNotIn(self.closed, [vacancy for vacancy, _ in matches])
+        self.assertNotIn(self.cook, [vacancy for vacancy, _ in matches])
+        self.assertLessEqual(matches[0][1], 1.0)
+
+    def test_vacancy_closed_without_signal_is_dropped(self):
+        matching.recommend(self.seeker, 5)
+        Vacancy.objects.filter(pk=self.python.pk).update(is_active=False)
+        self.assertEqual(matching.recommend(self.seeker, 5), [])
+
+    def test_saves_and_deletes_reach_other_processes_through_the_log(self):
+        matching.recommend(self.seeker, 5)  # builds the first generation
+        other_worker = IndexStore(self.index_dir)
+        terms = matching.seeker_terms(self.seeker.skills, self.seeker.experience)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.closed.is_active = True
+            self.closed.save()
+            self.python.delete()
+        self.assertEqual([pk for pk, _ in other_worker.top('vacancies', terms, 5)], [self.closed.pk])
+        self.assertEqual(get_store().pending_changes()['vacancies'], 2)
+
+    def test_compaction_folds_in_the_log(self):
+        matching.recommend(self.seeker, 5)
+        with self.captureOnCommitCallbacks(execute=True):
+            Vacancy.objects.create(title='Django developer', description='Python and SQL')
+            self.cook.delete()
+        before = matching.recommend(self.seeker, 5)
+        out = io.StringIO()
+        call_command('compact_match_index', stdout=out)
+        self.assertIn('vacancies: 2 rows (2 logged changes folded in)', out.getvalue())
+        self.assertEqual(get_store().pending_changes()['vacancies'], 0)
+        after = matching.recommend(self.seeker, 5)
+        self.assertEqual([vacancy for vacancy, _ in after], [vacancy for vacancy, _ in before])
+        self.assertEqual(len(os.listdir(self.index_dir)), 5)  # 2 generations, CURRENT, 2 locks
+
+    def test_changes_logged_during_compaction_are_kept(self):
+        store = get_store()
+        store.compact()
+        read = matching.documents
+
+        def documents(collection, pks=None):
+            rows = read(collection, pks)
+            if collection == 'vacancies' and pks is None:
+                # Another process closes a vacancy while this one reads the table
+                Vacancy.objects.filter(pk=self.python.pk).update(is_active=False)
+                store.update('vacancies', [self.python.pk])
+            return rows
+
+        with mock.patch.object(matching, 'documents', documents):
+            store.compact()
+        terms = matching.seeker_terms(self.seeker.skills, self.seeker.experience)
+        self.assertEqual(store.top('vacancies', terms, 5), [])
+
+    def test_candidates_for_a_vacancy(self):
+        JobSeeker.objects.create(user=User.objects.create_user('sipho'), skills='Cooking, kitchen hygiene')
+        self.assertEqual([seeker for seeker, _ in matching.candidates(self.python, 5)], [self.seeker])
+
+    def test_recommended_page(self):
+        self.client.force_login(self.seeker.user)
+        response = self.client.get(reverse('jobs:recommended_vacancies'))
+        self.assertContains(response, 'Python developer')
+        self.assertContains(response, '% match')
+        self.assertNotContains(response, 'Line cook')
+
+    def test_admin_action_reports_matches(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        response = self.client.post(reverse('admin:jobs_jobseeker_changelist'), {
+            'action': 'show_matching_vacancies', '_selected_action': [self.seeker.pk],
+        }, follow=True)
+        self.assertContains(response, 'Python developer')
+
+
+@unittest.skipUnless(matching.available(), 'numpy is not installed')
+class RelatedArticleTests(TestCase):
+    def setUp(self):
+        index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, index_dir)
+        self.settings_override = override_settings(JOBS_MATCH_INDEX_DIR=index_dir)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        page_cache().clear()
+
+        interviews = AdvisoryCategory.objects.create(name='Interviews')
+        writing = AdvisoryCategory.objects.create(name='Writing')
+        self.interview = AdvisoryArticle.objects.create(
+            category=interviews, title='Interview questions', content='Answer interview questions with examples',
+        )
+        self.cv = AdvisoryArticle.objects.create(
+            category=writing, title='Writing a CV', content='Keep your CV short and list skills first',
+        )
+        self.cover_letter = AdvisoryArticle.objects.create(
+            category=writing, title='Cover letters', content='A cover letter explains your CV and skills',
+        )
+        self.newest = AdvisoryArticle.objects.create(
+            category=writing, title='Salary talks', content='Negotiate the offer',
+        )
+        call_command('build_related_articles', stdout=io.StringIO())
+
+    def related(self, article):
+        return list(RelatedArticle.objects.filter(article=article).values_list('related_id', flat=True))
+
+    def test_related_by_content_not_category(self):
+        self.assertEqual(self.related(self.cv), [self.cover_letter.pk])
+        self.assertEqual(self.related(self.interview), [])
+
+    def test_advisory_detail_reads_the_table(self):
+        url = reverse('advisory_detail', args=[self.cv.pk])
+        with self.assertNumQueries(2):  # the article, its related articles
+            response = self.client.get(url)
+        self.assertEqual(response.context['related_articles'], [self.cover_letter])
+
+    def test_falls_back_to_newest_in_category(self):
+        response = self.client.get(reverse('advisory_detail', args=[self.interview.pk]))
+        self.assertEqual(response.context['related_articles'], [])
+        response = self.client.get(reverse('advisory_detail', args=[self.newest.pk]))
+        self.assertEqual(response.context['related_articles'], [self.cover_letter, self.cv])
+
+    def test_saves_and_deletes_update_the_lists(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            tips = AdvisoryArticle.objects.create(
+                category=self.interview.category, title='Interview follow-up',
+                content='After the interview questions, send a thank-you note',
+            )
+        self.assertEqual(self.related(tips), [self.interview.pk])
+        self.assertEqual(self.related(self.interview), [tips.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cv.is_published = False
+            self.cv.save()
+        self.assertEqual(self.related(self.cover_letter), [])
+        self.assertEqual(self.related(self.cv), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tips.delete()
+        self.assertEqual(self.related(self.interview), [])
+
+    def test_vacancy_detail_shows_advice(self):
+        vacancy = Vacancy.objects.create(title='Receptionist', description='Send your CV and a cover letter')
+        response = self.client.get(reverse('jobs:vacancy_detail', args=[vacancy.pk]))
+        self.assertEqual(response.context['advice_articles'], [self.cover_letter, self.cv])
+        self.assertContains(response, 'Career Advice')
+
+
+class VacancyExpiryTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        override = override_settings(MEDIA_ROOT=media)
+        override.enable()
+        self.addCleanup(override.disable)
+        patcher = mock.patch('jobs.attachments.schedule')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        page_cache().clear()
+
+        today = timezone.localdate()
+        self.expired = Vacancy.objects.create(title='Expired', closing_date=today - timedelta(days=1))
+        self.closing_today = Vacancy.objects.create(title='Closing today', closing_date=today)
+        self.open_ended = Vacancy.objects.create(title='Open ended')
+        self.seeker = JobSeeker.objects.create(user=User.objects.create_user('lerato'))
+
+    def make_dead(self, days=100, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            vacancy = Vacancy.objects.create(is_active=False, **fields)
+        Vacancy.objects.filter(pk=vacancy.pk).update(closed_at=timezone.now() - timedelta(days=days))
+        return vacancy
+
+    def test_expire_deactivates_vacancies_past_their_closing_date(self):
+        self.assertEqual(self.client.get(reverse('home')).context['total_active_jobs'], 3)
+        self.assertEqual(expiry.expire(size=1), 1)
+        self.assertEqual(
+            list(Vacancy.objects.filter(is_active=True).order_by('pk').values_list('title', flat=True)),
+            ['Closing today', 'Open ended'],
+        )
+        # The cached home page is invalidated
+        self.assertEqual(self.client.get(reverse('home')).context['total_active_jobs'], 2)
+        self.assertEqual(expiry.expire(), 0)
+
+    def test_archive_moves_long_closed_vacancies_and_applications(self):
+        dead = self.make_dead(title='Welder', description='Welding', salary_min=Decimal('9000'))
+        application = Application.objects.create(vacancy=dead, job_seeker=self.seeker, cover_letter='Hire me')
+        recent = self.make_dead(days=5, title='Recently closed')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(expiry.archive(size=1), (1, 1))
+        self.assertFalse(Vacancy.objects.filter(pk=dead.pk).exists())
+        self.assertTrue(Vacancy.objects.filter(pk=recent.pk).exists())
+        archived = ArchivedVacancy.objects.get()
+        self.assertEqual((archived.pk, archived.title), (dead.pk, 'Welder'))
+        self.assertEqual((archived.data['description'], archived.data['salary_min']), ('Welding', '9000.00'))
+        archived_application = ArchivedApplication.objects.get()
+        self.assertEqual(
+            (archived_application.pk, archived_application.vacancy, archived_application.cover_letter),
+            (application.pk, archived, 'Hire me'),
+        )
+
+    def test_archived_attachment_keeps_its_blob(self):
+        dead = self.make_dead(attachment=SimpleUploadedFile('card.pdf', b'%PDF-1.4 card'))
+        with self.captureOnCommitCallbacks(execute=True):
+            expiry.archive()
+        self.assertEqual(list(StoredBlob.objects.values_list('name', 'ref_count')), [(dead.attachment.name, 1)])
+        self.assertTrue(blob_storage().exists(dead.attachment.name))
+        with self.captureOnCommitCallbacks(execute=True):
+            ArchivedVacancy.objects.get().delete()
+        self.assertFalse(StoredBlob.objects.exists())
+
+    def test_deactivating_an_old_vacancy_restarts_the_archive_clock(self):
+        old = Vacancy.objects.create(title='Untouched for ages')
+        Vacancy.objects.filter(pk=old.pk).update(updated_at=timezone.now() - timedelta(days=200))
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        self.client.post(
+            reverse('admin:jobs_vacancy_changelist'),
+            {'action': 'make_inactive', '_selected_action': [old.pk]},
+        )
+        old.refresh_from_db()
+        self.assertFalse(old.is_active)
+        self.assertEqual(expiry.archive(), (0, 0))
+        self.assertTrue(Vacancy.objects.filter(pk=old.pk).exists())
+
+        # Reactivating clears it; a full save stamps it again
+        old.is_active = True
+        old.save()
+        self.assertIsNone(old.closed_at)
+        old.is_active = False
+        old.save(update_fields=['is_active'])
+        self.assertIsNotNone(Vacancy.objects.get(pk=old.pk).closed_at)
+
+    def test_command(self):
+        self.make_dead()
+        out = io.StringIO()
+        call_command('expire_vacancies', '--dry-run', stdout=out)
+        self.assertIn('1 vacancies would be deactivated.\n1 vacancies would be archived.', out.getvalue())
+        call_command('expire_vacancies', '--archive-after', '0', stdout=out)
+        self.assertIn('Deactivated 1 expired vacancies', out.getvalue())
+        # The vacancy expired just now is archived too with --archive-after 0
+        self.assertIn('Archived 2 vacancies and 0 applications', out.getvalue())
+
+
+class ApplicationSubmissionTests(TestCase):
+    def setUp(self):
+        override = override_settings(JOBS_APPLICATION_QUEUE=False, JOBS_APPLY_BURST=2)
+        override.enable()
+        self.addCleanup(override.disable)
+        rate_limit_cache().clear()
+        self.user = User.objects.create_user('thabo', password='pw')
+        self.client.force_login(self.user)
+        self.vacancy = Vacancy.objects.create(title='Barista')
+
+    def apply(self, vacancy=None, **data):
+        return self.client.post(reverse('jobs:apply_for_vacancy', args=[(vacancy or self.vacancy).pk]), data)
+
+    def test_apply_creates_one_application(self):
+        response = self.apply(cover_letter='I make good coffee')
+        self.assertRedirects(response, reverse('jobs:apply_for_vacancy', args=[self.vacancy.pk]))
+        application = Application.objects.get()
+        self.assertEqual((application.job_seeker.user, application.cover_letter), (self.user, 'I make good coffee'))
+        self.vacancy.refresh_from_db()
+        self.assertEqual((self.vacancy.application_count, application.job_seeker.application_count), (1, 1))
+
+        # Applying again shows the application instead of adding another
+        response = self.apply(cover_letter='Again')
+        self.assertContains(response, 'You applied for this job')
+        self.assertEqual(Application.objects.get().cover_letter, 'I make good coffee')
+        self.vacancy.refresh_from_db()
+        self.assertEqual(self.vacancy.application_count, 1)
+
+    def test_viewing_the_form_creates_no_profile(self):
+        response = self.client.get(reverse('jobs:apply_for_vacancy', args=[self.vacancy.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(JobSeeker.objects.exists())
+
+    def test_inactive_vacancy(self):
+        Vacancy.objects.filter(pk=self.vacancy.pk).update(is_active=False)
+        self.assertEqual(self.apply().status_code, 404)
+
+    def test_new_applications_are_rate_limited(self):
+        for title in ('Cook', 'Waiter'):
+            self.assertEqual(self.apply(Vacancy.objects.create(title=title)).status_code, 302)
+        response = self.apply()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertFalse(Application.objects.filter(vacancy=self.vacancy).exists())
+
+    def test_write_batch_deduplicates(self):
+        seeker = JobSeeker.objects.create(user=User.objects.create_user('naledi'))
+        other = Vacancy.objects.create(title='Cook')
+        Application.objects.create(vacancy=other, job_seeker=seeker, cover_letter='First')
+        batch = [
+            applications.Submission(self.vacancy.pk, seeker.pk, 'One'),
+            applications.Submission(self.vacancy.pk, seeker.pk, 'Two'),
+            applications.Submission(other.pk, seeker.pk, 'Second'),
+        ]
+        applications.write_batch(batch)
+        results = [submission.future.result() for submission in batch]
+        self.assertEqual([created for _, created in results], [True, False, False])
+        self.assertEqual(results[0][0].pk, results[1][0].pk)
+        self.assertEqual(results[2][0].cover_letter, 'First')
+        self.assertEqual(Application.objects.count(), 2)
+        seeker.refresh_from_db()
+        self.assertEqual(seeker.application_count, 2)
+
+    def test_unique_per_vacancy_and_seeker(self):
+        seeker = JobSeeker.objects.create(user=User.objects.create_user('naledi'))
+        Application.objects.create(vacancy=self.vacancy, job_seeker=seeker)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Application.objects.create(vacancy=self.vacancy, job_seeker=seeker)
+
+
+class ApplicationQueueTests(TransactionTestCase):
+    def test_concurrent_submissions_are_written_once(self):
+        vacancy = Vacancy.objects.create(title='Barista')
+        seekers = [JobSeeker.objects.create(user=User.objects.create_user(f'seeker{i}')) for i in range(5)]
+        queue = applications.WriteQueue()
+        batch = [applications.Submission(vacancy.pk, seeker.pk) for seeker in seekers for _ in range(2)]
+        for submission in batch:
+            queue.put(submission)
+        results = [submission.future.result(timeout=10) for submission in batch]
+        self.assertEqual(sum(created for _, created in results), 5)
+        self.assertEqual(Application.objects.count(), 5)
+        vacancy.refresh_from_db()
+        self.assertEqual(vacancy.application_count, 5)
+
+
+class ApplicationStatsTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user('acme', password='pw')
+        EmployerProfile.objects.filter(user=self.employer).update(company_name='Acme', approved=True)
+        self.vacancy = Vacancy.objects.create(title='Barista', company='Acme')
+        self.other = Vacancy.objects.create(title='Cook', company='Acme')
+        self.seekers = [JobSeeker.objects.create(user=User.objects.create_user(f'seeker{i}')) for i in range(3)]
+        self.today = timezone.localdate()
+
+    def stats(self):
+        return sorted(
+            ApplicationDailyStats.objects.filter(count__gt=0).values_list('vacancy__title', 'status', 'count')
+        )
+
+    def test_kept_up_to_date(self):
+        first = Application.objects.create(vacancy=self.vacancy, job_seeker=self.seekers[0])
+        Application.objects.create(vacancy=self.vacancy, job_seeker=self.seekers[1])
+        submission = applications.Submission(self.other.pk, self.seekers[0].pk)
+        applications.write_batch([submission])
+        self.assertEqual(self.stats(), [('Barista', 'pending', 2), ('Cook', 'pending', 1)])
+
+        first.status = 'accepted'
+        first.save()
+        self.assertEqual(self.stats(), [('Barista', 'accepted', 1), ('Barista', 'pending', 1), ('Cook', 'pending', 1)])
+        first.delete()
+        self.other.delete()
+        self.assertEqual(self.stats(), [('Barista', 'pending', 1)])
+
+    def test_rebuild_repairs_drift(self):
+        Application.objects.create(vacancy=self.vacancy, job_seeker=self.seekers[0])
+        Application.objects.bulk_create([Application(vacancy=self.vacancy, job_seeker=self.seekers[1])])
+        ApplicationDailyStats.objects.create(vacancy=self.other, date=self.today, status='rejected', count=4)
+        self.assertEqual(application_stats.rebuild(), 2)
+        self.assertEqual(self.stats(), [('Barista', 'pending', 2)])
+        self.assertEqual(application_stats.rebuild(), 0)
+
+    def test_daily_counts(self):
+        Application.objects.create(vacancy=self.vacancy, job_seeker=self.seekers[0])
+        ApplicationDailyStats.objects.create(
+            vacancy=self.other, date=self.today - timedelta(days=2), status='reviewed', count=3
+        )
+        series = application_stats.daily_counts(Vacancy.objects.all(), 3)
+        self.assertEqual(series, [(self.today - timedelta(days=2), 3), (self.today - timedelta(days=1), 0), (self.today, 1)])
+        self.assertEqual(application_stats.daily_counts([self.vacancy.pk], 2)[-1], (self.today, 1))
+
+    def test_dashboard(self):
+        for seeker in self.seekers:
+            Application.objects.create(vacancy=self.vacancy, job_seeker=seeker)
+        Application.objects.filter(job_seeker=self.seekers[0]).update(status='rejected')
+        application_stats.rebuild()
+        Vacancy.objects.create(title='Not mine', company='Rival')
+
+        self.client.force_login(self.employer)
+        with self.assertNumQueries(6):  # session, user, profile, counts, vacancies, series
+            response = self.client.get(reverse('jobs:employer_dashboard'))
+        rows = {vacancy.title: (counts, total) for vacancy, counts, total in response.context['rows']}
+        self.assertEqual(rows, {'Barista': ([2, 0, 0, 1], 3), 'Cook': ([0, 0, 0, 0], 0)})
+        self.assertEqual(response.context['series'][-1][:2], (self.today, 3))
+
+        response = self.client.get(reverse('jobs:employer_dashboard_vacancy', args=[self.other.pk]))
+        self.assertEqual(response.context['series_total'], 0)
+        rival = Vacancy.objects.get(title='Not mine')
+        self.assertEqual(self.client.get(reverse('jobs:employer_dashboard_vacancy', args=[rival.pk])).status_code, 404)
+
+    def test_dashboard_is_for_employers(self):
+        self.client.force_login(self.seekers[0].user)
+        self.assertEqual(self.client.get(reverse('jobs:employer_dashboard')).status_code, 403)
+
+
+class VacancyTrafficTests(TestCase):
+    def setUp(self):
+        traffic._take()  # whatever earlier tests left buffered
+        page_cache().clear()
+        self.welder = Vacancy.objects.create(title='Welder', is_featured=True)
+        self.baker = Vacancy.objects.create(title='Baker')
+
+    def counts(self):
+        return sorted(VacancyHourlyStats.objects.values_list('vacancy__title', 'impressions', 'views'))
+
+    def test_listings_and_detail_pages_are_counted(self):
+        self.client.get(reverse('jobs:vacancy_list'))
+        self.client.get(reverse('jobs:vacancy_detail', args=[self.baker.pk]))
+        self.client.get(reverse('jobs:vacancy_detail', args=[self.baker.pk]))
+        # Nothing is written until the buffer is flushed
+        self.assertFalse(VacancyHourlyStats.objects.exists())
+        self.assertEqual(traffic.flush(), 2)
+        self.assertEqual(self.counts(), [('Baker', 1, 2), ('Welder', 1, 0)])
+        self.baker.refresh_from_db()
+        self.assertEqual((self.baker.impression_count, self.baker.view_count), (1, 2))
+
+        # Later flushes in the same hour add to the same rows
+        self.client.get(reverse('jobs:job_feed'))
+        self.assertEqual(traffic.flush(), 2)
+        self.assertEqual(self.counts(), [('Baker', 2, 2), ('Welder', 2, 0)])
+        self.assertEqual(traffic.flush(), 0)
+
+    def test_saving_a_stale_instance_keeps_the_totals(self):
+        stale = Vacancy.objects.get(pk=self.baker.pk)
+        traffic.record_impressions([self.baker.pk])
+        traffic.record_view(self.baker.pk)
+        traffic.record_view(self.baker.pk)
+        traffic.flush()
+        stale.title = 'Head Baker'
+        stale.save()
+        self.baker.refresh_from_db()
+        self.assertEqual((self.baker.title, self.baker.impression_count, self.baker.view_count), ('Head Baker', 1, 2))
+
+    def test_cached_home_page_counts_its_featured_slots(self):
+        self.client.get(reverse('home'))
+        self.client.get(reverse('home'))  # from the page cache
+        traffic.flush()
+        self.assertEqual(self.counts(), [('Welder', 2, 0)])
+
+    def test_deleted_vacancies_are_skipped(self):
+        traffic.record_view(self.baker.pk)
+        traffic.record_view(self.welder.pk)
+        self.baker.delete()
+        traffic.flush()
+        self.assertEqual(self.counts(), [('Welder', 0, 1)])
+
+    def test_failed_flush_keeps_the_counts(self):
+        traffic.record_view(self.baker.pk)
+        with mock.patch('jobs.traffic._statements', return_value=('SELECT nonsense', 'SELECT nonsense')):
+            with self.assertRaises(Exception):
+                traffic.flush()
+        traffic.flush()
+        self.assertEqual(self.counts(), [('Baker', 0, 1)])
+
+    def test_trending(self):
+        now = timezone.now()
+        closed = Vacancy.objects.create(title='Closed', is_active=False)
+        VacancyHourlyStats.objects.bulk_create([
+            VacancyHourlyStats(vacancy=self.welder, hour=traffic.current_hour(now), views=3),
+            VacancyHourlyStats(vacancy=self.baker, hour=traffic.current_hour(now - timedelta(days=2)), views=5),
+            VacancyHourlyStats(vacancy=self.baker, hour=traffic.current_hour(now - timedelta(days=10)), views=50),
+            VacancyHourlyStats(vacancy=closed, hour=traffic.current_hour(now), views=100),
+        ])
+        # 3 views today (x4) beat 5 two days ago (x2); older views don't count
+        self.assertEqual(traffic.trending(5, now), [(self.welder.pk, 12), (self.baker.pk, 10)])
+        self.assertEqual(traffic.trending_vacancies(1), [self.welder])
+
+        response = self.client.get(reverse('jobs:trending_vacancies'))
+        self.assertEqual(response.context['vacancies'], [self.welder, self.baker])
+
+        self.assertEqual(traffic.prune(days=7), 1)
+
+
+class FeaturingTests(TestCase):
+    def setUp(self):
+        override = override_settings(JOBS_FEATURED_COUNT=2, JOBS_FEATURED_PER_COMPANY=1, JOBS_FEATURED_ROTATION_HOURS=24)
+        override.enable()
+        self.addCleanup(override.disable)
+        page_cache().clear()
+        self.now = timezone.now()
+        self.today = timezone.localdate(self.now)
+
+    def vacancy(self, title, company='', age_days=0, **fields):
+        vacancy = Vacancy.objects.create(title=title, company=company, **fields)
+        Vacancy.objects.filter(pk=vacancy.pk).update(posted_date=self.now - timedelta(days=age_days))
+        return vacancy
+
+    def chosen(self):
+        return list(
+            Vacancy.objects.filter(is_featured=True, is_active=True).order_by('title').values_list('title', flat=True)
+        )
+
+    def test_scores(self):
+        old = self.vacancy('Old', age_days=30)
+        self.vacancy('Closing soon', age_days=30, closing_date=self.today + timedelta(days=2))
+        self.vacancy('Approved', 'Acme', age_days=30)
+        employer = User.objects.create_user('acme')
+        EmployerProfile.objects.filter(user=employer).update(company_name='Acme', approved=True)
+        VacancyHourlyStats.objects.create(vacancy=old, hour=traffic.current_hour(self.now), views=10)
+
+        titles = {row['id']: row['title'] for row in featuring.candidates(self.now)}
+        ranked = [titles[pk] for pk in featuring.choose(featuring.candidates(self.now), self.now)]
+        self.assertEqual(ranked, ['Old', 'Closing soon'])  # views x2, urgency x2 (6/7), approval x1
+
+    def test_one_update_with_company_quota(self):
+        self.vacancy('Acme new', 'Acme')
+        self.vacancy('Acme newer', 'Acme')
+        self.vacancy('Other', 'Other', age_days=3)
+        stale = self.vacancy('Stale', age_days=60, is_featured=True)
+        inactive = self.vacancy('Expired', is_featured=True, is_active=False)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            featured, unfeatured = featuring.recompute(self.now)
+        self.assertEqual(self.chosen(), ['Acme newer', 'Other'])
+        self.assertEqual((len(featured), unfeatured), (2, [stale.pk]))
+        self.assertEqual(Vacancy.objects.get(title='Other').featured_at, self.now)
+        inactive.refresh_from_db()
+        self.assertTrue(inactive.is_featured)  # left alone, and not counted against the slots
+        # Idempotent
+        self.assertEqual(featuring.recompute(self.now), ([], []))
+
+    def test_rotation(self):
+        self.vacancy('Top', 'Top', is_featured=True)
+        self.vacancy('Second', 'Second', age_days=1)
+        self.vacancy('Third', 'Third', age_days=2)
+        Vacancy.objects.filter(title='Top').update(featured_at=self.now - timedelta(hours=25))
+
+        featuring.recompute(self.now)
+        self.assertEqual(self.chosen(), ['Second', 'Third'])  # Top had its turn
+        featuring.recompute(self.now + timedelta(hours=20))
+        self.assertEqual(self.chosen(), ['Second', 'Third'])  # Top rests; the others keep their turn
+        featuring.recompute(self.now + timedelta(hours=30))
+        # Top is back; both other turns are over, so the best of them fills in
+        self.assertEqual(self.chosen(), ['Second', 'Top'])
+
+    def test_rested_vacancies_fill_empty_slots(self):
+        self.vacancy('Only', is_featured=True)
+        Vacancy.objects.update(featured_at=self.now - timedelta(days=3))
+        featuring.recompute(self.now)
+        self.assertEqual(self.chosen(), ['Only'])
+
+    def test_home_reads_the_cached_featured_list(self):
+        self.vacancy('Featured', 'Acme')
+        call_command('feature_vacancies', stdout=io.StringIO())
+        self.client.force_login(User.objects.create_user('visitor'))  # bypasses the page cache
+        self.assertEqual([v.title for v in self.client.get(reverse('home')).context['featured_vacancies']], ['Featured'])
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('home'))
+        self.assertFalse([q for q in queries if 'is_featured' in q['sql']])
+
+        out = io.StringIO()
+        call_command('feature_vacancies', '--dry-run', stdout=out)
+        self.assertIn('Featured at Acme', out.getvalue())
+
+    def test_home_shows_the_configured_slot_count(self):
+        for title in ('One', 'Two', 'Three'):
+            self.vacancy(title)
+        self.client.force_login(User.objects.create_user('visitor'))
+        # The recent fallback, then the featured list, both JOBS_FEATURED_COUNT long
+        self.assertEqual(len(self.client.get(reverse('home')).context['featured_vacancies']), 2)
+        Vacancy.objects.update(is_featured=True)
+        self.assertEqual(len(self.client.get(reverse('home')).context['featured_vacancies']), 2)
+
+
+class DatabaseTuningTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        default = connections['default']
+        self.file_db = default.__class__({**default.settings_dict, 'NAME': os.path.join(self.tmp, 'tuned.sqlite3')}, alias='tuned')
+        self.addCleanup(self.file_db.close)
+
+    def test_new_connections_get_the_pragmas(self):
+        with self.file_db.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+    @override_settings(JOBS_SQLITE_PRAGMAS={'busy_timeout': 250})
+    def test_settings_override_defaults(self):
+        self.assertEqual(database.health(self.file_db)['busy_timeout'], 250)
+
+    def test_health_checkpoints_the_wal(self):
+        with self.file_db.cursor() as cursor:
+            cursor.execute('CREATE TABLE t (x INTEGER)')
+            cursor.executemany('INSERT INTO t VALUES (%s)', [(n,) for n in range(1000)])
+        report = database.health(self.file_db, 'TRUNCATE')
+        self.assertEqual(report['journal_mode'], 'wal')
+        self.assertFalse(report['in_memory'])
+        self.assertGreater(report['database_bytes'], 0)
+        self.assertGreater(report['wal_bytes'], 0)
+        self.assertFalse(report['checkpoint']['busy'])
+        self.assertEqual(report['wal_bytes_after'], 0)
+
+    def test_db_health_command(self):
+        out = io.StringIO()
+        call_command('db_health', stdout=out)  # the test database is in memory
+        self.assertIn('(in-memory database)', out.getvalue())
+        self.assertIn('✓ busy_timeout = 5000', out.getvalue())
+        self.assertIn('healthy', out.getvalue())
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        for n in range(25):
+            Vacancy.objects.create(title=f'Job {n}')
+        # Ties on posted_date are broken by id
+        Vacancy.objects.filter(title__in=['Job 10', 'Job 11', 'Job 12']).update(posted_date=now)
+        self.paginator = CursorPaginator(Vacancy.objects.filter(is_active=True), per_page=4)
+
+    def test_pages_cover_every_row_once(self):
+        seen, after = [], None
+        while True:
+            page = self.paginator.get_page(after)
+            seen += [vacancy.pk for vacancy in page]
+            if not page.has_next:
+                break
+            after = page.next_cursor
+        expected = list(Vacancy.objects.order_by('-posted_date', '-id').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_later_pages_are_an_index_range_search(self):
+        cursor = self.paginator.get_page().next_cursor
+        plan = self.paginator.page_queryset(cursor).explain()
+        self.assertIn('SEARCH', plan)
+        self.assertIn('vacancy_active_posted_idx (posted_date<?)', plan)
+
+    def test_query_plan_check(self):
+        out = io.StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertIn('✓ vacancy_list: deep page', out.getvalue())
+
+
+class PeriodicJobTests(TestCase):
+    def test_runner_repeats_logs_failures_and_stops(self):
+        calls, ran_twice = [], threading.Event()
+
+        def job():
+            calls.append(1)
+            if len(calls) == 2:
+                ran_twice.set()
+            raise RuntimeError('boom')
+
+        with self.assertLogs('jobs.periodic', 'ERROR') as logs:
+            stop = periodic.start_periodic('test-job', job, 0.01)
+            self.addCleanup(periodic._runners.pop, 'test-job')
+            self.assertTrue(ran_twice.wait(5))
+            stop.set()
+        self.assertIn('Periodic job test-job failed', logs.output[0])
+        # One runner per name
+        self.assertIs(periodic.start_periodic('test-job', job, 0.01), stop)
+
+    @override_settings(JOBS_EXPIRY_INTERVAL=0, JOBS_TRAFFIC_FLUSH_INTERVAL=0, JOBS_FEATURING_INTERVAL=0)
+    def test_disabled_jobs_do_not_start(self):
+        with mock.patch('jobs.periodic.start_periodic') as start:
+            periodic.start_background_jobs()
+        start.assert_not_called()
+        with override_settings(JOBS_FEATURING_INTERVAL=60), mock.patch('jobs.periodic.start_periodic') as start:
+            periodic.start_background_jobs()
+        start.assert_called_once_with('vacancy-featuring', featuring.recompute, 60, None)
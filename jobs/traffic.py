@@ -0,0 +1,203 @@
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from functools import wraps
+from inspect import iscoroutinefunction
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, Sum, Value, When
+from django.utils import timezone
+
+from .cache import page_cache
+from .models import Vacancy, VacancyHourlyStats
+
+
+# ----------------------------
+# Vacancy traffic
+# ----------------------------
+# Listings count an impression for each vacancy card they show (home's
+# featured slots, vacancy_list, job_feed and their infinite-scroll pages)
+# and vacancy_detail counts a view. An UPDATE per request would take
+# SQLite's write lock on every page view, so counts add up in this
+# process's memory per (vacancy, hour), and a background thread
+# (flush_and_prune(), see jobs/periodic.py) writes them every
+# JOBS_TRAFFIC_FLUSH_INTERVAL seconds: one batched upsert into
+# VacancyHourlyStats and one batched increment of the Vacancy totals shown
+# in the admin, in one transaction. A crash loses at most one interval of
+# counts. Hours older than JOBS_TRAFFIC_RETENTION_DAYS are pruned.
+
+IMPRESSIONS, VIEWS = 0, 1
+
+# Trending: views in the last day count four times, in the last three
+# days twice, in the last week once
+TRENDING_WEIGHTS = ((timedelta(days=1), 4), (timedelta(days=3), 2), (timedelta(days=7), 1))
+
+_lock = threading.Lock()
+_pending = defaultdict(lambda: [0, 0])  # (vacancy id, hour) -> [impressions, views]
+
+
+def flush_interval():
+    """Seconds between flushes of the in-process buffer; 0 disables the
+    background flusher."""
+    return getattr(settings, 'JOBS_TRAFFIC_FLUSH_INTERVAL', 0)
+
+
+def retention_days():
+    return getattr(settings, 'JOBS_TRAFFIC_RETENTION_DAYS', 30)
+
+
+def trending_cache_seconds():
+    return getattr(settings, 'JOBS_TRENDING_CACHE_SECONDS', 300)
+
+
+def current_hour(now=None):
+    return (now or timezone.now()).replace(minute=0, second=0, microsecond=0)
+
+
+def _record(pks, column):
+    hour = current_hour()
+    with _lock:
+        for pk in pks:
+            _pending[(pk, hour)][column] += 1
+
+
+def record_impressions(pks):
+    _record(pks, IMPRESSIONS)
+
+
+def record_view(pk):
+    _record([pk], VIEWS)
+
+
+def count_impressions(view):
+    """Record the impressions a listing view's response lists in
+    ``response.vacancy_impressions`` (vacancy ids). The page cache keeps
+    the attribute, so cached pages count too: apply this decorator
+    outside cache_public_page. Works on sync and async views."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            response = await view(request, *args, **kwargs)
+            record_impressions(getattr(response, 'vacancy_impressions', ()))
+            return response
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        record_impressions(getattr(response, 'vacancy_impressions', ()))
+        return response
+    return wrapper
+
+
+def _take():
+    global _pending
+    with _lock:
+        pending, _pending = _pending, defaultdict(lambda: [0, 0])
+    return pending
+
+
+def _put_back(pending):
+    with _lock:
+        for key, (impressions, views) in pending.items():
+            counts = _pending[key]
+            counts[IMPRESSIONS] += impressions
+            counts[VIEWS] += views
+
+
+def _statements():
+    quote = connection.ops.quote_name
+    stats, vacancies = quote(VacancyHourlyStats._meta.db_table), quote(Vacancy._meta.db_table)
+    pk = quote(Vacancy._meta.pk.column)
+    # Counts for vacancies deleted since they were shown are dropped
+    upsert = (
+        f'INSERT INTO {stats} (vacancy_id, hour, impressions, views) '
+        f'SELECT %s, %s, %s, %s WHERE EXISTS (SELECT 1 FROM {vacancies} WHERE {pk} = %s) '
+        f'ON CONFLICT (vacancy_id, hour) DO UPDATE SET '
+        f'impressions = {stats}.impressions + excluded.impressions, views = {stats}.views + excluded.views'
+    )
+    totals = (
+        f'UPDATE {vacancies} SET impression_count = impression_count + %s, view_count = view_count + %s '
+        f'WHERE {pk} = %s'
+    )
+    return upsert, totals
+
+
+def flush():
+    """Write the buffered counts. Returns the number of (vacancy, hour)
+    rows written; on error the counts stay buffered for the next flush."""
+    pending = _take()
+    if not pending:
+        return 0
+    totals = defaultdict(lambda: [0, 0])
+    for (pk, _), (impressions, views) in pending.items():
+        totals[pk][IMPRESSIONS] += impressions
+        totals[pk][VIEWS] += views
+    upsert, increment = _statements()
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(upsert, [
+                (pk, connection.ops.adapt_datetimefield_value(hour), impressions, views, pk)
+                for (pk, hour), (impressions, views) in pending.items()
+            ])
+            cursor.executemany(increment, [(impressions, views, pk) for pk, (impressions, views) in totals.items()])
+    except Exception:
+        _put_back(pending)
+        raise
+    return len(pending)
+
+
+def prune(days=None):
+    """Delete hourly rows older than ``days``; returns how many."""
+    cutoff = current_hour() - timedelta(days=retention_days() if days is None else days)
+    deleted, _ = VacancyHourlyStats.objects.filter(hour__lt=cutoff).delete()
+    return deleted
+
+
+# ----------------------------
+# Trending
+# ----------------------------
+def trending(limit, now=None):
+    """[(vacancy id, score)] for the active vacancies with the most recent
+    views, best first."""
+    now = now or timezone.now()
+    weighted = Case(
+        *[When(hour__gte=now - age, then=F('views') * weight) for age, weight in TRENDING_WEIGHTS],
+        default=Value(0),
+    )
+    rows = (
+        VacancyHourlyStats.objects
+        .filter(hour__gte=now - TRENDING_WEIGHTS[-1][0], vacancy__is_active=True)
+        .order_by().values('vacancy_id').annotate(score=Sum(weighted)).filter(score__gt=0)
+        .order_by('-score', '-vacancy_id')[:limit]
+    )
+    return [(row['vacancy_id'], row['score']) for row in rows]
+
+
+def trending_vacancies(limit):
+    """The ``limit`` top trending active vacancies, best first. The ranking
+    is cached for JOBS_TRENDING_CACHE_SECONDS."""
+    key = f'jobs:trending:{limit}'
+    ranking = page_cache().get(key)
+    if ranking is None:
+        ranking = trending(limit)
+        page_cache().set(key, ranking, timeout=trending_cache_seconds())
+    vacancies = Vacancy.objects.filter(is_active=True).in_bulk([pk for pk, _ in ranking])
+    return [vacancies[pk] for pk, _ in ranking if pk in vacancies]
+
+
+# ----------------------------
+# In-process flusher
+# ----------------------------
+_pruned_hour = None
+
+
+def flush_and_prune():
+    """flush(), and prune() once an hour: the periodic job each web process
+    runs (jobs/periodic.py), which also flushes once more at exit."""
+    global _pruned_hour
+    flush()
+    if _pruned_hour != current_hour():
+        prune()
+        _pruned_hour = current_hour()
@@ -0,0 +1,156 @@
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.utils.deconstruct import deconstructible
+
+
+# ----------------------------
+# Streaming upload validation
+# ----------------------------
+# ValidatingUploadHandler (first in FILE_UPLOAD_HANDLERS) looks at each
+# chunk as it arrives for the file fields named in UPLOAD_RULES: the first
+# chunk's magic bytes must match an allowed type, and once the size limit
+# is crossed the rest of the file is dropped instead of being written to
+# disk. Rejected files still reach the form as an empty placeholder that
+# carries the reason, so the usual field validators report it.
+
+MAX_UPLOAD_MB = 8
+
+MAGIC_NUMBERS = {
+    'pdf': (b'%PDF-',),
+    'png': (b'\x89PNG\r\n\x1a\n',),
+    'jpeg': (b'\xff\xd8\xff',),
+    'gif': (b'GIF87a', b'GIF89a'),
+    'doc': (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',),
+    'docx': (b'PK\x03\x04',),
+}
+
+ATTACHMENT_TYPES = ('pdf', 'png', 'jpeg', 'gif')
+RESUME_TYPES = ('pdf', 'doc', 'docx')
+
+# Form field name -> (max bytes, allowed types)
+UPLOAD_RULES = {
+    'attachment': (MAX_UPLOAD_MB * 1024 * 1024, ATTACHMENT_TYPES),
+    'resume': (MAX_UPLOAD_MB * 1024 * 1024, RESUME_TYPES),
+}
+
+
+def sniff(head):
+    """Return the file type whose magic number ``head`` starts with."""
+    for kind, signatures in MAGIC_NUMBERS.items():
+        if head.startswith(signatures):
+            return kind
+    return None
+
+
+class RejectedUpload(SimpleUploadedFile):
+    """Stand-in for a file the handler refused to store.
+
+    Has no content but reports the number of bytes actually received, so
+    ``validate_file_size`` and ``FileContentValidator`` produce the error.
+    """
+
+    def __init__(self, name, content_type, size, upload_error=None):
+        super().__init__(name, b'', content_type)
+        self.size = size
+        self.upload_error = upload_error
+
+
+class ValidatingUploadHandler(FileUploadHandler):
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.rule = UPLOAD_RULES.get(field_name)
+        if self.rule is None:
+            return
+        self.max_bytes, self.allowed_types = self.rule
+        self.received = 0
+        self.kind = None
+        self.error = None
+        self.too_large = bool(content_length and content_length > self.max_bytes)
+        self.hasher = hashlib.sha256()
+        self.file = None
+
+    def _reject(self, error=None):
+        if error:
+            self.error = error
+        else:
+            self.too_large = True
+        if self.file is not None:
+            self.file.close()  # deletes the temporary file
+            self.file = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.rule is None:
+            return raw_data
+
+        self.received += len(raw_data)
+        if self.too_large or self.error:
+            return None
+        if self.received > self.max_bytes:
+            self._reject()
+            return None
+
+        if self.file is None:
+            self.kind = sniff(raw_data)
+            if self.kind not in self.allowed_types:
+                self._reject(
+                    'The file content does not match an allowed type '
+                    f"({', '.join(self.allowed_types)})."
+                )
+                return None
+            self.file = TemporaryUploadedFile(
+                self.file_name, self.content_type, 0, self.charset, self.content_type_extra
+            )
+
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.rule is None:
+            return None
+        if self.too_large or self.error:
+            return RejectedUpload(self.file_name, self.content_type, self.received, self.error)
+        if self.file is None:
+            # Empty upload: let the next handler produce the empty file
+            return None
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.hasher.hexdigest()
+        self.file.sniffed_type = self.kind
+        return self.file
+
+
+@deconstructible
+class FileContentValidator:
+    """Check an upload's magic bytes, not just its file name."""
+
+    def __init__(self, allowed_types):
+        self.allowed_types = tuple(allowed_types)
+
+    def __call__(self, value):
+        if getattr(value, '_committed', False):
+            return  # already stored, validated when it was uploaded
+        upload = getattr(value, 'file', value)
+        error = getattr(upload, 'upload_error', None)
+        if error:
+            raise ValidationError(error)
+        if isinstance(upload, RejectedUpload):
+            return  # oversized; validate_file_size reports it
+
+        kind = getattr(upload, 'sniffed_type', None)
+        if kind is None:
+            position = upload.tell()
+            upload.seek(0)
+            kind = sniff(upload.read(16))
+            upload.seek(position)
+        if kind not in self.allowed_types:
+            raise ValidationError(
+                'The file content does not match an allowed type '
+                f"({', '.join(self.allowed_types)})."
+            )
+
+    def __eq__(self, other):
+        return isinstance(other, FileContentValidator) and self.allowed_types == other.allowed_types
@@ -6,13 +6,32 @@ app_name = "jobs"
 urlpatterns = [
     # Jobs homepage / list view
     path("", views.vacancy_list, name="vacancy_list"),
+    path("more/", views.vacancy_list_fragment, name="vacancy_list_fragment"),
 
     # Job feed (if different view logic)
     path("feed/", views.job_feed, name="job_feed"),
+    path("feed/more/", views.job_feed_fragment, name="job_feed_fragment"),
+    path("feed/stream/", views.job_feed_stream, name="job_feed_stream"),
+
+    # Vacancies matching the signed-in job seeker's profile
+    path("recommended/", views.recommended_vacancies, name="recommended_vacancies"),
+
+    # Most viewed lately
+    path("trending/", views.trending_vacancies, name="trending_vacancies"),
+
+    # Ranked keyword search
+    path("search/", views.vacancy_search, name="vacancy_search"),
 
     # Vacancy CRUD
     path("vacancy/new/", views.create_vacancy, name="create_vacancy"),
     path("vacancy/<int:pk>/", views.vacancy_detail, name="vacancy_detail"),
     path("vacancy/<int:pk>/edit/", views.edit_vacancy, name="edit_vacancy"),
     path("vacancy/<int:pk>/delete/", views.delete_vacancy, name="delete_vacancy"),
+
+    # Employer's applicant counts
+    path("dashboard/", views.employer_dashboard, name="employer_dashboard"),
+    path("dashboard/<int:pk>/", views.employer_dashboard, name="employer_dashboard_vacancy"),
+
+    # Apply through the site
+    path("vacancy/<int:pk>/apply/", views.apply_for_vacancy, name="apply_for_vacancy"),
 ]
@@ -1,10 +1,20 @@
-from .models import Vacancy, AdvisoryArticle, AdvisoryCategory, ReferralPartner, ReferralRequest
-from django.shortcuts import render, get_object_or_404, redirect
-from .forms import VacancyForm
+import asyncio
+from decimal import Decimal, InvalidOperation
+
+from asgiref.sync import sync_to_async
+from .models import Vacancy, JobSeeker, Application, AdvisoryArticle, AdvisoryCategory, ReferralPartner, ReferralRequest
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
+from .forms import ApplicationForm, VacancyForm
 from django.contrib.auth.decorators import login_required
 from accounts.models import EmployerProfile
-from django.http import HttpResponseForbidden
-from django.core.paginator import Paginator
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.urls import reverse
+from .pagination import CursorPaginator, get_page_size
+from .salaries import MAX_ZAR_ANNUAL
+from .search import filter_vacancies, search_vacancies
+from .cache import cache_public_page
+from . import application_stats, applications, featuring, live, matching, related, traffic
 
 
 
@@ -33,22 +43,103 @@ def skills_placeholder(request):
 def home(request):
     return render(request, 'home.html')
 
-def vacancy_list(request):
-    vacancies = Vacancy.objects.all().order_by('-posted_date')
-    paginator = Paginator(vacancies, 6)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    return render(request, 'jobs/vacancy_list.html', {
-        'vacancies': page_obj,
-        'is_paginated': page_obj.has_other_pages(),
-        'page_obj': page_obj,
-    })
+# The public read views below are async, for ASGI (jobcentre/asgi.py):
+# a slow client then costs a coroutine rather than a thread. Templates must
+# not touch the database from the event loop, so querysets are evaluated
+# (with the relations the templates follow) before rendering, and _arender
+# resolves request.user, which the auth context processor would otherwise
+# load synchronously.
+
+async def _alist(queryset):
+    return [obj async for obj in queryset]
+
+
+async def _arender(request, template_name, context):
+    request.user = await request.auser()
+    return render(request, template_name, context)
+
+
+def _impressions(response, vacancies):
+    """Note the vacancies ``response`` shows, for traffic.count_impressions."""
+    response.vacancy_impressions = [vacancy.pk for vacancy in vacancies]
+    return response
+
+
+async def _vacancy_page_context(request, queryset, fragment_url, field='posted_date'):
+    """Cursor-paginate ``queryset`` and build the context shared by the
+    full page and its infinite-scroll fragment."""
+    paginator = CursorPaginator(queryset, per_page=get_page_size(request.GET.get('page_size')), field=field)
+    page = await paginator.aget_page(request.GET.get('after'))
 
+    next_query = ''
+    if page.has_next:
+        params = request.GET.copy()
+        params['after'] = page.next_cursor
+        next_query = params.urlencode()
 
-def job_feed(request):
+    return {
+        'vacancies': page,
+        'next_query': next_query,
+        'fragment_url': fragment_url,
+    }
+
+
+@traffic.count_impressions
+async def job_feed(request):
     # timeline-style feed ordered by newest
-    vacancies = Vacancy.objects.filter(is_active=True).select_related("employer")
-    return render(request, "jobs/feed.html", {"vacancies": vacancies})
+    context = await _vacancy_page_context(
+        request, Vacancy.objects.filter(is_active=True), reverse('jobs:job_feed_fragment')
+    )
+    return _impressions(await _arender(request, "jobs/feed.html", context), context['vacancies'])
+
+
+@traffic.count_impressions
+async def job_feed_fragment(request):
+    """Next page of the feed as bare HTML for infinite scroll."""
+    context = await _vacancy_page_context(
+        request, Vacancy.objects.filter(is_active=True), reverse('jobs:job_feed_fragment')
+    )
+    return _impressions(await _arender(request, "jobs/partials/feed_page.html", context), context['vacancies'])
+
+
+LIVE_REPLAY_LIMIT = 50
+
+
+async def _live_feed_events(last_id):
+    yield 'retry: 5000\n\n'
+    async with live.get_broker().subscribe() as queue:
+        # Subscribed first, so nothing created during the replay is missed
+        if last_id is not None:
+            missed = await _alist(
+                Vacancy.objects.filter(is_active=True, pk__gt=last_id).order_by('pk')[:LIVE_REPLAY_LIMIT]
+            )
+            for vacancy in missed:
+                yield live.format_event(live.vacancy_event(vacancy, 'created'))
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), live.keepalive_seconds())
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+            yield live.format_event(event)
+
+
+async def job_feed_stream(request):
+    """Server-sent events: vacancies created or featured from now on (and,
+    with Last-Event-ID or ?last_id=, those created since that id)."""
+    if not isinstance(request, ASGIRequest):
+        # An endless response would tie up a WSGI worker; 204 tells
+        # EventSource not to reconnect.
+        return HttpResponse(status=204)
+    try:
+        last_id = int(request.headers.get('Last-Event-ID') or request.GET['last_id'])
+    except (KeyError, ValueError):
+        last_id = None
+
+    response = StreamingHttpResponse(_live_feed_events(last_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx: pass events straight through
+    return response
 
 def vacancy_detail(request, pk):
     vacancy = get_object_or_404(Vacancy, pk=pk)
@@ -104,27 +195,31 @@ def delete_vacancy(request, pk):
 # ===============================
 # 🏠 HOME VIEW
 # ===============================
-def home(request):
-    # Count total active jobs
-    total_active_jobs = Vacancy.objects.filter(is_active=True).count()
+@traffic.count_impressions
+@cache_public_page('vacancies')
+async def home(request):
+    # Count total active jobs and fetch the featured ones in one go; the
+    # featuring engine picks them (jobs/featuring.py) and the list is cached
+    active = Vacancy.objects.filter(is_active=True)
+    count = featuring.featured_count()
+    total_active_jobs, featured_vacancies = await asyncio.gather(
+        active.acount(),
+        sync_to_async(featuring.featured_vacancies)(count),
+    )
 
     # Smart featured jobs logic
     if total_active_jobs == 0:
         featured_vacancies = []
         section_title = "Featured Job Opportunities"
         section_description = "No job opportunities available yet"
+    elif featured_vacancies:
+        section_title = "Featured Job Opportunities"
+        section_description = "Highlighted opportunities from our partner companies"
     else:
-        # Try to get actually featured jobs
-        featured_vacancies = Vacancy.objects.filter(is_active=True, is_featured=True).order_by('-posted_date')[:6]
-
-        if featured_vacancies.exists():
-            section_title = "Featured Job Opportunities"
-            section_description = "Highlighted opportunities from our partner companies"
-        else:
-            # No featured jobs, fallback to recent
-            featured_vacancies = Vacancy.objects.filter(is_active=True).order_by('-posted_date')[:6]
-            section_title = "Recent Job Opportunities"
-            section_description = "Latest opportunities from our partner companies"
+        # No featured jobs, fallback to recent
+        featured_vacancies = await _alist(active.order_by('-posted_date')[:count])
+        section_title = "Recent Job Opportunities"
+        section_description = "Latest opportunities from our partner companies"
 
     context = {
         'featured_vacancies': featured_vacancies,
@@ -132,80 +227,254 @@ def home(request):
         'section_description': section_description,
         'total_active_jobs': total_active_jobs,
     }
-    return render(request, 'jobs/home.html', context)
+    return _impressions(await _arender(request, 'jobs/home.html', context), featured_vacancies)
 
 
 # ===============================
 # 💼 JOBS
 # ===============================
-def vacancy_list(request):
-    vacancies = Vacancy.objects.filter(is_active=True).order_by('-posted_date')
+SALARY_SORT = 'salary'
+
+
+def _salary_param(request, name):
+    """Annual ZAR amount from the query string, or None."""
+    try:
+        value = Decimal(request.GET.get(name, '').replace(',', '').replace(' ', ''))
+    except InvalidOperation:
+        return None
+    return value if value.is_finite() and value >= 0 else None
+
+
+def _filtered_vacancies(request):
+    """Return (queryset, cursor field) for the jobs timeline filters."""
+    vacancies = Vacancy.objects.filter(is_active=True)
 
     # Optional filters
     job_type = request.GET.get('job_type')
     location = request.GET.get('location')
+    min_salary = _salary_param(request, 'min_salary')
+    max_salary = _salary_param(request, 'max_salary')
 
     if job_type:
         vacancies = vacancies.filter(job_type=job_type)
     if location:
-        vacancies = vacancies.filter(location__icontains=location)
+        vacancies = filter_vacancies(vacancies, location, column='location')
+    # Salary ranges overlap the wanted one (annualized ZAR, see jobs/salaries.py)
+    if min_salary is not None:
+        # A closed range rather than >=: without table statistics SQLite
+        # only prefers the salary index's range search (and a sort of the
+        # matches) to walking every active row newest-first when both ends
+        # are bound
+        vacancies = vacancies.filter(salary_max_zar_annual__range=(min_salary, MAX_ZAR_ANNUAL))
+    if max_salary is not None:
+        vacancies = vacancies.filter(salary_min_zar_annual__lte=max_salary)
+
+    if request.GET.get('sort') == SALARY_SORT:
+        # Highest paying first; jobs without a salary can't be ranked
+        return vacancies.filter(salary_max_zar_annual__isnull=False), 'salary_max_zar_annual'
+    return vacancies, 'posted_date'
+
+
+# Built on the database thread: the location filter checks the
+# connection for the FTS table (jobs/search.py).
+_afiltered_vacancies = sync_to_async(_filtered_vacancies)
+
 
+@traffic.count_impressions
+async def vacancy_list(request):
+    vacancies, field = await _afiltered_vacancies(request)
+    context = await _vacancy_page_context(request, vacancies, reverse('jobs:vacancy_list_fragment'), field)
+    context['job_types'] = getattr(Vacancy, 'JOB_TYPES', [])
+    return _impressions(await _arender(request, 'jobs/vacancy_list.html', context), context['vacancies'])
+
+
+@traffic.count_impressions
+async def vacancy_list_fragment(request):
+    """Next page of the jobs timeline as bare HTML for infinite scroll."""
+    vacancies, field = await _afiltered_vacancies(request)
+    context = await _vacancy_page_context(request, vacancies, reverse('jobs:vacancy_list_fragment'), field)
+    return _impressions(await _arender(request, 'jobs/partials/timeline_page.html', context), context['vacancies'])
+
+
+RELATED_ARTICLE_COUNT = 3
+
+
+async def vacancy_detail(request, pk):
+    vacancy = await aget_object_or_404(Vacancy, pk=pk)
+    traffic.record_view(vacancy.pk)
     context = {
-        'vacancies': vacancies,
-        'job_types': getattr(Vacancy, 'JOB_TYPES', []),
+        "vacancy": vacancy,
+        "advice_articles": await sync_to_async(related.articles_for_vacancy)(vacancy, RELATED_ARTICLE_COUNT),
     }
-    return render(request, 'jobs/vacancy_list.html', context)
+    return await _arender(request, "jobs/vacancy_detail.html", context)
 
 
-def vacancy_detail(request, pk):
-    vacancy = get_object_or_404(Vacancy, pk=pk)
-    return render(request, "jobs/vacancy_detail.html", {"vacancy": vacancy})
+RECOMMENDATION_COUNT = 10
+
+
+@login_required
+def recommended_vacancies(request):
+    """Active vacancies that best match the job seeker's skills and experience."""
+    seeker = JobSeeker.objects.filter(user=request.user).first()
+    matches = matching.recommend(seeker, RECOMMENDATION_COUNT) if seeker else []
+    context = {
+        'seeker': seeker,
+        'matches': [(vacancy, round(score * 100)) for vacancy, score in matches],
+        'available': matching.available(),
+    }
+    return render(request, 'jobs/recommended.html', context)
+
+
+@login_required
+def apply_for_vacancy(request, pk):
+    """Apply to an active vacancy through the site. Submitting twice is
+    harmless; new applications are rate limited per user."""
+    vacancy = get_object_or_404(Vacancy, pk=pk, is_active=True)
+    # Only an actual application creates a profile (and a match index entry)
+    seeker = JobSeeker.objects.filter(user=request.user).first()
+    application = seeker and Application.objects.filter(vacancy=vacancy, job_seeker=seeker).first()
+    context = {'vacancy': vacancy, 'application': application}
+    if application is not None:
+        return render(request, 'jobs/apply.html', context)
+
+    if request.method == 'POST':
+        form = ApplicationForm(request.POST)
+        if form.is_valid():
+            wait = applications.apply_bucket().take(request.user.pk)
+            if wait:
+                context.update(form=form, retry_after=int(wait) + 1)
+                response = render(request, 'jobs/apply.html', context, status=429)
+                response['Retry-After'] = context['retry_after']
+                return response
+            if seeker is None:
+                seeker, _ = JobSeeker.objects.get_or_create(user=request.user)
+            try:
+                applications.submit(vacancy.pk, seeker.pk, form.cleaned_data['cover_letter'])
+            except TimeoutError:
+                context.update(form=form, busy=True)
+                return render(request, 'jobs/apply.html', context, status=503)
+            return redirect('jobs:apply_for_vacancy', pk=vacancy.pk)
+    else:
+        form = ApplicationForm()
+    context['form'] = form
+    return render(request, 'jobs/apply.html', context)
+
+
+DASHBOARD_DAYS = 30
+
+
+@login_required
+def employer_dashboard(request, pk=None):
+    """Applicants per status for each of the employer's vacancies, and
+    applications per day for all of them or vacancy ``pk``. Counts come
+    from ApplicationDailyStats (see jobs/application_stats.py). Vacancies
+    have no owner, so an employer's are those under their company name."""
+    profile = EmployerProfile.objects.filter(user=request.user, approved=True).first()
+    if profile is None:
+        return HttpResponseForbidden("You must be an approved employer to see applicants.")
+    vacancies = Vacancy.objects.filter(company=profile.company_name) if profile.company_name else Vacancy.objects.none()
+    selected = get_object_or_404(vacancies, pk=pk) if pk is not None else None
+
+    statuses = Application.STATUS_CHOICES
+    counts = application_stats.status_counts(vacancies)
+    rows = []
+    for vacancy in vacancies.only('id', 'title', 'location', 'is_active').order_by('-is_active', '-posted_date'):
+        by_status = counts.get(vacancy.pk, {})
+        rows.append((vacancy, [by_status.get(status, 0) for status, _ in statuses], sum(by_status.values())))
+
+    series = application_stats.daily_counts([selected.pk] if selected else vacancies, DASHBOARD_DAYS)
+    peak = max(total for _, total in series) or 1
+    context = {
+        'statuses': statuses,
+        'rows': rows,
+        'totals': [sum(row[1][n] for row in rows) for n in range(len(statuses))],
+        'total': sum(row[2] for row in rows),
+        'selected': selected,
+        'days': DASHBOARD_DAYS,
+        'series': [(day, total, round(total * 100 / peak)) for day, total in series],
+        'series_total': sum(total for _, total in series),
+    }
+    return render(request, 'jobs/employer_dashboard.html', context)
+
+
+TRENDING_COUNT = 20
+
+
+@traffic.count_impressions
+def trending_vacancies(request):
+    """Active vacancies with the most views lately (see jobs/traffic.py)."""
+    vacancies = traffic.trending_vacancies(TRENDING_COUNT)
+    return _impressions(render(request, 'jobs/trending.html', {'vacancies': vacancies}), vacancies)
+
+
+def vacancy_search(request):
+    query = request.GET.get('q', '').strip()
+    vacancies = search_vacancies(query, limit=get_page_size(request.GET.get('limit'), default=50)) if query else []
+    context = {
+        'query': query,
+        'vacancies': vacancies,
+    }
+    return render(request, 'jobs/search_results.html', context)
 
 
 # ===============================
 # 📰 ADVISORY
 # ===============================
-def advisory_home(request):
-    categories = AdvisoryCategory.objects.all()
-    featured_articles = AdvisoryArticle.objects.filter(is_published=True).order_by('-published_date')[:6]
+@cache_public_page('advisory')
+async def advisory_home(request):
+    categories, featured_articles = await asyncio.gather(
+        _alist(AdvisoryCategory.objects.all()),
+        _alist(
+            AdvisoryArticle.objects.filter(is_published=True)
+            .select_related('category').order_by('-published_date')[:6]
+        ),
+    )
     context = {
         'categories': categories,
         'featured_articles': featured_articles,
     }
-    return render(request, 'jobs/advisory_home.html', context)
+    return await _arender(request, 'jobs/advisory_home.html', context)
 
 
-def advisory_category(request, category_id):
-    category = get_object_or_404(AdvisoryCategory, id=category_id)
-    articles = AdvisoryArticle.objects.filter(
+@cache_public_page(lambda kwargs: f"advisory-category:{kwargs['category_id']}")
+async def advisory_category(request, category_id):
+    category = await aget_object_or_404(AdvisoryCategory, id=category_id)
+    articles = await _alist(AdvisoryArticle.objects.filter(
         category=category,
         is_published=True
-    ).order_by('-published_date')
+    ).select_related('category').order_by('-published_date'))
     context = {
         'category': category,
         'articles': articles,
     }
-    return render(request, 'jobs/advisory_category.html', context)
-
-
-def advisory_detail(request, article_id):
-    article = get_object_or_404(AdvisoryArticle, id=article_id, is_published=True)
-    related_articles = AdvisoryArticle.objects.filter(
-        category=article.category,
-        is_published=True
-    ).exclude(id=article.id).order_by('-published_date')[:3]
+    return await _arender(request, 'jobs/advisory_category.html', context)
+
+
+@cache_public_page(lambda kwargs: f"advisory-article:{kwargs['article_id']}")
+async def advisory_detail(request, article_id):
+    article = await aget_object_or_404(
+        AdvisoryArticle.objects.select_related('category'), id=article_id, is_published=True
+    )
+    related_articles = [link.related for link in await _alist(related.related_links(article.id, RELATED_ARTICLE_COUNT))]
+    if not related_articles:
+        # Not computed yet (see jobs/related.py): newest in the same category
+        related_articles = await _alist(AdvisoryArticle.objects.filter(
+            category=article.category,
+            is_published=True
+        ).exclude(id=article.id).order_by('-published_date')[:RELATED_ARTICLE_COUNT])
 
     context = {
         'article': article,
         'related_articles': related_articles,
     }
-    return render(request, 'jobs/advisory_detail.html', context)
+    return await _arender(request, 'jobs/advisory_detail.html', context)
 
 
 # ===============================
 # 🤝 REFERRALS
 # ===============================
-def referrals_home(request):
+@cache_public_page('referrals')
+async def referrals_home(request):
     categories = ReferralPartner.CATEGORY_CHOICES
     partners = ReferralPartner.objects.filter(is_active=True)
 
@@ -215,14 +484,14 @@ def referrals_home(request):
         partners = partners.filter(category=category_filter)
 
     context = {
-        'partners': partners,
+        'partners': await _alist(partners),
         'categories': categories,
         'selected_category': category_filter,
     }
-    return render(request, 'jobs/referrals_home.html', context)
+    return await _arender(request, 'jobs/referrals_home.html', context)
 
 
-def referral_partner_detail(request, partner_id):
-    partner = get_object_or_404(ReferralPartner, id=partner_id, is_active=True)
+async def referral_partner_detail(request, partner_id):
+    partner = await aget_object_or_404(ReferralPartner, id=partner_id, is_active=True)
     context = {'partner': partner}
-    return render(request, 'jobs/referral_partner_detail.html', context)
+    return await _arender(request, 'jobs/referral_partner_detail.html', context)